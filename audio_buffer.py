@@ -0,0 +1,106 @@
+# audio_buffer.py
+from typing import Optional
+
+import numpy as np
+
+
+class AudioBuffer:
+    """Buffer de captura preasignado con crecimiento geométrico.
+
+    Las escrituras copian el bloque recibido en un array ya reservado, así que
+    cada append cuesta O(1) amortizado sin importar cuánto dure la grabación.
+    La capacidad se duplica hasta max_seconds; a partir de ahí el buffer se
+    comporta como un anillo y sobrescribe el audio más antiguo.
+    """
+
+    def __init__(self, sample_rate: int, max_seconds: Optional[float] = None,
+                 initial_seconds: float = 10.0, dtype=np.int16):
+        self.sample_rate = sample_rate
+        self.max_samples = int(sample_rate * max_seconds) if max_seconds else None
+        initial = int(sample_rate * initial_seconds)
+        if self.max_samples:
+            initial = min(initial, self.max_samples)
+        self._data = np.zeros(max(initial, 1), dtype=dtype)
+        self._start = 0       # Índice de la muestra más antigua (solo en modo anillo)
+        self._size = 0
+        self.dropped_samples = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def duration(self) -> float:
+        return self._size / self.sample_rate
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        """Vacía el buffer conservando la memoria reservada."""
+        self._start = 0
+        self._size = 0
+        self.dropped_samples = 0
+
+    def append(self, samples: np.ndarray):
+        """Añade un bloque de muestras (se convierte al dtype del buffer)."""
+        count = len(samples)
+        if count == 0:
+            return
+
+        if self._size + count > len(self._data):
+            self._grow(self._size + count)
+
+        capacity = len(self._data)
+        if count >= capacity:
+            # El bloque por sí solo llena el anillo: solo se conserva su final
+            self.dropped_samples += self._size + count - capacity
+            self._data[:] = samples[-capacity:]
+            self._start = 0
+            self._size = capacity
+            return
+
+        overflow = self._size + count - capacity
+        if overflow > 0:
+            # Modo anillo: se descarta lo más antiguo
+            self._start = (self._start + overflow) % capacity
+            self._size -= overflow
+            self.dropped_samples += overflow
+
+        end = (self._start + self._size) % capacity
+        first = min(count, capacity - end)
+        self._data[end:end + first] = samples[:first]
+        if first < count:
+            self._data[:count - first] = samples[first:]
+        self._size += count
+
+    def _grow(self, needed: int):
+        """Duplica la capacidad (hasta el máximo) manteniendo el orden."""
+        capacity = len(self._data)
+        if self.max_samples and capacity >= self.max_samples:
+            return
+        new_capacity = capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        if self.max_samples:
+            new_capacity = min(new_capacity, self.max_samples)
+
+        data = np.zeros(new_capacity, dtype=self._data.dtype)
+        data[:self._size] = self.view()
+        self._data = data
+        self._start = 0
+
+    def view(self) -> np.ndarray:
+        """Muestras en orden cronológico.
+
+        Es una vista sin copia salvo cuando el anillo ya dio la vuelta, en cuyo
+        caso se reordena una sola vez y las siguientes vistas vuelven a ser
+        directas.
+        """
+        end = self._start + self._size
+        if end <= len(self._data):
+            return self._data[self._start:end]
+
+        self._data = np.roll(self._data, -self._start)
+        self._start = 0
+        return self._data[:self._size]
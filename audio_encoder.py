@@ -0,0 +1,134 @@
+# audio_encoder.py
+"""Codificación en memoria del audio que se sube a transcribir.
+
+WAV (PCM sin comprimir) no necesita dependencias; FLAC (sin pérdida) y Opus
+en contenedor OGG usan el paquete opcional soundfile. Si no está instalado,
+o la libsndfile del sistema no soporta el formato, se recurre a WAV.
+"""
+import io
+import os
+import time
+import wave
+from dataclasses import dataclass
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AUDIO_ENCODING = os.getenv('AUDIO_ENCODING', 'wav').lower()  # wav | flac | opus
+TRIM_SILENCE = os.getenv('TRIM_SILENCE', 'true').lower() in ('1', 'true', 'yes')
+TRIM_PADDING_FRAMES = 3  # Frames de margen para no cortar el inicio de una palabra
+
+
+@dataclass
+class EncodedAudio:
+    data: bytes
+    filename: str
+    mime: str
+    encoding: str
+    pcm_bytes: int        # Tamaño del PCM 16-bit de entrada
+    encode_seconds: float
+
+    @property
+    def ratio(self) -> float:
+        return self.pcm_bytes / len(self.data) if self.data else 0.0
+
+    def summary(self) -> str:
+        return (f"📦 Audio: {self.pcm_bytes / 1024:.1f} KB → {len(self.data) / 1024:.1f} KB"
+                f" {self.encoding.upper()} ({self.ratio:.1f}x) en {self.encode_seconds * 1000:.1f} ms")
+
+
+class AudioEncoder:
+    """Codificador base: convierte PCM 16-bit en un fichero listo para subir."""
+    name = 'wav'
+    extension = 'wav'
+    mime = 'audio/wav'
+
+    def __init__(self, sample_rate: int, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def encode(self, pcm, basename: str = "pregunta") -> EncodedAudio:
+        start = time.perf_counter()
+        data = self._encode(pcm)
+        return EncodedAudio(
+            data=data,
+            filename=f"{basename}.{self.extension}",
+            mime=self.mime,
+            encoding=self.name,
+            pcm_bytes=memoryview(pcm).nbytes,
+            encode_seconds=time.perf_counter() - start,
+        )
+
+    def _encode(self, pcm) -> bytes:
+        with io.BytesIO() as wav_buffer:
+            with wave.open(wav_buffer, 'wb') as wav_file:
+                wav_file.setnchannels(self.channels)
+                wav_file.setsampwidth(2)  # 16-bit
+                wav_file.setframerate(self.sample_rate)
+                wav_file.writeframes(pcm)
+            return wav_buffer.getvalue()
+
+
+class SoundFileEncoder(AudioEncoder):
+    """FLAC u Opus/OGG a través de soundfile (libsndfile)."""
+
+    def __init__(self, sample_rate: int, channels: int, name: str,
+                 container: str, subtype: str, extension: str, mime: str):
+        import soundfile
+
+        if not soundfile.check_format(container, subtype):
+            raise ValueError(f"libsndfile no soporta {container}/{subtype}")
+        super().__init__(sample_rate, channels)
+        self.soundfile = soundfile
+        self.name = name
+        self.container = container
+        self.subtype = subtype
+        self.extension = extension
+        self.mime = mime
+
+    def _encode(self, pcm) -> bytes:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels)
+        with io.BytesIO() as output:
+            self.soundfile.write(output, samples, self.sample_rate,
+                                 format=self.container, subtype=self.subtype)
+            return output.getvalue()
+
+
+# Formatos de soundfile: contenedor, subtipo, extensión y tipo MIME
+SOUNDFILE_FORMATS = {
+    'flac': ('FLAC', 'PCM_16', 'flac', 'audio/flac'),
+    'opus': ('OGG', 'OPUS', 'ogg', 'audio/ogg'),
+}
+
+
+def get_encoder(name: str = AUDIO_ENCODING, sample_rate: int = 16000,
+                channels: int = 1) -> AudioEncoder:
+    """Devuelve el codificador configurado, o WAV si no está disponible."""
+    if name in SOUNDFILE_FORMATS:
+        try:
+            return SoundFileEncoder(sample_rate, channels, name, *SOUNDFILE_FORMATS[name])
+        except (ImportError, OSError, ValueError) as e:
+            print(f"⚠️  Codificación {name} no disponible ({str(e)}), se usa WAV")
+    elif name != 'wav':
+        print(f"⚠️  Codificación desconocida: {name}, se usa WAV")
+    return AudioEncoder(sample_rate, channels)
+
+
+def trim_silence(samples: np.ndarray, vad, padding: int = TRIM_PADDING_FRAMES) -> np.ndarray:
+    """Quita los frames sin voz del principio y del final (vista, sin copia).
+
+    vad es un GatedVad; si no detecta voz en ningún frame se devuelve la
+    grabación completa para no perder una pregunta dicha en voz baja.
+    """
+    labels = vad.classify_buffer(samples)
+    speech = np.flatnonzero(labels)
+    if len(speech) == 0:
+        return samples
+    first = max(int(speech[0]) - padding, 0)
+    last = min(int(speech[-1]) + 1 + padding, len(labels))
+    end = len(samples) if last == len(labels) else last * vad.frame_size
+    return samples[first * vad.frame_size:end]
@@ -0,0 +1,152 @@
+# audio_preprocess.py
+"""Preparación del audio antes de transcribirlo.
+
+compact_silence usa las etiquetas del VAD por frame para acortar cada pausa
+interna a un hueco fijo (SILENCE_GAP_MS, la mitad tras la voz y la mitad
+antes de la siguiente) y deja solo unos frames de margen al principio y al
+final. Las pausas cortas se conservan enteras: Whisper recibe menos segundos
+sin cortes bruscos entre palabras.
+
+AudioPreprocessor aplica, si se activan, un filtro paso alto (por FFT, sin
+bucles en Python) y una normalización del nivel de la voz.
+"""
+import os
+import time
+from typing import Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from audio_encoder import TRIM_PADDING_FRAMES
+
+load_dotenv()
+
+SILENCE_GAP_MS = int(os.getenv('SILENCE_GAP_MS', '240'))  # Hueco que sustituye a cada pausa larga
+HIGHPASS_HZ = float(os.getenv('HIGHPASS_HZ', '0'))  # 0 = sin filtro (80 quita zumbidos y golpes)
+NORMALIZE_AUDIO = os.getenv('NORMALIZE_AUDIO', 'false').lower() in ('1', 'true', 'yes')
+NORMALIZE_DBFS = float(os.getenv('NORMALIZE_DBFS', '-20'))  # Nivel RMS objetivo de la voz
+MAX_GAIN_DB = 20.0          # La normalización nunca amplifica más que esto
+ACTIVE_DBFS = -50.0         # Frames por debajo no cuentan para medir el nivel
+PEAK_LIMIT = 0.99           # Pico máximo tras la ganancia (fracción de la escala)
+
+
+def gap_frames(frame_duration: int, gap_ms: int = SILENCE_GAP_MS) -> int:
+    return max(gap_ms // frame_duration, 0)
+
+
+def compact_mask(labels: np.ndarray, gap: int, padding: int = TRIM_PADDING_FRAMES) -> Optional[np.ndarray]:
+    """Frames que se conservan; None si no hay voz en ninguno."""
+    count = len(labels)
+    index = np.arange(count)
+    speech = np.asarray(labels, dtype=bool)
+    if not speech.any():
+        return None
+    # Último frame de voz hasta i y siguiente frame de voz desde i
+    previous = np.maximum.accumulate(np.where(speech, index, -1))
+    following = np.minimum.accumulate(np.where(speech, index, count)[::-1])[::-1]
+    after = index - previous
+    before = following - index
+    head = gap // 2
+    tail = gap - head
+
+    internal = (previous >= 0) & (following < count)
+    keep = speech | (internal & ((after <= head) | (before <= tail)))
+    keep |= (previous < 0) & (before <= padding)
+    keep |= (following == count) & (previous >= 0) & (after <= padding)
+    return keep
+
+
+def compact_silence(samples: np.ndarray, labels: np.ndarray, frame_size: int,
+                    gap: int, padding: int = TRIM_PADDING_FRAMES) -> np.ndarray:
+    """Acorta las pausas internas a gap frames y recorta los extremos.
+
+    Si el VAD no detecta voz se devuelve la grabación completa para no
+    perder una pregunta dicha en voz baja.
+    """
+    keep = compact_mask(labels, gap, padding)
+    if keep is None:
+        return samples
+    count = len(labels)
+    frames = samples[:count * frame_size].reshape(count, frame_size)
+    compacted = frames[keep].reshape(-1)
+    if keep[-1] and len(samples) > count * frame_size:
+        # Resto del último frame incompleto
+        compacted = np.concatenate([compacted, samples[count * frame_size:]])
+    return compacted
+
+
+def highpass(samples: np.ndarray, sample_rate: int, cutoff: float) -> np.ndarray:
+    """Paso alto de fase cero en el dominio de la frecuencia (float32).
+
+    La transición es un coseno entre cutoff/2 y cutoff, sin el rizado de un
+    corte abrupto.
+    """
+    signal = np.asarray(samples, dtype=np.float32)
+    spectrum = np.fft.rfft(signal)
+    frequencies = np.fft.rfftfreq(len(signal), 1.0 / sample_rate)
+    ramp = np.clip((frequencies - cutoff / 2) / (cutoff / 2), 0.0, 1.0)
+    spectrum *= 0.5 - 0.5 * np.cos(np.pi * ramp)
+    return np.fft.irfft(spectrum, len(signal)).astype(np.float32)
+
+
+def normalize(samples: np.ndarray, frame_size: int, target_dbfs: float = NORMALIZE_DBFS,
+              max_gain_db: float = MAX_GAIN_DB) -> np.ndarray:
+    """Lleva el RMS de los frames activos a target_dbfs sin saturar."""
+    signal = np.asarray(samples, dtype=np.float32)
+    count = len(signal) // frame_size
+    if count == 0:
+        return signal
+    frames = signal[:count * frame_size].reshape(count, frame_size)
+    power = np.mean(frames * frames, axis=1)
+    active = power > (32768.0 * 10 ** (ACTIVE_DBFS / 20)) ** 2
+    if not active.any():
+        return signal
+    level = np.sqrt(np.mean(power[active]))
+    gain = min(32768.0 * 10 ** (target_dbfs / 20) / level, 10 ** (max_gain_db / 20))
+    peak = float(np.max(np.abs(signal)))
+    if peak:
+        gain = min(gain, PEAK_LIMIT * 32767.0 / peak)
+    return signal * np.float32(gain)
+
+
+class AudioPreprocessor:
+    """Paso alto y normalización opcionales sobre PCM 16-bit."""
+
+    def __init__(self, sample_rate: int, frame_duration: int = 30,
+                 highpass_hz: float = HIGHPASS_HZ, normalize_audio: bool = NORMALIZE_AUDIO,
+                 target_dbfs: float = NORMALIZE_DBFS):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_duration / 1000)
+        self.highpass_hz = highpass_hz
+        self.normalize_audio = normalize_audio
+        self.target_dbfs = target_dbfs
+        self.processed = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def from_env(cls, sample_rate: int) -> Optional['AudioPreprocessor']:
+        """None si no hay ninguna etapa activada en el .env."""
+        if HIGHPASS_HZ <= 0 and not NORMALIZE_AUDIO:
+            return None
+        return cls(sample_rate)
+
+    def process(self, pcm) -> np.ndarray:
+        start = time.perf_counter()
+        samples = np.frombuffer(pcm, dtype=np.int16) if not isinstance(pcm, np.ndarray) else pcm
+        signal = samples
+        if self.highpass_hz > 0:
+            signal = highpass(signal, self.sample_rate, self.highpass_hz)
+        if self.normalize_audio:
+            signal = normalize(signal, self.frame_size, self.target_dbfs)
+        if signal is not samples:
+            signal = np.clip(np.rint(signal), -32768, 32767).astype(np.int16)
+        self.processed += 1
+        self.seconds += time.perf_counter() - start
+        return signal
+
+    def format_stats(self) -> str:
+        stages = [name for name, active in ((f"paso alto {self.highpass_hz:.0f} Hz", self.highpass_hz > 0),
+                                            (f"normalización {self.target_dbfs:.0f} dBFS", self.normalize_audio))
+                  if active]
+        average = self.seconds / self.processed * 1000 if self.processed else 0.0
+        return f"🎚️  Preproceso ({', '.join(stages)}): {self.processed} audios, {average:.1f} ms de media"
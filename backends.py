@@ -0,0 +1,297 @@
+# backends.py
+"""Backends intercambiables de transcripción y de respuesta.
+
+Transcripción: Groq (Whisper remoto) o Whisper local con faster-whisper.
+Respuesta: Groq u Ollama. Se eligen en el .env con TRANSCRIPTION_BACKEND y
+LLM_BACKEND; con whisper_local + ollama no hay ninguna llamada a Internet.
+Los modelos locales se mantienen cargados entre peticiones.
+"""
+import json
+import os
+import threading
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from audio_encoder import AUDIO_ENCODING, get_encoder
+from audio_preprocess import AudioPreprocessor
+from metrics import metrics
+from response_stream import STREAM_RESPONSES, ResponseResult, generate
+
+load_dotenv()
+
+TRANSCRIPTION_BACKEND = os.getenv('TRANSCRIPTION_BACKEND', 'groq').lower()  # groq | whisper_local
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'groq').lower()                      # groq | ollama
+
+OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://127.0.0.1:11434')
+OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama3.2')
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')  # Modelo residente entre preguntas
+OLLAMA_TIMEOUT = float(os.getenv('OLLAMA_TIMEOUT', '120'))
+
+LOCAL_WHISPER_MODEL = os.getenv('LOCAL_WHISPER_MODEL', 'base')
+LOCAL_WHISPER_DEVICE = os.getenv('LOCAL_WHISPER_DEVICE', 'auto')
+LOCAL_WHISPER_COMPUTE_TYPE = os.getenv('LOCAL_WHISPER_COMPUTE_TYPE', 'int8')
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+class Transcriber:
+    """Convierte PCM 16-bit mono en texto."""
+    name = 'base'
+    model = None
+    preprocessor = None  # AudioPreprocessor opcional (paso alto, normalización)
+
+    def transcribe(self, pcm, language: Optional[str] = None, basename: str = "pregunta") -> str:
+        raise NotImplementedError
+
+    def prepare(self, pcm):
+        """Aplica el preprocesado configurado antes de transcribir."""
+        if self.preprocessor is None:
+            return pcm
+        with metrics.timer('preprocess'):
+            return self.preprocessor.process(pcm)
+
+    def warm_up(self):
+        """Carga el modelo antes de la primera pregunta (si aplica)."""
+
+
+class Completer:
+    """Genera la respuesta del asistente para una conversación."""
+    name = 'base'
+    model = None
+
+    def complete(self, messages: List[Dict], stream: bool = STREAM_RESPONSES,
+                 on_token: Optional[Callable[[str], None]] = None,
+                 max_tokens: int = 150, temperature: float = 0.5) -> ResponseResult:
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Carga el modelo antes de la primera pregunta (si aplica)."""
+
+
+class GroqBackend:
+    """Cliente de Groq compartido, creado en el primer uso.
+
+    Recibe el cliente ya hecho o una función que lo crea, para que importar
+    groq y abrir la conexión no retrasen el arranque.
+    """
+
+    def __init__(self, client=None, client_factory: Optional[Callable] = None):
+        self._client = client
+        self._client_factory = client_factory
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def warm_up(self):
+        # Una petición barata deja abierta la conexión HTTPS (TLS incluido)
+        self.client.models.list()
+
+
+class GroqTranscriber(GroqBackend, Transcriber):
+    """Whisper en Groq: el audio se codifica en memoria y se sube."""
+    name = 'groq'
+
+    def __init__(self, client=None, model: str = None, sample_rate: int = 16000,
+                 channels: int = 1, encoding: str = AUDIO_ENCODING,
+                 client_factory: Optional[Callable] = None):
+        super().__init__(client, client_factory)
+        self.model = model
+        self.encoder = get_encoder(encoding, sample_rate, channels)
+        self.last_upload = None
+
+    def transcribe(self, pcm, language: Optional[str] = None, basename: str = "pregunta") -> str:
+        encoded = self.encoder.encode(self.prepare(pcm), basename=basename)
+        self.last_upload = encoded
+        print(encoded.summary())
+        metrics.observe('encode', encoded.encode_seconds)
+
+        request = {'file': (encoded.filename, encoded.data, encoded.mime), 'model': self.model}
+        if language:
+            request['language'] = language
+        return self.client.audio.transcriptions.create(**request).text
+
+
+class GroqCompleter(GroqBackend, Completer):
+    name = 'groq'
+
+    def __init__(self, client=None, model: str = None,
+                 client_factory: Optional[Callable] = None):
+        super().__init__(client, client_factory)
+        self.model = model
+
+    def complete(self, messages, stream=STREAM_RESPONSES, on_token=None,
+                 max_tokens=150, temperature=0.5) -> ResponseResult:
+        return generate(self.client, stream=stream, on_token=on_token, model=self.model,
+                        messages=messages, max_tokens=max_tokens, temperature=temperature)
+
+
+class OllamaCompleter(Completer):
+    """Chat contra un servidor Ollama local (/api/chat).
+
+    keep_alive mantiene el modelo en memoria entre preguntas, así que solo
+    la primera petición (o warm_up) paga la carga.
+    """
+    name = 'ollama'
+
+    def __init__(self, host: str = OLLAMA_HOST, model: str = OLLAMA_MODEL,
+                 keep_alive: str = OLLAMA_KEEP_ALIVE, timeout: float = OLLAMA_TIMEOUT):
+        self.host = host.rstrip('/')
+        self.model = model
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+
+    def _post(self, payload: Dict):
+        request = urllib.request.Request(
+            f"{self.host}/api/chat",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except OSError as e:
+            raise BackendError(f"Ollama no responde en {self.host}: {str(e)}") from e
+
+    def warm_up(self):
+        # Una conversación vacía solo carga el modelo
+        with self._post({'model': self.model, 'messages': [], 'keep_alive': self.keep_alive}):
+            pass
+
+    def complete(self, messages, stream=STREAM_RESPONSES, on_token=None,
+                 max_tokens=150, temperature=0.5) -> ResponseResult:
+        start = time.perf_counter()
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'stream': stream,
+            'keep_alive': self.keep_alive,
+            'options': {'num_predict': max_tokens, 'temperature': temperature},
+        }
+
+        with self._post(payload) as response:
+            if not stream:
+                text = json.load(response).get('message', {}).get('content', '')
+                elapsed = time.perf_counter() - start
+                if on_token and text:
+                    on_token(text)
+                return ResponseResult(text, elapsed, elapsed, chunks=1)
+
+            # Streaming: una línea JSON por fragmento hasta "done"
+            first_token = None
+            parts = []
+            for line in response:
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise BackendError(chunk['error'])
+                token = chunk.get('message', {}).get('content')
+                if token:
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    parts.append(token)
+                    if on_token:
+                        on_token(token)
+                if chunk.get('done'):
+                    break
+
+        return ResponseResult(
+            text=''.join(parts),
+            time_to_first_token=first_token,
+            total_time=time.perf_counter() - start,
+            chunks=len(parts),
+            streamed=True
+        )
+
+
+class LocalWhisperTranscriber(Transcriber):
+    """Whisper local con faster-whisper; el modelo queda residente en memoria."""
+    name = 'whisper_local'
+
+    def __init__(self, model: str = LOCAL_WHISPER_MODEL, device: str = LOCAL_WHISPER_DEVICE,
+                 compute_type: str = LOCAL_WHISPER_COMPUTE_TYPE):
+        self.model = model
+        self.device = device
+        self.compute_type = compute_type
+        self._whisper = None
+        self._lock = threading.Lock()  # Las ventanas incrementales llegan desde varios hilos
+
+    def warm_up(self):
+        with self._lock:
+            if self._whisper is not None:
+                return
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError as e:
+                raise BackendError("TRANSCRIPTION_BACKEND=whisper_local requiere "
+                                   "`pip install faster-whisper`") from e
+            start = time.perf_counter()
+            self._whisper = WhisperModel(self.model, device=self.device,
+                                         compute_type=self.compute_type)
+            print(f"🧠 Whisper local '{self.model}' cargado en {time.perf_counter() - start:.1f} s")
+
+    def transcribe(self, pcm, language: Optional[str] = None, basename: str = "pregunta") -> str:
+        self.warm_up()
+        # PCM 16-bit → float32 en [-1, 1), sin pasar por WAV
+        samples = np.frombuffer(self.prepare(pcm), dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _ = self._whisper.transcribe(samples, language=language, beam_size=1)
+        return ' '.join(segment.text.strip() for segment in segments)
+
+
+def create_transcriber(client_factory: Callable, sample_rate: int = 16000,
+                       channels: int = 1, backend: str = TRANSCRIPTION_BACKEND) -> Transcriber:
+    if backend == 'whisper_local':
+        transcriber = LocalWhisperTranscriber()
+    elif backend == 'groq':
+        transcriber = GroqTranscriber(model=os.getenv('WHISPER_MODEL_NAME'), sample_rate=sample_rate,
+                                      channels=channels, client_factory=client_factory)
+    else:
+        raise BackendError(f"TRANSCRIPTION_BACKEND desconocido: {backend}")
+    transcriber.preprocessor = AudioPreprocessor.from_env(sample_rate)
+    return transcriber
+
+
+def create_completer(client_factory: Callable, backend: str = LLM_BACKEND) -> Completer:
+    if backend == 'ollama':
+        return OllamaCompleter()
+    if backend != 'groq':
+        raise BackendError(f"LLM_BACKEND desconocido: {backend}")
+    return GroqCompleter(model=os.getenv('MODEL_NAME'), client_factory=client_factory)
+
+
+def warm_up(*backends):
+    """Carga los modelos locales y abre las conexiones antes de la primera pregunta."""
+    warmed_clients = []
+    for backend in backends:
+        try:
+            if isinstance(backend, GroqBackend):
+                # Transcripción y respuesta comparten cliente: una conexión basta
+                if any(backend.client is client for client in warmed_clients):
+                    continue
+                warmed_clients.append(backend.client)
+            backend.warm_up()
+        except Exception as e:
+            print(f"⚠️  No se pudo precargar {backend.name}: {str(e)}")
+
+
+def groq_client_factory():
+    """Crea el cliente de Groq una sola vez y solo si algún backend lo usa."""
+    client = None
+    lock = threading.Lock()
+
+    def factory():
+        nonlocal client
+        with lock:
+            if client is None:
+                from groq import Groq
+                client = Groq(api_key=os.getenv('GROQ_API_KEY'))
+        return client
+    return factory
@@ -0,0 +1,242 @@
+# batch_processor.py
+"""Procesa un directorio de grabaciones WAV sin micrófono.
+
+Cada fichero se lee con mmap, se segmenta con el VAD de VoiceProcessor, sus
+enunciados se transcriben en un pool acotado de hilos y las transcripciones
+pasan por QuestionDetector. Los resultados se escriben en JSONL a medida que
+termina cada fichero; si la ejecución se interrumpe, al relanzarla se saltan
+los ficheros ya completados.
+
+Uso:
+    python batch_processor.py grabaciones/ -o resultados.jsonl --jobs 4 --concurrency 8
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, Set, Tuple
+
+import numpy as np
+
+from question_store import QuestionStats
+from voice_processor import CHANNELS, SAMPLE_RATE, VoiceProcessor
+
+# Procesador propio de cada proceso trabajador
+_processor = None
+_transcription_pool = None
+
+
+class WavFormatError(ValueError):
+    pass
+
+
+def read_wav_mmap(path: str) -> Tuple[mmap.mmap, np.ndarray]:
+    """Mapea un WAV PCM 16-bit en memoria y devuelve sus muestras sin copiarlas."""
+    with open(path, 'rb') as wav_file:
+        mapped = mmap.mmap(wav_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped[:4] != b'RIFF' or mapped[8:12] != b'WAVE':
+        mapped.close()
+        raise WavFormatError(f"{path}: no es un fichero WAV")
+
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(mapped):
+        chunk_id = mapped[offset:offset + 4]
+        size = struct.unpack('<I', mapped[offset + 4:offset + 8])[0]
+        body = offset + 8
+        if chunk_id == b'fmt ':
+            fmt = struct.unpack('<HHIIHH', mapped[body:body + 16])
+        elif chunk_id == b'data':
+            if fmt is None:
+                break
+            audio_format, channels, rate, _, _, bits = fmt
+            if (audio_format, channels, rate, bits) != (1, CHANNELS, SAMPLE_RATE, 16):
+                mapped.close()
+                raise WavFormatError(
+                    f"{path}: se esperaba PCM 16-bit, {CHANNELS} canal, {SAMPLE_RATE} Hz")
+            size = min(size, len(mapped) - body)
+            samples = np.frombuffer(mapped, dtype=np.int16, count=size // 2, offset=body)
+            return mapped, samples
+        offset = body + size + (size & 1)
+
+    mapped.close()
+    raise WavFormatError(f"{path}: sin bloque de datos PCM")
+
+
+def _init_worker(concurrency: int):
+    global _processor, _transcription_pool
+    _processor = VoiceProcessor()
+    _transcription_pool = ThreadPoolExecutor(max_workers=concurrency,
+                                             thread_name_prefix="transcripcion")
+
+
+def process_file(path: str) -> Dict:
+    """Segmenta, transcribe y analiza un fichero. Se ejecuta en un trabajador."""
+    start = time.perf_counter()
+    try:
+        mapped, samples = read_wav_mmap(path)
+    except (OSError, WavFormatError) as e:
+        return {'file': path, 'status': 'error', 'error': str(e)}
+
+    try:
+        segments = list(_processor.segment_recording(samples))
+        duration = len(samples) / SAMPLE_RATE
+    except Exception as e:
+        return {'file': path, 'status': 'error', 'error': str(e)}
+    finally:
+        del samples
+        mapped.close()
+
+    language = _processor.whisper_language()
+    futures = [_transcription_pool.submit(_processor.transcribe, audio, language)
+               for _, _, audio in segments]
+
+    results = []
+    transcribed = []
+    for (seg_start, seg_end, _), future in zip(segments, futures):
+        entry = {'start': round(seg_start, 2), 'end': round(seg_end, 2)}
+        try:
+            entry['transcript'] = future.result()
+            transcribed.append(entry)
+        except Exception as e:
+            entry['error'] = str(e)
+        results.append(entry)
+
+    # Todas las transcripciones del fichero pasan juntas por nlp.pipe
+    stats = QuestionStats()
+    try:
+        analyses = _processor.detector.analyze_texts(entry['transcript'] for entry in transcribed)
+        for entry, questions in zip(transcribed, analyses):
+            for analysis in questions:
+                stats.add(analysis)
+            entry['questions'] = [q.to_dict() for q in questions]
+    except Exception as e:
+        for entry in transcribed:
+            if 'questions' not in entry:
+                entry['error'] = str(e)
+
+    failed = any('error' in entry for entry in results)
+    return {
+        'file': path,
+        'status': 'partial' if failed else 'done',
+        'audio_seconds': round(duration, 2),
+        'processing_seconds': round(time.perf_counter() - start, 2),
+        'segments': results,
+        'question_stats': stats.to_state(),
+    }
+
+
+def completed_files(output: str) -> Set[str]:
+    """Ficheros ya terminados en una ejecución anterior.
+
+    Los registros de ficheros sin terminar ('partial', 'error') y las líneas
+    truncadas se eliminan del JSONL (reescrito de forma atómica): esos
+    ficheros se vuelven a procesar y no deben quedar duplicados.
+    """
+    done = set()
+    if not os.path.exists(output):
+        return done
+    kept = []
+    dropped = 0
+    with open(output, encoding='utf-8') as results:
+        for line in results:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                dropped += 1  # Línea truncada por una caída
+                continue
+            if record.get('status') == 'done' and record['file'] not in done:
+                done.add(record['file'])
+                kept.append(line if line.endswith('\n') else line + '\n')
+            else:
+                dropped += 1
+    if dropped:
+        temporary = output + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as results:
+            results.writelines(kept)
+            results.flush()
+            os.fsync(results.fileno())
+        os.replace(temporary, output)
+    return done
+
+
+def find_recordings(directory: str, skip: Set[str]) -> Iterator[str]:
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith('.wav'):
+                path = os.path.join(root, name)
+                if path not in skip:
+                    yield path
+
+
+def run(directory: str, output: str, jobs: int, concurrency: int):
+    skip = completed_files(output)
+    if skip:
+        print(f"⏩ Reanudando: {len(skip)} ficheros ya procesados")
+
+    pending = find_recordings(directory, skip)
+    start = time.perf_counter()
+    processed = 0
+    audio_seconds = 0.0
+    question_stats = QuestionStats()  # Se fusionan las de cada fichero
+
+    with open(output, 'a', encoding='utf-8') as results, \
+            ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                initargs=(concurrency,)) as pool:
+        in_flight = {}  # futuro → fichero
+        exhausted = False
+        while in_flight or not exhausted:
+            # Como mucho dos ficheros por trabajador en vuelo
+            while not exhausted and len(in_flight) < jobs * 2:
+                path = next(pending, None)
+                if path is None:
+                    exhausted = True
+                else:
+                    in_flight[pool.submit(process_file, path)] = path
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                path = in_flight.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # Un fichero que falla (o tumba a su trabajador) no detiene el lote
+                    record = {'file': path, 'status': 'error', 'error': str(e)}
+                # Una sola línea por fichero, escrita de una vez
+                results.write(json.dumps(record, ensure_ascii=False) + '\n')
+                results.flush()
+                processed += 1
+                audio_seconds += record.get('audio_seconds', 0)
+                if 'question_stats' in record:
+                    question_stats.merge(QuestionStats.from_state(record['question_stats']))
+                icon = '✅' if record['status'] == 'done' else '⚠️ '
+                print(f"{icon} {record['file']} ({len(record.get('segments', []))} segmentos)")
+
+    elapsed = time.perf_counter() - start
+    if processed:
+        print(f"\n📊 {processed} ficheros, {audio_seconds / 60:.1f} min de audio en "
+              f"{elapsed:.1f} s ({audio_seconds / elapsed:.1f}x tiempo real)")
+        print(question_stats.format_stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Procesa grabaciones WAV por lotes")
+    parser.add_argument('directory', help="directorio con ficheros .wav")
+    parser.add_argument('-o', '--output', default='resultados.jsonl')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="procesos para segmentar y analizar ficheros")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="transcripciones simultáneas por proceso")
+    args = parser.parse_args()
+
+    run(args.directory, args.output, args.jobs, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
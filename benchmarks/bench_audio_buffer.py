@@ -0,0 +1,68 @@
+# benchmarks/bench_audio_buffer.py
+"""Coste del callback de captura frente a la duración de la grabación.
+
+Simula el cuerpo de RecordingController.audio_callback (append bajo lock) con
+bloques de PortAudio y muestra el tiempo medio por bloque en cada minuto.
+Con --legacy también mide el np.concatenate original para comparar.
+
+Uso:
+    python benchmarks/bench_audio_buffer.py --minutes 10 --legacy 2
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from audio_buffer import AudioBuffer
+
+SAMPLE_RATE = 16000
+
+
+def run(minutes: float, blocksize: int, append):
+    """Devuelve el coste medio por bloque (µs) de cada minuto simulado."""
+    block = (np.random.default_rng(0).standard_normal((blocksize, 1)) * 3000).astype(np.int16)
+    lock = threading.Lock()
+    blocks_per_minute = SAMPLE_RATE * 60 // blocksize
+    per_minute = []
+    for _ in range(int(minutes)):
+        start = time.perf_counter()
+        for _ in range(blocks_per_minute):
+            with lock:
+                append(block)
+        per_minute.append((time.perf_counter() - start) / blocks_per_minute * 1e6)
+    return per_minute
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--minutes', type=float, default=10)
+    parser.add_argument('--blocksize', type=int, default=512)
+    parser.add_argument('--legacy', type=float, default=0,
+                        help="minutos a medir con el np.concatenate original (0 = no)")
+    args = parser.parse_args()
+
+    buffer = AudioBuffer(SAMPLE_RATE, max_seconds=args.minutes * 60 + 60)
+    results = {'AudioBuffer': run(args.minutes, args.blocksize,
+                                  lambda block: buffer.append(block.reshape(-1)))}
+
+    if args.legacy:
+        state = {'buffer': np.array([], dtype=np.int16)}
+
+        def legacy(block):
+            flattened = block.flatten().astype(np.int16)
+            state['buffer'] = np.concatenate((state['buffer'], flattened))
+
+        results['np.concatenate'] = run(args.legacy, args.blocksize, legacy)
+
+    print(f"Coste medio por bloque de {args.blocksize} muestras (µs)")
+    for name, per_minute in results.items():
+        row = "  ".join(f"{value:8.2f}" for value in per_minute)
+        print(f"{name:>16}: {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/bench_compaction.py
+"""Segundos de audio enviados a Whisper: grabación completa, recortada y compactada.
+
+Para cada WAV (PCM 16-bit mono a 16 kHz) clasifica los frames con el VAD de
+iris_base y compara la grabación completa, el recorte de los extremos
+(trim_silence) y la compactación de pausas (compact_silence). Con
+--transcribe transcribe las tres variantes con el backend del .env y mide la
+tasa de error por palabra (WER) frente a la transcripción de referencia: el
+fichero .txt con el mismo nombre si existe, o si no la de la grabación
+completa. Sin directorio se usa un conjunto sintético (ráfagas tonales con
+pausas de longitud variable) que solo sirve para medir segundos.
+
+Uso:
+    python benchmarks/bench_compaction.py fixtures/ --transcribe --gap-ms 240
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import webrtcvad
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from audio_encoder import trim_silence
+from audio_preprocess import SILENCE_GAP_MS, compact_silence, gap_frames
+from bench_vad import FRAME_DURATION, SAMPLE_RATE, load_wav
+from vad import EnergyGate, GatedVad
+
+
+def synthetic_fixtures(count: int = 5, seconds: int = 60) -> dict:
+    """Entrevistas sintéticas: frases de 1-4 s separadas por pausas de 0.2-5 s."""
+    rng = np.random.default_rng(7)
+    fixtures = {}
+    for number in range(count):
+        parts = [np.zeros(int(SAMPLE_RATE * rng.uniform(0.5, 3)))]
+        while sum(len(part) for part in parts) < SAMPLE_RATE * seconds:
+            t = np.arange(int(SAMPLE_RATE * rng.uniform(1, 4))) / SAMPLE_RATE
+            envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+            pitch = rng.uniform(110, 220)
+            voiced = (np.sin(2 * np.pi * pitch * t) + 0.6 * np.sin(4 * np.pi * pitch * t)) * envelope
+            parts.append(voiced * 6000)
+            parts.append(np.zeros(int(SAMPLE_RATE * rng.choice([0.2, 0.5, 1.5, 3.0, 5.0]))))
+        signal = np.concatenate(parts)
+        signal += rng.standard_normal(len(signal)) * 40  # Ruido de sala
+        fixtures[f"sintetico_{number}"] = signal.astype(np.int16)
+    return fixtures
+
+
+def variants(samples: np.ndarray, gap: int) -> dict:
+    # Mismo VAD que iris_base, nuevo para cada variante (guarda estado)
+    def new_vad():
+        return GatedVad(webrtcvad.Vad(1), SAMPLE_RATE, FRAME_DURATION, gate=EnergyGate())
+
+    vad = new_vad()
+    labels = vad.classify_buffer(samples)
+    return {
+        'completa': samples,
+        'recortada': trim_silence(samples, new_vad()),
+        'compactada': compact_silence(samples, labels, vad.frame_size, gap),
+    }
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Distancia de edición entre palabras dividida por las palabras de la referencia."""
+    ref = [word.strip('.,;:¿?¡!').lower() for word in reference.split()]
+    hyp = [word.strip('.,;:¿?¡!').lower() for word in hypothesis.split()]
+    if not ref:
+        return float(bool(hyp))
+    row = np.arange(len(hyp) + 1)
+    for index, word in enumerate(ref, 1):
+        previous, row = row, np.empty_like(row)
+        row[0] = index
+        for column, other in enumerate(hyp, 1):
+            row[column] = min(previous[column] + 1, row[column - 1] + 1,
+                              previous[column - 1] + (word != other))
+    return row[-1] / len(ref)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?')
+    parser.add_argument('--gap-ms', type=int, default=None, help="hueco por pausa (por defecto SILENCE_GAP_MS)")
+    parser.add_argument('--transcribe', action='store_true', help="transcribir y medir WER y latencia")
+    args = parser.parse_args()
+
+    gap = gap_frames(FRAME_DURATION, SILENCE_GAP_MS if args.gap_ms is None else args.gap_ms)
+    if args.directory:
+        paths = sorted(glob.glob(os.path.join(args.directory, '*.wav')))
+        fixtures = {os.path.basename(path): load_wav(path) for path in paths}
+        references = {os.path.basename(path): open(path[:-4] + '.txt', encoding='utf-8').read()
+                      for path in paths if os.path.exists(path[:-4] + '.txt')}
+    else:
+        fixtures, references = synthetic_fixtures(), {}
+
+    transcriber = None
+    if args.transcribe:
+        from backends import create_transcriber, groq_client_factory
+        transcriber = create_transcriber(groq_client_factory(), SAMPLE_RATE)
+
+    totals = dict.fromkeys(('completa', 'recortada', 'compactada'), 0.0)
+    print(f"{'fichero':<20} {'completa s':>11} {'recortada s':>12} {'compactada s':>13} {'ahorro':>7}")
+    for name, samples in fixtures.items():
+        audio = variants(samples, gap)
+        seconds = {variant: len(data) / SAMPLE_RATE for variant, data in audio.items()}
+        for variant, value in seconds.items():
+            totals[variant] += value
+        print(f"{name:<20} {seconds['completa']:>11.1f} {seconds['recortada']:>12.1f}"
+              f" {seconds['compactada']:>13.1f} {1 - seconds['compactada'] / seconds['completa']:>7.1%}")
+        if transcriber is None:
+            continue
+        texts, latencies = {}, {}
+        for variant, data in audio.items():
+            start = time.perf_counter()
+            texts[variant] = transcriber.transcribe(data, basename=name)
+            latencies[variant] = time.perf_counter() - start
+        reference = references.get(name, texts['completa'])
+        print("   " + ", ".join(f"{variant}: WER {word_error_rate(reference, texts[variant]):.1%}"
+                                f" en {latencies[variant]:.2f} s" for variant in audio))
+
+    if totals['completa']:
+        print(f"Total: {totals['completa']:.1f} s → {totals['recortada']:.1f} s recortada"
+              f" → {totals['compactada']:.1f} s compactada"
+              f" ({1 - totals['compactada'] / totals['completa']:.1%} menos audio)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# benchmarks/bench_ingest.py
+"""Carga sintética sobre ingest_server.py con clientes TCP en localhost.
+
+Arranca el servidor falso de Groq y el servidor de ingesta como procesos
+aparte y conecta N sesiones que envían "preguntas" sintéticas (voz de 2.5 s
+y 2 s de silencio) al ritmo indicado. Mide la latencia desde el fin de cada
+pregunta hasta la respuesta y el reparto entre sesiones (equidad).
+
+Uso:
+    python benchmarks/bench_ingest.py --sessions 50 --questions 3 --speed 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_RATE = 16000
+FRAME_BYTES = 960  # 30 ms de PCM 16-bit
+CHUNK_FRAMES = 10
+
+
+def synthetic_interview(questions: int) -> bytes:
+    """Preguntas sintéticas: tono con envolvente silábica y silencio entre ellas."""
+    t = np.arange(int(SAMPLE_RATE * 2.5)) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    voiced = (np.sin(2 * np.pi * 140 * t) + 0.6 * np.sin(2 * np.pi * 280 * t)) * envelope * 6000
+    silence = np.zeros(SAMPLE_RATE * 2)
+    return np.concatenate([np.concatenate([voiced, silence])] * questions).astype(np.int16).tobytes()
+
+
+async def client(port: int, name: str, audio: bytes, speed: float) -> dict:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((json.dumps({'session': name, 'language': 'es'}) + '\n').encode())
+    result = {'latencies': [], 'dropped': 0, 'errors': []}
+
+    async def receive():
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            event = json.loads(line)
+            if event['event'] == 'answer':
+                result['latencies'].append(event['latency'])
+            elif event['event'] == 'dropped':
+                result['dropped'] += 1
+            elif event['event'] == 'error':
+                result['errors'].append(event['error'])
+            elif event['event'] == 'closed':
+                return
+
+    receiver = asyncio.create_task(receive())
+    chunk = FRAME_BYTES * CHUNK_FRAMES
+    interval = CHUNK_FRAMES * 0.03 / speed
+    start = time.perf_counter()
+    for index, offset in enumerate(range(0, len(audio), chunk)):
+        writer.write(audio[offset:offset + chunk])
+        await writer.drain()
+        # Ritmo fijo respecto al inicio: los retrasos no se acumulan
+        delay = start + (index + 1) * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    writer.write_eof()
+    await receiver
+    writer.close()
+    return result
+
+
+async def run_clients(port: int, sessions: int, questions: int, speed: float):
+    audio = synthetic_interview(questions)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client(port, f"bench-{index}", audio, speed)
+                                     for index in range(sessions)))
+    elapsed = time.perf_counter() - start
+    return results, elapsed, len(audio) / 2 / SAMPLE_RATE
+
+
+def wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            asyncio.run(asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), 1))
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"el puerto {port} no respondió")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga sintética del servidor de ingesta")
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--questions', type=int, default=3, help="preguntas por sesión")
+    parser.add_argument('--speed', type=float, default=1.0, help="velocidad respecto al tiempo real")
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--port', type=int, default=8771)
+    parser.add_argument('--fake-port', type=int, default=8766)
+    parser.add_argument('--delay', type=float, default=0.02, help="retardo del servidor falso")
+    args = parser.parse_args()
+
+    env = dict(os.environ, GROQ_API_KEY='benchmark', GROQ_BASE_URL=f"http://127.0.0.1:{args.fake_port}",
+               WHISPER_MODEL_NAME='benchmark-whisper', MODEL_NAME='benchmark-llm',
+               RESPONSE_CACHE='false', METRICS_PORT='0', METRICS_FILE='')
+    fake = subprocess.Popen([sys.executable, 'fake_groq_server.py', '--port', str(args.fake_port),
+                             '--delay', str(args.delay)], cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    server = subprocess.Popen([sys.executable, 'ingest_server.py', '--port', str(args.port),
+                               '--processes', str(args.processes)],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.fake_port)
+        wait_for_port(args.port)
+        results, elapsed, audio_seconds = asyncio.run(
+            run_clients(args.port, args.sessions, args.questions, args.speed))
+    finally:
+        server.terminate()
+        fake.terminate()
+        server.wait()
+        fake.wait()
+
+    latencies = np.array([value for result in results for value in result['latencies']])
+    medians = np.array([np.median(result['latencies']) for result in results if result['latencies']])
+    answered = len(latencies)
+    expected = args.sessions * args.questions
+    errors = sum(len(result['errors']) for result in results)
+    print(f"🛰️  {args.sessions} sesiones x {args.questions} preguntas a {args.speed}x"
+          f" ({args.processes} proceso(s)): {answered}/{expected} respondidas,"
+          f" {sum(result['dropped'] for result in results)} descartadas, {errors} errores")
+    print(f"   {args.sessions * audio_seconds / elapsed:.1f} s de audio por segundo en {elapsed:.1f} s")
+    if answered:
+        print(f"   Latencia fin de pregunta → respuesta: p50 {np.percentile(latencies, 50) * 1000:.0f} ms,"
+              f" p95 {np.percentile(latencies, 95) * 1000:.0f} ms, máx {latencies.max() * 1000:.0f} ms")
+        print(f"   Equidad: mediana por sesión entre {medians.min() * 1000:.0f} y {medians.max() * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_vad.py
+"""Compara WebRTC VAD con y sin la pre-compuerta de energía sobre WAVs.
+
+Para cada fichero (PCM 16-bit mono a 16 kHz) clasifica todos los frames con
+ambas variantes e informa la coincidencia de etiquetas, la proporción de
+frames que la compuerta evita enviar a WebRTC y el tiempo de CPU por hora de
+audio. Sin directorio se usa un conjunto sintético (silencio, ruido de sala,
+siseo y ráfagas tonales tipo voz).
+
+Uso:
+    python benchmarks/bench_vad.py [directorio_wav] [--aggressiveness 1]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+import webrtcvad
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vad import EnergyGate, GatedVad
+
+SAMPLE_RATE = 16000
+FRAME_DURATION = 30
+
+
+def load_wav(path: str) -> np.ndarray:
+    with wave.open(path, 'rb') as wav_file:
+        if (wav_file.getframerate(), wav_file.getsampwidth(), wav_file.getnchannels()) != (SAMPLE_RATE, 2, 1):
+            raise ValueError(f"{path}: se esperaba PCM 16-bit mono a {SAMPLE_RATE} Hz")
+        return np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+
+
+def synthetic_fixtures(seconds: int = 600) -> dict:
+    """Señales de prueba reproducibles."""
+    rng = np.random.default_rng(42)
+    t = np.arange(SAMPLE_RATE * seconds) / SAMPLE_RATE
+
+    def bursts(signal):
+        # 1.5 s de "voz" cada 5 s, con envolvente silábica a 4 Hz
+        envelope = ((t % 5) < 1.5) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2)
+        return signal * envelope
+
+    voiced = (np.sin(2 * np.pi * 140 * t) + 0.6 * np.sin(2 * np.pi * 280 * t)
+              + 0.3 * np.sin(2 * np.pi * 1200 * t))
+    room = rng.standard_normal(len(t)) * 40
+    return {
+        'silencio_digital': np.zeros(len(t), dtype=np.int16),
+        'ruido_sala': room.astype(np.int16),
+        'siseo': (rng.standard_normal(len(t)) * 150).astype(np.int16),
+        'voz_en_silencio': (bursts(voiced) * 6000).astype(np.int16),
+        'voz_con_ruido': (bursts(voiced) * 6000 + room).astype(np.int16),
+    }
+
+
+def run(samples: np.ndarray, aggressiveness: int, gated: bool):
+    vad = GatedVad(webrtcvad.Vad(aggressiveness), SAMPLE_RATE, FRAME_DURATION,
+                   gate=EnergyGate() if gated else None)
+    start = time.process_time()
+    labels = vad.classify_buffer(samples)
+    return labels, time.process_time() - start, vad.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?')
+    parser.add_argument('--aggressiveness', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.directory:
+        fixtures = {os.path.basename(path): load_wav(path)
+                    for path in sorted(glob.glob(os.path.join(args.directory, '*.wav')))}
+    else:
+        fixtures = synthetic_fixtures()
+
+    print(f"{'fichero':<20} {'coincid.':>9} {'voz ref':>8} {'voz comp':>9} "
+          f"{'evitados':>9} {'CPU s/h ref':>12} {'CPU s/h comp':>13}")
+    for name, samples in fixtures.items():
+        hours = len(samples) / SAMPLE_RATE / 3600
+        reference, ref_cpu, _ = run(samples, args.aggressiveness, gated=False)
+        labels, gated_cpu, stats = run(samples, args.aggressiveness, gated=True)
+        agreement = np.mean(reference == labels) if len(labels) else 1.0
+        print(f"{name:<20} {agreement:>9.2%} {reference.mean():>8.2%} {labels.mean():>9.2%} "
+              f"{stats['gated_ratio']:>9.2%} {ref_cpu / hours:>12.2f} {gated_cpu / hours:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
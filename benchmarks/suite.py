@@ -0,0 +1,311 @@
+# benchmarks/suite.py
+"""Micro-benchmarks de los caminos calientes, sin red ni micrófono.
+
+Mide el detector (por oración, en español e inglés, la detección de idioma
+y cada ayudante de _analyze_question), el VAD a través de
+VoiceProcessor.process_audio, la codificación WAV de create_wav_buffer / RecordingController.create_wav y el
+coste de RecordingController.audio_callback según la longitud del buffer.
+Las llamadas remotas usan un cliente Groq falso.
+
+Uso:
+    python benchmarks/suite.py --save benchmarks/baseline.json
+    python benchmarks/suite.py --compare benchmarks/baseline.json --threshold 0.25
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Los constructores leen estas variables; el cliente real se sustituye después
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+os.environ.setdefault('WHISPER_MODEL_NAME', 'benchmark-whisper')
+os.environ.setdefault('MODEL_NAME', 'benchmark-llm')
+os.environ['STREAM_RESPONSES'] = 'false'
+
+from bench_vad import synthetic_fixtures
+
+SENTENCES = {
+    'en': [
+        "How would you implement a distributed cache for a microservice architecture?",
+        "Tell me about a time you had a conflict with your team and how you resolved it.",
+        "Explain the architecture of a system that processes payments and what you would do if the database fails.",
+        "What would you do if a deployment broke production on a Friday evening?",
+    ],
+    'es': [
+        "¿Cómo implementarías una caché distribuida para una arquitectura de microservicios?",
+        "Cuéntame sobre una vez que tuviste un conflicto con tu equipo y cómo lo resolviste.",
+        "¿Qué harías si un despliegue rompe producción y la base de datos no responde?",
+        "Explica la arquitectura de un sistema de pagos y el proceso de versión con docker y kubernetes.",
+    ],
+}
+
+
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_BLOCK = 10  # Muestras consecutivas que se remuestrean juntas
+
+
+class FakeGroq:
+    """Cliente con la forma de groq.Groq que responde al instante."""
+
+    def __init__(self, transcript="How would you implement a cache?", answer="Use an LRU."):
+        transcription = SimpleNamespace(text=transcript)
+        message = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(
+            create=lambda **kwargs: transcription))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **kwargs: message))
+
+
+def measure(func, repeat: int, inner: int = 1, warmup: int = 10) -> dict:
+    """Tiempos por llamada en microsegundos.
+
+    Cada muestra promedia `inner` llamadas seguidas para que las funciones de
+    pocos microsegundos no queden dominadas por la resolución del reloj. El
+    calentamiento deja cachés y asignador en régimen antes de medir.
+    """
+    for _ in range(warmup):
+        func()
+    samples = np.empty(repeat)
+    for index in range(repeat):
+        start = time.perf_counter()
+        for _ in range(inner):
+            func()
+        samples[index] = (time.perf_counter() - start) / inner
+    samples *= 1e6
+    return {
+        'unit': 'us',
+        'n': repeat * inner,
+        'mean': float(samples.mean()),
+        'p50': float(np.percentile(samples, 50)),
+        'p95': float(np.percentile(samples, 95)),
+        'ci': median_ci(samples),
+    }
+
+
+def median_ci(samples, block: int = BOOTSTRAP_BLOCK, resamples: int = BOOTSTRAP_RESAMPLES) -> float:
+    """Semiancho relativo del intervalo de confianza del 95% de la mediana.
+
+    Bootstrap por bloques de muestras consecutivas: una racha lenta (otro
+    proceso, frecuencia de la CPU) afecta a varias muestras seguidas y el
+    intervalo debe reflejarlo. Mide cuánto puede moverse la mediana, no la
+    dispersión de las muestras sueltas: una cola larga apenas lo ensancha.
+    """
+    samples = np.asarray(samples, dtype=float)
+    median = float(np.median(samples))
+    block = max(min(block, len(samples) // 2), 1)
+    count = len(samples) // block
+    if count < 2 or not median:
+        return 0.0
+    blocks = samples[:count * block].reshape(count, block)
+    rng = np.random.default_rng(0)  # Reproducible: misma entrada, mismo intervalo
+    chosen = blocks[rng.integers(0, count, (resamples, count))].reshape(resamples, -1)
+    low, high = np.percentile(np.median(chosen, axis=1), [2.5, 97.5])
+    return float((high - low) / 2 / median)
+
+
+def bench_detector(results: dict, repeat: int):
+    from question_detector import QuestionDetector
+
+    detector = QuestionDetector()
+    for language, sentences in SENTENCES.items():
+        # La detección de idioma no depende de spaCy
+        results[f'detector._detect_language.{language}'] = measure(
+            lambda: detector._detect_language(sentences[0]), repeat, inner=20)
+        try:
+            nlp = detector._get_nlp(language)
+        except OSError as e:
+            results[f'detector.analyze_text.{language}'] = {'skipped': str(e).splitlines()[0]}
+            continue
+
+        text = ' '.join(sentences)
+        stats = measure(lambda: detector.analyze_text(text), repeat)
+        for key in ('mean', 'p50', 'p95'):
+            stats[key] /= len(sentences)  # Latencia por oración
+        results[f'detector.analyze_text.{language}'] = stats
+
+        sent = next(iter(nlp(sentences[0]).sents))
+        matches = detector.matchers[language].scan(sent.text)
+        keywords = detector._extract_keywords(sent, language)
+        helpers = {
+            'scan': lambda: detector.matchers[language].scan(sent.text),
+            '_determine_question_type': lambda: detector._determine_question_type(matches),
+            '_analyze_complexity': lambda: detector._analyze_complexity(sent.text, matches),
+            '_extract_keywords': lambda: detector._extract_keywords(sent, language),
+            '_calculate_confidence': lambda: detector._calculate_confidence(sent.text, matches, keywords),
+            '_requires_code_example': lambda: detector._requires_code_example(matches),
+            '_estimate_response_length': lambda: detector._estimate_response_length(sent.text, matches),
+            '_has_follow_up_potential': lambda: detector._has_follow_up_potential(matches),
+            '_extract_technical_terms': lambda: detector._extract_technical_terms(matches),
+            '_extract_context': lambda: detector._extract_context(sent, language),
+        }
+        for name, helper in helpers.items():
+            results[f'detector.{name}.{language}'] = measure(helper, repeat, inner=20)
+
+
+def bench_vad(results: dict, seconds: int, runs: int = 7):
+    from backends import GroqCompleter, GroqTranscriber
+    from pipeline import BLOCK, StageQueue
+    from voice_processor import VoiceProcessor
+
+    processor = VoiceProcessor()
+    processor.transcriber = GroqTranscriber(FakeGroq(), 'benchmark-whisper')
+    processor.completer = GroqCompleter(FakeGroq(), 'benchmark-llm')
+    samples = synthetic_fixtures(seconds)['voz_con_ruido']
+    frames = [bytes(frame) for frame in samples[:len(samples) // processor.frame_size
+                                                * processor.frame_size]
+              .reshape(-1, processor.frame_size)]
+
+    # Varias pasadas: con una sola no se sabe cuánto puede variar la mediana
+    rates = []
+    for _ in range(runs):
+        processor.sample_queue = StageQueue("benchmark", len(frames) + 1, BLOCK)
+        for frame in frames:
+            processor.sample_queue.put(frame)
+
+        stop = threading.Event()
+        with contextlib.redirect_stdout(io.StringIO()):
+            worker = threading.Thread(target=processor.process_audio, args=(stop,), daemon=True)
+            start = time.perf_counter()
+            worker.start()
+            while processor.sample_queue.qsize():
+                time.sleep(0.001)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            worker.join()
+        rates.append(len(frames) / elapsed)
+
+    median = float(np.median(rates))
+    results['vad.process_audio'] = {
+        'unit': 'frames/s',
+        'n': len(frames) * runs,
+        'mean': median,
+        'ci': median_ci(rates, block=1),  # Cada pasada ya es una muestra independiente
+        'higher_is_better': True,
+    }
+
+
+def bench_wav(results: dict, repeat: int):
+    from iris_base import RecordingController
+    from voice_processor import VoiceProcessor
+
+    processor = VoiceProcessor()
+    controller = RecordingController()
+    for seconds in (5, 30):
+        pcm = (np.random.default_rng(0).standard_normal(16000 * seconds) * 3000).astype(np.int16)
+        pcm_bytes = pcm.tobytes()
+        results[f'wav.create_wav_buffer.{seconds}s'] = measure(
+            lambda: processor.create_wav_buffer(pcm_bytes), repeat)
+
+        controller.audio_buffer.clear()
+        controller.audio_buffer.append(pcm)
+        results[f'wav.create_wav.{seconds}s'] = measure(controller.create_wav, repeat)
+
+
+def bench_audio_callback(results: dict, repeat: int):
+    from iris_base import RecordingController
+
+    controller = RecordingController()
+    block = (np.random.default_rng(0).standard_normal((512, 1)) * 3000).astype(np.int16)
+    chunk = np.zeros(16000 * 60, dtype=np.int16)
+    controller.is_recording = True
+    filled = 0
+    for minutes in (0, 1, 5, 10):
+        while filled < minutes:
+            controller.audio_buffer.append(chunk)
+            filled += 1
+        results[f'callback.audio_callback.{minutes}min'] = measure(
+            lambda: controller.audio_callback(block, len(block), None, None), repeat, inner=20)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Imprime el informe de regresiones y devuelve cuántas hay.
+
+    Se compara la mediana (p50), más estable que la media frente a pausas del
+    sistema; los throughputs solo tienen la mediana de varias pasadas. Un
+    cambio es regresión si supera el umbral más el intervalo de confianza de
+    la mediana de la línea base. La ejecución actual nunca ensancha el límite:
+    una regresión que además añade ruido no se tapa a sí misma. Entre el
+    umbral y el límite se marca como "ruido" y no cuenta.
+    """
+    regressions = 0
+    print(f"\n{'benchmark':<48} {'base':>12} {'actual':>12} {'cambio':>9} {'límite':>7}  estado")
+    for name in sorted(set(current) | set(baseline)):
+        new, old = current.get(name), baseline.get(name)
+        if not new or not old or 'mean' not in new or 'mean' not in old:
+            print(f"{name:<48} {'-':>12} {'-':>12} {'-':>9} {'-':>7}  sin comparar")
+            continue
+        metric = 'p50' if 'p50' in new and 'p50' in old else 'mean'
+        change = (new[metric] - old[metric]) / old[metric]
+        worse = -change if new.get('higher_is_better') else change
+        tolerance = threshold + old.get('ci', 0.0)
+        if worse > tolerance:
+            status = "❌ REGRESIÓN"
+            regressions += 1
+        elif worse > threshold:
+            status = "≈ ruido"
+        elif worse < -tolerance:
+            status = "✅ mejora"
+        else:
+            status = "ok"
+        print(f"{name:<48} {old[metric]:>12.2f} {new[metric]:>12.2f} {change:>+9.1%}"
+              f" {tolerance:>7.0%}  {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--vad-seconds', type=int, default=120)
+    parser.add_argument('--save', help="guardar resultados como línea base JSON")
+    parser.add_argument('--compare', help="línea base JSON con la que comparar")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="empeoramiento relativo mínimo para una regresión (más el IC de la mediana base)")
+    args = parser.parse_args()
+
+    results = {}
+    bench_detector(results, args.repeat)
+    bench_vad(results, args.vad_seconds)
+    bench_wav(results, args.repeat)
+    bench_audio_callback(results, args.repeat)
+
+    for name, stats in results.items():
+        if 'skipped' in stats:
+            print(f"{name:<48} omitido: {stats['skipped']}")
+        else:
+            value = stats.get('p50', stats['mean'])
+            print(f"{name:<48} {value:>12.2f} {stats['unit']}  ±{stats.get('ci', 0.0):.1%}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as baseline:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'machine': platform.machine(),
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                },
+                'results': results,
+            }, baseline, indent=2)
+        print(f"\n💾 Línea base guardada en {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline:
+            reference = json.load(baseline)['results']
+        if compare(results, reference, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
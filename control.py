@@ -0,0 +1,148 @@
+# control.py
+"""Control de la grabación por eventos: teclas rápidas y socket local.
+
+Las teclas (s: iniciar/detener, q: salir) se registran como callbacks de
+keyboard y el socket local acepta una orden por línea (start, stop, toggle,
+status, quit). Ambos solo encolan la orden en una queue.Queue que el hilo
+principal consume con un get() bloqueante: sin sondeo, el proceso no gasta
+CPU mientras espera.
+
+Cada orden del socket recibe una línea JSON de respuesta, por ejemplo:
+    echo status | nc -U /tmp/iris.sock
+"""
+import json
+import os
+import queue
+import socketserver
+import threading
+from typing import Callable, Dict, Optional
+
+# Ruta del socket Unix, o un número de puerto TCP en 127.0.0.1 (vacío = desactivado)
+CONTROL_SOCKET = os.getenv("CONTROL_SOCKET", "")
+# Desactivar en servidores sin teclado (en Linux keyboard necesita root)
+HOTKEYS = os.getenv("HOTKEYS", "true").lower() in ('1', 'true', 'yes')
+
+COMMANDS = ('start', 'stop', 'toggle', 'status', 'quit')
+REPLY_TIMEOUT = 10.0  # s que espera el socket la respuesta del hilo principal
+
+
+class _Command:
+    """Orden encolada; quien la envía puede esperar la respuesta."""
+
+    __slots__ = ('name', 'reply', 'done')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.reply: Optional[Dict] = None
+        self.done = threading.Event()
+
+    def resolve(self, reply: Dict):
+        self.reply = reply
+        self.done.set()
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            name = line.decode(errors='replace').strip().lower()
+            if not name:
+                continue
+            control = self.server.control
+            if name == 'quit':
+                control.quit_requested.set()
+            reply = control.request(name)
+            self.wfile.write((json.dumps(reply, ensure_ascii=False) + '\n').encode())
+            if name == 'quit':
+                control.quit_replied.set()
+                return
+
+
+class _UnixControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TcpControlServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ControlPlane:
+    """Cola de órdenes alimentada por teclas rápidas y por el socket local."""
+
+    def __init__(self):
+        self.commands: 'queue.Queue[_Command]' = queue.Queue()
+        self.server: Optional[socketserver.BaseServer] = None
+        self.address = None
+        self.hotkeys = False
+        # Un quit por el socket recibe su respuesta antes de cerrar el proceso
+        self.quit_requested = threading.Event()
+        self.quit_replied = threading.Event()
+
+    def submit(self, name: str) -> _Command:
+        command = _Command(name)
+        self.commands.put(command)
+        return command
+
+    def request(self, name: str, timeout: float = REPLY_TIMEOUT) -> Dict:
+        """Encola una orden y espera la respuesta del hilo principal."""
+        if name not in COMMANDS:
+            return {'ok': False, 'error': f"orden desconocida: {name}", 'commands': list(COMMANDS)}
+        command = self.submit(name)
+        if not command.done.wait(timeout):
+            return {'ok': False, 'error': 'sin respuesta'}
+        return command.reply
+
+    def start_hotkeys(self) -> bool:
+        """Registra s y q como callbacks; False si keyboard no está disponible."""
+        try:
+            import keyboard
+            # Al soltar la tecla: mantenerla pulsada no repite la orden
+            keyboard.add_hotkey('s', self.submit, args=('toggle',), trigger_on_release=True)
+            keyboard.add_hotkey('q', self.submit, args=('quit',), trigger_on_release=True)
+        except Exception as e:
+            print(f"⚠️  Teclas rápidas no disponibles ({e}); usa CONTROL_SOCKET")
+            return False
+        self.hotkeys = True
+        return True
+
+    def start_socket(self, address: str = CONTROL_SOCKET):
+        """Abre el socket de control en un hilo que bloquea en accept()."""
+        if address.isdigit():
+            self.server = _TcpControlServer(('127.0.0.1', int(address)), _ControlHandler)
+            self.address = f"127.0.0.1:{self.server.server_address[1]}"
+        else:
+            if os.path.exists(address):
+                # Socket huérfano de una ejecución anterior
+                os.unlink(address)
+            self.server = _UnixControlServer(address, _ControlHandler)
+            os.chmod(address, 0o600)
+            self.address = address
+        self.server.control = self
+        # poll_interval=None: select() sin timeout, el hilo solo despierta con conexiones
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': None},
+                         name='control-socket', daemon=True).start()
+        print(f"🎛️  Socket de control en {self.address}")
+
+    def run(self, handlers: Dict[str, Callable[[], Dict]]):
+        """Atiende órdenes hasta 'quit'; bloquea sin consumir CPU entre órdenes."""
+        while True:
+            command = self.commands.get()
+            try:
+                reply = handlers[command.name]()
+            except Exception as e:
+                reply = {'ok': False, 'error': str(e)}
+            command.resolve(reply)
+            if command.name == 'quit':
+                return
+
+    def close(self):
+        if self.hotkeys:
+            import keyboard
+            keyboard.unhook_all_hotkeys()
+        if self.server is not None:
+            if self.quit_requested.is_set():
+                self.quit_replied.wait(1.0)
+            # Sin shutdown(): con poll_interval=None esperaría a la siguiente conexión
+            self.server.server_close()
+            if isinstance(self.server, _UnixControlServer) and os.path.exists(self.address):
+                os.unlink(self.address)
@@ -0,0 +1,169 @@
+# endpointing.py
+"""Detección adaptativa del fin de enunciado.
+
+El silencio necesario para cerrar un enunciado deja de ser fijo: parte de
+las pausas a mitad de frase observadas en la sesión (percentil alto más un
+margen) y se ajusta con la transcripción parcial tomada en la pausa corta.
+Si QuestionDetector la ve como una pregunta terminada (un "?" o un patrón
+como "how would you implement..."), la espera se acorta; si no, se alarga.
+"""
+import collections
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ADAPTIVE_ENDPOINTING = os.getenv('ADAPTIVE_ENDPOINTING', 'false').lower() in ('1', 'true', 'yes')
+ENDPOINT_MIN_SILENCE = float(os.getenv('ENDPOINT_MIN_SILENCE', '0.5'))  # Segundos
+ENDPOINT_MAX_SILENCE = float(os.getenv('ENDPOINT_MAX_SILENCE', '2.5'))  # Segundos
+COMPLETE_FACTOR = 0.5     # Espera relativa con una pregunta claramente terminada
+INCOMPLETE_FACTOR = 1.5   # Espera relativa si la frase parece seguir
+PAUSE_MARGIN = 0.2        # Segundos sobre el percentil de pausas observadas
+PAUSE_PERCENTILE = 90
+PAUSE_HISTORY = 50        # Pausas recordadas por sesión
+MIN_PAUSE_SAMPLES = 5     # Pausas necesarias antes de adaptar la base
+MIN_PAUSE_FRAMES = 3      # Silencios más cortos son ruido del VAD, no pausas
+
+# Palabras con las que una frase no suele terminar
+TRAILING_WORDS = {
+    'y', 'o', 'pero', 'que', 'si', 'de', 'del', 'el', 'la', 'los', 'las', 'un', 'una',
+    'con', 'en', 'para', 'por', 'como',
+    'and', 'or', 'but', 'that', 'if', 'of', 'the', 'a', 'an', 'to', 'with', 'in',
+    'for', 'about', 'how', 'what',
+}
+
+# Resultado de la transcripción parcial
+COMPLETE = "complete"
+INCOMPLETE = "incomplete"
+
+
+@dataclass
+class TranscriptHint:
+    verdict: str
+    audio_bytes: int  # Voz acumulada cuando se cortó el audio transcrito
+
+
+class AdaptiveEndpointer:
+    """Calcula el silencio necesario para cerrar el enunciado en curso."""
+
+    def __init__(self, detector, frame_duration: int, default_silence: float,
+                 min_silence: float = ENDPOINT_MIN_SILENCE,
+                 max_silence: float = ENDPOINT_MAX_SILENCE):
+        self.detector = detector
+        self.frame_duration = frame_duration
+        self.default_frames = self._frames(default_silence)
+        self.min_frames = self._frames(min_silence)
+        self.max_frames = self._frames(max_silence)
+        self.margin_frames = self._frames(PAUSE_MARGIN)
+        self.pauses = collections.deque(maxlen=PAUSE_HISTORY)
+        self.hint: Optional[TranscriptHint] = None
+        self.pause_bytes: Optional[int] = None  # Voz hasta la pausa corta aún abierta
+        self.hint_pauses = 0
+        self.hints_in_time = 0
+        self.hints_late = 0
+        self.utterances = 0
+        self.shortened = 0
+        self.lengthened = 0
+        self.silence_total = 0
+
+    def _frames(self, seconds: float) -> int:
+        return max(1, int(seconds * 1000 / self.frame_duration))
+
+    def reset_utterance(self):
+        self.hint = None
+        self.pause_bytes = None
+
+    def on_pause(self, voice_bytes: int):
+        """Pausa corta: la transcripción parcial de voice_bytes puede llegar a tiempo."""
+        self.pause_bytes = voice_bytes
+        self.hint_pauses += 1
+
+    def waiting_for(self, voice_bytes: int) -> bool:
+        """¿Sigue abierta la pausa de voice_bytes? Si no, la transcripción ya no sirve."""
+        return self.pause_bytes == voice_bytes
+
+    def observe_pause(self, frames: int):
+        """Pausa a mitad de enunciado: la voz volvió tras `frames` de silencio."""
+        if frames >= MIN_PAUSE_FRAMES:
+            self.pauses.append(frames)
+        self.hint = None  # La transcripción parcial ya no cubre todo el audio
+        self.pause_bytes = None
+
+    def classify(self, text: str) -> Optional[str]:
+        """¿La transcripción parcial parece una pregunta terminada?"""
+        text = text.strip()
+        if not text:
+            return None
+        words = re.findall(r'\w+', text.lower())
+        if text.endswith((',', ';', ':', '-', '...')) or (words and words[-1] in TRAILING_WORDS):
+            return INCOMPLETE
+        language = self.detector._detect_language(text)
+        matches = self.detector.matchers[language].scan(text)
+        if text.endswith('?') or self.detector._is_question(text, matches):
+            return COMPLETE
+        return INCOMPLETE
+
+    def on_transcript(self, text: str, audio_bytes: int):
+        """Transcripción del audio acumulado hasta la pausa (desde otro hilo)."""
+        if not self.waiting_for(audio_bytes):
+            # Volvió la voz o el enunciado ya se cerró sin ella
+            self.hints_late += 1
+            return
+        self.hints_in_time += 1
+        verdict = self.classify(text)
+        if verdict is not None:
+            self.hint = TranscriptHint(verdict, audio_bytes)
+
+    def base_frames(self) -> int:
+        """Silencio de referencia aprendido de las pausas de la sesión."""
+        if len(self.pauses) < MIN_PAUSE_SAMPLES:
+            return self.default_frames
+        typical = float(np.percentile(self.pauses, PAUSE_PERCENTILE))
+        return int(min(max(typical + self.margin_frames, self.min_frames), self.max_frames))
+
+    def required_frames(self, voice_bytes: int) -> int:
+        base = self.base_frames()
+        hint = self.hint
+        if hint is None or hint.audio_bytes != voice_bytes:
+            return base
+        if hint.verdict == COMPLETE:
+            return max(self.min_frames, int(base * COMPLETE_FACTOR))
+        return min(self.max_frames, max(base, int(base * INCOMPLETE_FACTOR)))
+
+    def on_utterance_end(self, silence_frames: int):
+        """Registra con cuánto silencio se cerró el enunciado."""
+        self.utterances += 1
+        self.silence_total += silence_frames
+        if silence_frames < self.default_frames:
+            self.shortened += 1
+        elif silence_frames > self.default_frames:
+            self.lengthened += 1
+        self.hint = None
+        self.pause_bytes = None
+
+    def stats(self) -> Dict:
+        return {
+            'utterances': self.utterances,
+            'shortened': self.shortened,
+            'lengthened': self.lengthened,
+            'avg_silence_ms': (self.silence_total / self.utterances * self.frame_duration
+                               if self.utterances else 0.0),
+            'base_ms': self.base_frames() * self.frame_duration,
+            'observed_pauses': len(self.pauses),
+            'hint_pauses': self.hint_pauses,
+            'hints_in_time': self.hints_in_time,
+            'hints_late': self.hints_late,
+        }
+
+    def format_stats(self) -> str:
+        info = self.stats()
+        return (f"⏳ Fin de enunciado: {info['utterances']} enunciados, {info['shortened']} acortados,"
+                f" {info['lengthened']} alargados, silencio medio {info['avg_silence_ms']:.0f} ms"
+                f" (base aprendida {info['base_ms']} ms de {info['observed_pauses']} pausas);"
+                f" transcripción parcial a tiempo en {info['hints_in_time']} de {info['hint_pauses']}"
+                f" pausas cortas ({info['hints_late']} tarde)")
@@ -0,0 +1,208 @@
+# fake_groq_server.py
+"""Servidor local que imita la API de Groq (y /api/chat de Ollama) para probar sin red.
+
+Uso:
+    python fake_groq_server.py --port 8765 --delay 0.05
+    GROQ_BASE_URL=http://127.0.0.1:8765 STREAM_RESPONSES=true python voice_processor.py
+    LLM_BACKEND=ollama OLLAMA_HOST=http://127.0.0.1:8765 python voice_processor.py
+"""
+import argparse
+import io
+import json
+import re
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = ("REST es un estilo arquitectónico sobre HTTP, mientras que SOAP "
+                  "es un protocolo basado en XML con contrato estricto.")
+DEFAULT_TRANSCRIPT = "¿Cuál es la diferencia entre REST y SOAP?"
+
+
+def multipart_file(content_type: str, body: bytes):
+    """Extrae (nombre de fichero, contenido) del campo 'file' de un multipart."""
+    match = re.search(r'boundary="?([^";]+)"?', content_type or '')
+    if not match:
+        return None, None
+    for part in body.split(b'--' + match.group(1).encode()):
+        head, _, content = part.partition(b'\r\n\r\n')
+        if b'name="file"' in head:
+            filename = re.search(rb'filename="([^"]*)"', head)
+            return (filename.group(1).decode() if filename else None,
+                    content[:-2] if content.endswith(b'\r\n') else content)
+    return None, None
+
+
+def inspect_audio(data: bytes) -> dict:
+    """Identifica el formato del audio subido y comprueba que es válido."""
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        try:
+            with wave.open(io.BytesIO(data)) as wav_file:
+                seconds = wav_file.getnframes() / wav_file.getframerate()
+            return {'format': 'wav', 'valid': True, 'seconds': seconds}
+        except (wave.Error, EOFError):
+            return {'format': 'wav', 'valid': False}
+    if data[:4] == b'fLaC':
+        return {'format': 'flac', 'valid': len(data) > 42}  # Cabecera + STREAMINFO
+    if data[:4] == b'OggS':
+        return {'format': 'opus', 'valid': b'OpusHead' in data[:128]}
+    return {'format': 'desconocido', 'valid': False}
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length) if length else b''
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append((self.path, b''))
+        if self.path.endswith('/models'):
+            self._send_json({'object': 'list', 'data': [
+                {'id': 'fake-model', 'object': 'model', 'owned_by': 'fake'}]})
+        else:
+            self._send_json({'error': {'message': f'ruta desconocida: {self.path}'}}, 404)
+
+    def do_POST(self):
+        body = self._read_body()
+        self.server.requests.append((self.path, body))
+
+        if self.path.endswith('/chat/completions'):
+            self._chat(json.loads(body or b'{}'))
+        elif self.path == '/api/chat':
+            self._ollama_chat(json.loads(body or b'{}'))
+        elif self.path.endswith('/audio/transcriptions'):
+            self._transcription(body)
+        else:
+            self._send_json({'error': {'message': f'ruta desconocida: {self.path}'}}, 404)
+
+    def _transcription(self, body):
+        filename, data = multipart_file(self.headers.get('Content-Type'), body)
+        upload = {'filename': filename, 'bytes': len(data or b'')}
+        upload.update(inspect_audio(data or b''))
+        self.server.uploads.append(upload)
+        if not upload['valid']:
+            self._send_json({'error': {'message': f"audio no válido: {upload}"}}, 400)
+            return
+        self._send_json({'text': self.server.transcript})
+
+    def _chat(self, request):
+        answer = self.server.answer
+        model = request.get('model', 'fake-model')
+        created = int(time.time())
+
+        if not request.get('stream'):
+            time.sleep(self.server.delay * len(answer.split()))
+            self._send_json({
+                'id': 'chatcmpl-fake', 'object': 'chat.completion',
+                'created': created, 'model': model,
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': answer}}],
+            })
+            return
+
+        # Respuesta en streaming (Server-Sent Events), un chunk por palabra
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        words = answer.split(' ')
+        for index, word in enumerate(words):
+            time.sleep(self.server.delay)
+            token = word if index == 0 else ' ' + word
+            self._write_event({
+                'id': 'chatcmpl-fake', 'object': 'chat.completion.chunk',
+                'created': created, 'model': model,
+                'choices': [{'index': 0, 'delta': {'content': token},
+                             'finish_reason': None}],
+            })
+        self._write_event({
+            'id': 'chatcmpl-fake', 'object': 'chat.completion.chunk',
+            'created': created, 'model': model,
+            'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+        })
+        self._write_chunk(b'data: [DONE]\n\n')
+        self._write_chunk(b'')
+
+    def _ollama_chat(self, request):
+        answer = self.server.answer
+        model = request.get('model', 'fake-model')
+        if not request.get('messages'):
+            # Petición de precarga: solo se carga el modelo
+            self._send_json({'model': model, 'done': True, 'done_reason': 'load'})
+            return
+
+        if not request.get('stream', True):
+            time.sleep(self.server.delay * len(answer.split()))
+            self._send_json({'model': model, 'done': True,
+                             'message': {'role': 'assistant', 'content': answer}})
+            return
+
+        # Streaming de Ollama: una línea JSON por fragmento
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for index, word in enumerate(answer.split(' ')):
+            time.sleep(self.server.delay)
+            token = word if index == 0 else ' ' + word
+            self._write_chunk(json.dumps({'model': model, 'done': False, 'message': {
+                'role': 'assistant', 'content': token}}).encode() + b'\n')
+        self._write_chunk(json.dumps({'model': model, 'done': True,
+                                      'message': {'role': 'assistant', 'content': ''}}).encode() + b'\n')
+        self._write_chunk(b'')
+
+    def _write_event(self, payload):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def serve(port: int = 0, delay: float = 0.05, answer: str = DEFAULT_ANSWER,
+          transcript: str = DEFAULT_TRANSCRIPT) -> ThreadingHTTPServer:
+    """Arranca el servidor en un hilo y lo devuelve (server.server_port)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeGroqHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.answer = answer
+    server.transcript = transcript
+    server.requests = []
+    server.uploads = []  # Formato, tamaño y validez de cada audio recibido
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor falso compatible con Groq")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.05,
+                        help="segundos entre chunks de la respuesta")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.delay)
+    print(f"🧪 Servidor falso escuchando en http://127.0.0.1:{server.server_port}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
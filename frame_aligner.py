@@ -0,0 +1,59 @@
+# frame_aligner.py
+from typing import Callable
+
+import numpy as np
+
+# Duraciones de frame que acepta WebRTC VAD
+VALID_FRAME_DURATIONS = (10, 20, 30)
+
+
+class FrameAligner:
+    """Reagrupa bloques de audio de cualquier tamaño en frames exactos para el VAD.
+
+    Los bloques se convierten a PCM 16-bit directamente dentro de un anillo de
+    frames int16 reservado una sola vez, y cada frame completo se entrega como
+    un memoryview precalculado de su ranura: el camino caliente no reserva
+    memoria por frame. Una ranura se reutiliza tras `slots` frames, así que el
+    consumidor debe copiar (o descartar) cada frame antes de que pase ese
+    número de frames; por eso la cola de captura debe ser más pequeña que el
+    anillo.
+    """
+
+    def __init__(self, sample_rate: int, frame_duration: int, slots: int):
+        if frame_duration not in VALID_FRAME_DURATIONS:
+            raise ValueError(f"frame_duration debe ser uno de {VALID_FRAME_DURATIONS} ms")
+        self.frame_size = int(sample_rate * frame_duration / 1000)
+        self.slots = slots
+        self._frames = np.zeros((slots, self.frame_size), dtype=np.int16)
+        self._views = [memoryview(frame).cast('B') for frame in self._frames]
+        self._slot = 0
+        self._fill = 0
+        self.frames_emitted = 0
+
+    def push(self, indata: np.ndarray, emit: Callable[[memoryview], object]):
+        """Añade un bloque (float en [-1, 1] o int16) y emite los frames completos."""
+        samples = indata[:, 0] if indata.ndim > 1 else indata
+        scale = samples.dtype != np.int16
+        total = len(samples)
+        pos = 0
+
+        while pos < total:
+            take = min(self.frame_size - self._fill, total - pos)
+            dest = self._frames[self._slot, self._fill:self._fill + take]
+            if scale:
+                # Conversión a PCM 16-bit sin arrays intermedios
+                np.multiply(samples[pos:pos + take], 32767, out=dest, casting='unsafe')
+            else:
+                dest[:] = samples[pos:pos + take]
+            self._fill += take
+            pos += take
+
+            if self._fill == self.frame_size:
+                emit(self._views[self._slot])
+                self.frames_emitted += 1
+                self._slot = (self._slot + 1) % self.slots
+                self._fill = 0
+
+    def reset(self):
+        """Descarta el frame parcial pendiente."""
+        self._fill = 0
@@ -0,0 +1,138 @@
+# incremental_transcriber.py
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+# Máximo de palabras repetidas que se buscan entre ventanas solapadas
+MAX_OVERLAP_WORDS = 8
+
+
+class IncrementalTranscriber:
+    """Transcribe un enunciado por ventanas mientras el hablante sigue hablando.
+
+    En cada pausa detectada por el VAD, si desde el último corte hay al menos
+    window_seconds de voz, se envía una nueva ventana (con overlap_seconds del
+    final de la anterior) a transcribir en segundo plano. Al terminar el
+    enunciado solo queda por transcribir la última ventana, y los textos
+    parciales se unen eliminando las palabras repetidas por el solapamiento.
+    transcribe(audio, language) recibe el idioma que indique el llamador,
+    el mismo para todas las ventanas de un enunciado.
+    """
+
+    def __init__(self, transcribe: Callable[[bytes, Optional[str]], str], sample_rate: int,
+                 window_seconds: float = 3.0, overlap_seconds: float = 0.5,
+                 max_workers: int = 2):
+        self.transcribe = transcribe
+        self.window_bytes = int(sample_rate * window_seconds) * 2
+        self.overlap_bytes = int(sample_rate * overlap_seconds) * 2
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="incremental")
+        self.reset()
+
+    def reset(self):
+        self.windows: List[Future] = []
+        self.cut = 0  # Byte donde empieza la siguiente ventana (sin solapamiento)
+
+    def on_pause(self, voice_frames, language: Optional[str] = None) -> bool:
+        """Corta una ventana si ya hay suficiente voz nueva. Devuelve si cortó."""
+        end = len(voice_frames)
+        if end - self.cut < self.window_bytes:
+            return False
+        self.windows.append(self.executor.submit(self.transcribe, self._window(voice_frames, end),
+                                                 language))
+        self.cut = end
+        return True
+
+    def finish(self, voice_frames, language: Optional[str] = None) -> str:
+        """Transcribe el resto del enunciado y une los textos parciales."""
+        return self.close_utterance(voice_frames, language)()
+
+    def close_utterance(self, voice_frames, language: Optional[str] = None) -> Callable[[], str]:
+        """Cierra el enunciado y devuelve una función que completa su transcripción.
+
+        El estado queda libre para el siguiente enunciado, de modo que la
+        transcripción final puede terminarse en otro hilo.
+        """
+        end = len(voice_frames)
+        windows = self.windows
+        tail_audio = None
+        if end > self.cut or not windows:
+            tail_audio = self._window(voice_frames, end)
+        self.reset()
+
+        def complete() -> str:
+            tail = self.transcribe(tail_audio, language) if tail_audio is not None else None
+            parts = [future.result() for future in windows]
+            if tail is not None:
+                parts.append(tail)
+            return stitch(parts)
+
+        return complete
+
+    def when_transcribed(self, callback: Callable[[str, int], None]) -> bool:
+        """Llama a callback(texto, bytes) cuando terminen las ventanas ya cortadas.
+
+        El texto unido cubre la voz hasta el último corte: sirve como
+        transcripción parcial sin volver a subir ese audio. False si aún no
+        hay ninguna ventana.
+        """
+        windows, end = list(self.windows), self.cut
+        if not windows:
+            return False
+        pending = [len(windows)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            if any(future.exception() for future in windows):
+                return  # El error se verá al cerrar el enunciado
+            callback(stitch([future.result() for future in windows]), end)
+
+        for future in windows:
+            future.add_done_callback(done)
+        return True
+
+    def partial_text(self) -> str:
+        """Texto de las ventanas ya terminadas (sin esperar a las pendientes)."""
+        done = []
+        for future in self.windows:
+            if not future.done():
+                break
+            done.append(future.result())
+        return stitch(done)
+
+    def _window(self, voice_frames, end: int) -> bytes:
+        start = max(0, self.cut - self.overlap_bytes)
+        return bytes(voice_frames[start:end])
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r'[^\w]', '', word.lower())
+
+
+def _overlap(left: List[str], right: List[str]) -> int:
+    """Número de palabras del inicio de right que repiten el final de left."""
+    left_norm = [_normalize(w) for w in left[-MAX_OVERLAP_WORDS:]]
+    right_norm = [_normalize(w) for w in right[:MAX_OVERLAP_WORDS]]
+    for size in range(min(len(left_norm), len(right_norm)), 0, -1):
+        if left_norm[-size:] == right_norm[:size]:
+            return size
+    return 0
+
+
+def stitch(parts: List[str]) -> str:
+    """Une transcripciones de ventanas solapadas sin duplicar palabras."""
+    words: List[str] = []
+    for part in parts:
+        new_words = part.split()
+        if not new_words:
+            continue
+        words.extend(new_words[_overlap(words, new_words):])
+    return ' '.join(words)
@@ -0,0 +1,370 @@
+# ingest_server.py
+"""Servidor de ingesta: muchas sesiones de entrevista simultáneas en un proceso.
+
+Protocolo (TCP local, una sesión por conexión):
+    cliente → una línea JSON {"session": "nombre", "language": "es"} y después
+              PCM 16-bit mono a 16 kHz; cerrar la escritura termina la sesión
+    servidor → una línea JSON por evento: ready, speech_start, transcript,
+               token, answer, dropped, error y closed
+
+Cada sesión tiene su propio VAD, segmentador e idioma; los backends (con su
+pool de conexiones HTTP), los modelos de spaCy y la caché de respuestas se
+comparten. Las llamadas remotas van a un pool de hilos común y cada sesión
+tiene como mucho una pregunta en curso, así que una sesión muy habladora no
+acapara el pool. Con --processes N se lanzan N procesos sobre el mismo
+puerto (SO_REUSEPORT) y el kernel reparte las conexiones entre núcleos.
+
+Uso:
+    python ingest_server.py --port 8770 --processes 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+import webrtcvad
+from dotenv import load_dotenv
+
+from audio_preprocess import gap_frames
+from backends import create_completer, create_transcriber, groq_client_factory, warm_up
+from language_id import LANGUAGE_ROUTING, LanguageSession, identifier_instance
+from metrics import metrics
+from nlp_models import registry
+from question_detector import QuestionDetector
+from response_cache import RESPONSE_CACHE, ResponseCache, cache_key
+from response_stream import ResponseResult
+from segmenter import SPEECH_START, UTTERANCE_END, UtteranceSegmenter
+from startup import Warmup
+from vad import EnergyGate, GatedVad
+from voice_processor import (AGGRESSIVENESS, CHANNELS, DEFAULT_LANGUAGE, FRAME_DURATION,
+                             MIN_UTTERANCE, SAMPLE_RATE, SILENCE_TIMEOUT, SYSTEM_PROMPT,
+                             VAD_BATCH_SIZE, VAD_PREGATE, llm_request)
+
+load_dotenv()
+
+INGEST_HOST = os.getenv('INGEST_HOST', '127.0.0.1')
+INGEST_PORT = int(os.getenv('INGEST_PORT', '8770'))
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', '32'))       # Llamadas remotas simultáneas
+INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', '2'))  # Preguntas pendientes por sesión
+INGEST_MAX_SESSIONS = int(os.getenv('INGEST_MAX_SESSIONS', '0'))  # 0 = sin límite
+INGEST_OUTBOX_SIZE = int(os.getenv('INGEST_OUTBOX_SIZE', '2048'))  # Eventos sin enviar por sesión
+HEADER_LIMIT = 4096  # Bytes máximos de la línea de cabecera
+
+
+class Session:
+    """Estado aislado de una conexión: VAD, segmentador, idioma y estadísticas."""
+
+    def __init__(self, session_id: str, language: Optional[str],
+                 writer: Optional[asyncio.StreamWriter] = None):
+        self.id = session_id
+        self.writer = writer
+        self.vad = GatedVad(webrtcvad.Vad(AGGRESSIVENESS), SAMPLE_RATE, FRAME_DURATION,
+                            gate=EnergyGate() if VAD_PREGATE else None)
+        self.segmenter = UtteranceSegmenter(SAMPLE_RATE, FRAME_DURATION,
+                                            SILENCE_TIMEOUT, MIN_UTTERANCE,
+                                            gap_frames=gap_frames(FRAME_DURATION))
+        self.language = LanguageSession(default=language or DEFAULT_LANGUAGE) if LANGUAGE_ROUTING else None
+        self.fixed_language = language or DEFAULT_LANGUAGE
+        # Los modelos de spaCy y los matchers son compartidos; el idioma es de la sesión
+        self.detector = QuestionDetector(language=self.language)
+        self.questions: asyncio.Queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+        # Acotada: un cliente que no lee se desconecta en lugar de acumular eventos
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=INGEST_OUTBOX_SIZE)
+        self.overflowed = False
+        self.frame_bytes = int(SAMPLE_RATE * FRAME_DURATION / 1000) * 2
+        self.pending = bytearray()
+        self.audio_seconds = 0.0
+        self.utterances = 0
+        self.answered = 0
+        self.dropped = 0
+        self.latency_total = 0.0
+
+    def whisper_language(self) -> Optional[str]:
+        return self.language.whisper_language() if self.language else self.fixed_language
+
+    def format_stats(self) -> str:
+        average = self.latency_total / self.answered if self.answered else 0.0
+        return (f"🎙️  {self.id}: {self.audio_seconds:.0f} s de audio, {self.utterances} preguntas,"
+                f" {self.answered} respondidas, {self.dropped} descartadas,"
+                f" latencia media {average * 1000:.0f} ms")
+
+
+class IngestServer:
+    """Sesiones concurrentes sobre backends, modelos y caché compartidos."""
+
+    def __init__(self, workers: int = INGEST_WORKERS, max_sessions: int = INGEST_MAX_SESSIONS):
+        clients = groq_client_factory()
+        self.transcriber = create_transcriber(clients, SAMPLE_RATE, CHANNELS)
+        self.completer = create_completer(clients)
+        self.cache = ResponseCache() if RESPONSE_CACHE else None
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingesta")
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, Session] = {}
+        self.total_sessions = 0
+        self.warmup = Warmup()
+        self.warmup.add('backends', lambda: warm_up(self.transcriber, self.completer))
+        if LANGUAGE_ROUTING:
+            self.warmup.add('language', identifier_instance)
+        if self.cache:
+            self.warmup.add('nlp', registry.preload)
+
+    async def start(self, host: str = INGEST_HOST, port: int = INGEST_PORT,
+                    reuse_port: bool = False) -> asyncio.AbstractServer:
+        self.warmup.start()
+        # Límite por defecto del lector (64 KiB): HEADER_LIMIT se comprueba aparte
+        # para no limitar los bloques de audio de VAD_BATCH_SIZE frames
+        return await asyncio.start_server(self.handle, host, port, reuse_port=reuse_port)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Una conexión: cabecera, audio hasta EOF y preguntas pendientes."""
+        try:
+            line = await reader.readline()
+            if not line:
+                writer.close()  # Se cerró antes de la cabecera (p. ej. una sonda del puerto)
+                return
+            if len(line) > HEADER_LIMIT:
+                raise ValueError(f"más de {HEADER_LIMIT} bytes")
+            header = json.loads(line)
+            if not isinstance(header, dict):
+                raise ValueError("se esperaba un objeto JSON")
+        except ValueError as e:
+            # También cubre una cabecera sin salto de línea más larga que el buffer del lector
+            await self._reject(writer, f"cabecera no válida: {str(e)}")
+            return
+        if self.max_sessions and len(self.sessions) >= self.max_sessions:
+            await self._reject(writer, "servidor lleno")
+            return
+
+        self.total_sessions += 1
+        session_id = str(header.get('session') or f"sesion-{self.total_sessions}")
+        if session_id in self.sessions:
+            session_id = f"{session_id}-{self.total_sessions}"
+        session = Session(session_id, header.get('language'), writer)
+        self.sessions[session_id] = session
+
+        sender = asyncio.create_task(self._send(session, writer))
+        answerer = asyncio.create_task(self._answer_loop(session))
+        self.emit(session, {'event': 'ready', 'session': session_id})
+        try:
+            await self._read_audio(session, reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            self.emit(session, {'event': 'error', 'error': str(e)})
+        finally:
+            await session.questions.put(None)  # Fin: se contestan las pendientes
+            await answerer
+            self.emit(session, {'event': 'closed', 'answered': session.answered,
+                                'dropped': session.dropped})
+            self.emit(session, None)
+            await sender
+            del self.sessions[session_id]
+            writer.close()
+            print(session.format_stats())
+
+    async def _reject(self, writer: asyncio.StreamWriter, reason: str):
+        writer.write((json.dumps({'event': 'error', 'error': reason}) + '\n').encode())
+        await writer.drain()
+        writer.close()
+
+    def emit(self, session: Session, event: Optional[Dict]):
+        """Encola un evento para el cliente (desde el bucle de eventos); None cierra el envío."""
+        if session.overflowed:
+            return
+        try:
+            session.outbox.put_nowait(event)
+        except asyncio.QueueFull:
+            self._disconnect_slow_client(session)
+
+    def _disconnect_slow_client(self, session: Session):
+        """El cliente no lee: se descartan sus eventos y se corta la conexión."""
+        session.overflowed = True
+        while not session.outbox.empty():
+            session.outbox.get_nowait()
+        session.outbox.put_nowait(None)
+        if session.writer is not None:
+            session.writer.transport.abort()
+        print(f"⚠️  {session.id}: {INGEST_OUTBOX_SIZE} eventos sin leer, se cierra la sesión")
+
+    async def _send(self, session: Session, writer: asyncio.StreamWriter):
+        # Un cliente lento solo frena su propia sesión
+        while True:
+            event = await session.outbox.get()
+            if event is None:
+                break
+            try:
+                writer.write((json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8'))
+                await writer.drain()
+            except ConnectionError:
+                break
+
+    async def _read_audio(self, session: Session, reader: asyncio.StreamReader):
+        chunk_bytes = session.frame_bytes * VAD_BATCH_SIZE
+        while True:
+            data = await reader.read(chunk_bytes)
+            if not data:
+                break
+            session.pending.extend(data)
+            count = len(session.pending) // session.frame_bytes
+            if count == 0:
+                continue
+            usable = count * session.frame_bytes
+            frames = np.frombuffer(bytes(session.pending[:usable]), dtype=np.int16)
+            del session.pending[:usable]
+            session.audio_seconds += count * FRAME_DURATION / 1000
+            self._feed(session, frames.reshape(count, -1))
+            # Cede el bucle entre lotes: ninguna sesión monopoliza el VAD
+            await asyncio.sleep(0)
+
+        event = session.segmenter.flush()
+        if event is not None and event.complete:
+            session.utterances += 1
+            self._enqueue_nowait(session, bytes(event.audio))
+
+    def _feed(self, session: Session, frames: np.ndarray):
+        start = time.perf_counter()
+        labels = session.vad.classify(frames)
+        metrics.observe('vad_batch', time.perf_counter() - start)
+        for frame, is_speech in zip(frames, labels):
+            event = session.segmenter.feed(frame, is_speech)
+            if event is None:
+                continue
+            if event.kind == SPEECH_START:
+                self.emit(session, {'event': 'speech_start'})
+            elif event.kind == UTTERANCE_END and event.complete:
+                session.utterances += 1
+                self._enqueue_nowait(session, bytes(event.audio))
+
+    def _enqueue_nowait(self, session: Session, audio: bytes):
+        """Cola acotada por sesión: si está llena se descarta la pregunta más antigua."""
+        if session.questions.full():
+            session.questions.get_nowait()
+            session.dropped += 1
+            self.emit(session, {'event': 'dropped'})
+        session.questions.put_nowait((audio, time.perf_counter()))
+
+    async def _answer_loop(self, session: Session):
+        """Contesta las preguntas de la sesión de una en una."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await session.questions.get()
+            if item is None:
+                break
+            if session.overflowed:
+                continue  # Cliente desconectado: se vacía la cola sin contestar
+            audio, detected_at = item
+
+            def emit_threadsafe(event, session=session):
+                loop.call_soon_threadsafe(self.emit, session, event)
+            try:
+                result = await loop.run_in_executor(self.executor, self._answer, session,
+                                                    audio, detected_at, emit_threadsafe)
+            except Exception as e:
+                self.emit(session, {'event': 'error', 'error': str(e)})
+                continue
+            if result is not None:
+                session.answered += 1
+                session.latency_total += time.perf_counter() - detected_at
+
+    def _answer(self, session: Session, audio: bytes, detected_at: float, emit) -> Optional[ResponseResult]:
+        """Transcribe y responde una pregunta (en un hilo del pool compartido)."""
+        self.warmup.wait('backends')
+        hint = session.whisper_language()
+        with metrics.timer('transcription'):
+            text = self.transcriber.transcribe(audio, language=hint, basename=session.id)
+        if not text:
+            return None
+        if session.language:
+            session.language.observe(text, hint)
+        emit({'event': 'transcript', 'text': text, 'language': hint})
+
+        requested_at = time.perf_counter()
+        key = language = None
+        if self.cache:
+            self.warmup.wait('nlp')
+            try:
+                language, normalized = session.detector.normalize_question(text)
+                key = cache_key(self.completer.model, SYSTEM_PROMPT, language, normalized)
+            except OSError:
+                pass  # Sin el modelo de spaCy: se responde sin caché
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                elapsed = time.perf_counter() - requested_at
+                result = ResponseResult(cached.text, elapsed, elapsed, chunks=1, cached=True)
+                emit({'event': 'answer', 'text': result.text, 'cached': True,
+                      'latency': time.perf_counter() - detected_at})
+                metrics.observe('cache_lookup', elapsed)
+                return result
+
+        result = self.completer.complete(
+            stream=True, on_token=lambda token: emit({'event': 'token', 'text': token}),
+            **llm_request(text)
+        )
+        if key and result.text:
+            self.cache.put(key, result.text, self.completer.model, language, text)
+        if result.time_to_first_token is not None:
+            metrics.observe('first_token', result.time_to_first_token)
+            metrics.observe('end_to_first_token', requested_at - detected_at + result.time_to_first_token)
+        metrics.observe('response', result.total_time)
+        metrics.observe('end_to_end', time.perf_counter() - detected_at)
+        emit({'event': 'answer', 'text': result.text, 'cached': False,
+              'latency': time.perf_counter() - detected_at})
+        return result
+
+    def format_stats(self) -> str:
+        return f"🛰️  Ingesta: {len(self.sessions)} sesiones activas, {self.total_sessions} en total"
+
+
+async def serve(host: str, port: int, reuse_port: bool = False):
+    server = IngestServer()
+    listener = await server.start(host, port, reuse_port=reuse_port)
+    metrics.start_exporters()
+    print(f"🛰️  Ingesta escuchando en {host}:{port} (pid {os.getpid()})")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        print(server.format_stats())
+        print(metrics.format_summary())
+
+
+def _run_process(host: str, port: int, reuse_port: bool):
+    try:
+        asyncio.run(serve(host, port, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de ingesta de audio multi-sesión")
+    parser.add_argument('--host', default=INGEST_HOST)
+    parser.add_argument('--port', type=int, default=INGEST_PORT)
+    parser.add_argument('--processes', type=int, default=1,
+                        help="procesos sobre el mismo puerto (uno por núcleo)")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _run_process(args.host, args.port, False)
+        return
+    workers = [multiprocessing.Process(target=_run_process, args=(args.host, args.port, True))
+               for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    # Al terminar el padre (SIGTERM) se terminan también los procesos hijos
+    signal.signal(signal.SIGTERM, lambda signum, frame: [worker.terminate() for worker in workers])
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import sounddevice as sd
 import numpy as np
 import queue
 import io
@@ -6,30 +5,57 @@ import wave
 import threading
 import os
 import time
-import keyboard
+from typing import Optional
 from dotenv import load_dotenv
-from groq import Groq
+import webrtcvad
+from audio_buffer import AudioBuffer
+from audio_encoder import TRIM_SILENCE
+from audio_preprocess import compact_silence, gap_frames
+from backends import create_completer, create_transcriber, groq_client_factory, warm_up
+from vad import EnergyGate, GatedVad
+from response_stream import STREAM_RESPONSES, print_token
+from metrics import metrics
+from startup import Warmup
+from language_id import LANGUAGE_ROUTING, LanguageSession
+from control import CONTROL_SOCKET, HOTKEYS, ControlPlane
+from concurrent.futures import ThreadPoolExecutor
 
 
 # Configuración
 SAMPLE_RATE = 16000
 CHANNELS = 1
 FORMAT = 'int16'
+FRAME_DURATION = 30  # ms, para recortar el silencio con el VAD
 API_KEY = os.getenv("GROQ_API_KEY")
+MAX_RECORDING_SECONDS = float(os.getenv("MAX_RECORDING_SECONDS", "900"))  # Se conserva lo más reciente
 
 class RecordingController:
     def __init__(self):
-        self.client = Groq(api_key=os.getenv('GROQ_API_KEY'))
-        self.whisper_model = os.getenv('WHISPER_MODEL_NAME')
-        self.model = os.getenv('MODEL_NAME')
-        self.audio_buffer = np.array([], dtype=np.int16) 
+        # Backends elegidos en el .env (Groq, Ollama, Whisper local)
+        clients = groq_client_factory()
+        self.transcriber = create_transcriber(clients, SAMPLE_RATE, CHANNELS)
+        self.completer = create_completer(clients)
+        self.warmup = Warmup()
+        # Idioma de la sesión para Whisper; sin enrutado, siempre inglés
+        self.language = LanguageSession(default="en") if LANGUAGE_ROUTING else None
+        self.warmup.add('backends', lambda: warm_up(self.transcriber, self.completer))
+        self.stream_responses = STREAM_RESPONSES
+        self.last_response = None
+        self.audio_buffer = AudioBuffer(SAMPLE_RATE, MAX_RECORDING_SECONDS, dtype=np.int16)
+        self.trim_silence = TRIM_SILENCE
         self.is_recording = False
         self.lock = threading.Lock()
         self.input_queue = queue.Queue()
         self.stream = None
+        # Un solo hilo procesa las grabaciones en orden; el control sigue respondiendo
+        self.processor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="procesado")
+        self.pending = 0
 
     def start_audio_stream(self):
         """Inicia el stream de audio"""
+        # PortAudio solo se necesita al abrir el micrófono
+        import sounddevice as sd
+
         self.stream = sd.InputStream(
             callback=self.audio_callback,
             channels=CHANNELS,
@@ -42,22 +68,65 @@ class RecordingController:
         """Callback que se ejecuta constantemente para capturar audio"""
         with self.lock:
             if self.is_recording:
-                flattened = indata.flatten().astype(np.int16)
-                self.audio_buffer = np.concatenate((self.audio_buffer, flattened))
+                # Copia O(1) amortizada al buffer preasignado
+                self.audio_buffer.append(indata.reshape(-1))
 
-    def toggle_recording(self):
-        """Alterna entre iniciar/detener grabación"""
+    def start_recording(self) -> bool:
+        """Inicia una grabación; False si ya se estaba grabando."""
         with self.lock:
             if self.is_recording:
-                # Detener grabación y procesar
-                self.process_audio()
-                self.is_recording = False
-                print("\n⏹️  Detener grabacion - Procesando...")
-            else:
-                # Iniciar nueva grabación
-                self.audio_buffer = np.array([], dtype=FORMAT)
-                self.is_recording = True
-                print("\n⏺️  Grabación iniciada... ¡Habla!")
+                return False
+            # Nueva grabación reutilizando la memoria del buffer
+            self.audio_buffer.clear()
+            self.is_recording = True
+        print("\n⏺️  Grabación iniciada... ¡Habla!")
+        return True
+
+    def stop_recording(self) -> bool:
+        """Detiene la grabación y la encola para procesarla; False si no se grababa."""
+        with self.lock:
+            if not self.is_recording:
+                return False
+            self.is_recording = False
+            self.pending += 1
+            # Copia propia: la siguiente grabación reutiliza el buffer mientras esta se procesa
+            samples = self.audio_buffer.view().copy()
+        print("\n⏹️  Detener grabacion - Procesando...")
+        self.processor.submit(self._process_pending, samples)
+        return True
+
+    def _process_pending(self, samples: np.ndarray):
+        try:
+            self.process_audio(samples)
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def toggle_recording(self) -> bool:
+        """Alterna entre iniciar/detener grabación"""
+        with self.lock:
+            recording = self.is_recording
+        return self.stop_recording() if recording else self.start_recording()
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                'recording': self.is_recording,
+                'seconds': round(self.audio_buffer.duration, 2),
+                'processing': self.pending,
+                'ready': self.warmup.is_ready('backends'),
+            }
+
+    def shutdown(self):
+        self.stream.stop()
+        # Termina la grabación en curso antes de salir
+        self.processor.shutdown(wait=True)
+
+    def snapshot(self) -> np.ndarray:
+        """Copia de las muestras grabadas, tomada bajo el lock del callback."""
+        with self.lock:
+            # view() puede reordenar el anillo: nunca en paralelo con append()
+            return self.audio_buffer.view().copy()
 
     def create_wav(self):
         """Crea archivo WAV en memoria desde el buffer"""
@@ -66,29 +135,47 @@ class RecordingController:
                 wav_file.setnchannels(CHANNELS)
                 wav_file.setsampwidth(2)
                 wav_file.setframerate(SAMPLE_RATE)
-                wav_file.writeframes(self.audio_buffer.tobytes())
+                wav_file.writeframes(self.snapshot())
             return wav_buffer.getvalue()
 
-    def process_audio(self):
-        """Procesa el audio grabado"""
+    def speech_samples(self, samples: np.ndarray) -> np.ndarray:
+        """Muestras sin silencio en los extremos y con las pausas acortadas."""
+        if self.trim_silence:
+            # VAD nuevo por grabación: WebRTC VAD guarda estado entre frames
+            vad = GatedVad(webrtcvad.Vad(1), SAMPLE_RATE, FRAME_DURATION, gate=EnergyGate())
+            labels = vad.classify_buffer(samples)
+            compacted = compact_silence(samples, labels, vad.frame_size, gap_frames(FRAME_DURATION))
+            print(f"✂️  Audio: {len(samples) / SAMPLE_RATE:.1f} s → {len(compacted) / SAMPLE_RATE:.1f} s sin pausas largas")
+            samples = compacted
+        return samples
+
+    def process_audio(self, samples: Optional[np.ndarray] = None):
+        """Procesa una grabación (por defecto, una copia del buffer actual)"""
         try:
-            if len(self.audio_buffer) == 0:
+            if samples is None:
+                samples = self.snapshot()
+            if len(samples) == 0:
                 print("⚠️  No hay audio grabado")
                 return
 
-            # Convertir a WAV
-            wav_data = self.create_wav()
+            stopped_at = time.perf_counter()
+
+            # Recortar el silencio
+            with metrics.timer('trim'):
+                samples = self.speech_samples(samples)
             
-            # Transcribir con Whisper
-            transcript = self.client.audio.transcriptions.create(
-                file=("grabacion.wav", wav_data, "audio/wav"),
-                model=self.whisper_model,
-                language="en"
-            )
-            print(f"\n📝 Transcripción: {transcript.text}")
+            # Transcribir con el backend configurado
+            self.warmup.wait('backends')
+            language = self.language.whisper_language() if self.language else "en"
+            with metrics.timer('transcription'):
+                text = self.transcriber.transcribe(samples, language=language, basename="grabacion")
+            if self.language:
+                self.language.observe(text, language)
+            print(f"\n📝 Transcripción: {text}")
             
             # Generar respuesta
-            self.generate_response(transcript.text)
+            self.generate_response(text)
+            metrics.observe('end_to_end', time.perf_counter() - stopped_at)
 
         except Exception as e:
             print(f"❌ Error procesando audio: {str(e)}")
@@ -96,8 +183,11 @@ class RecordingController:
     def generate_response(self, text):
         """Genera respuesta usando el LLM"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            if self.stream_responses:
+                print("\n🤖 Respuesta: ", end='', flush=True)
+            response = self.completer.complete(
+                stream=self.stream_responses,
+                on_token=print_token if self.stream_responses else None,
                 messages=[
                     {"role": "system", "content": "Eres un asistente especializado en apoyar entrevistas para desarrolladores de sistemas de nivel semi senior, con enfoque en Java, servicios web, AWS, arquitectura de sistemas y sistemas reactivos. Responde de manera concisa, usando un máximo de 3 líneas, en el idioma predominante de la pregunta. Si encuentras una palabra desconocida, interpreta su significado utilizando el contexto."},
                     {"role": "user", "content": text}
@@ -105,46 +195,61 @@ class RecordingController:
                 max_tokens=200,
                 temperature=0.5
             )
-            print(f"\n🤖 Respuesta: {response.choices[0].message.content}\n")
+            if self.stream_responses:
+                print("\n")
+            else:
+                print(f"\n🤖 Respuesta: {response.text}\n")
+            print(response.summary())
+            self.last_response = response
+            if response.time_to_first_token is not None:
+                metrics.observe('first_token', response.time_to_first_token)
+            metrics.observe('response', response.total_time)
         except Exception as e:
             print(f"❌ Error generando respuesta: {str(e)}")
 
-def input_handler(controller):
-    """Maneja la entrada del usuario"""
-    print("\nControles:")
-    print("  s: Iniciar/Detener grabación")
-    print("  q: Salir\n")
-    
-    while True:
-        #cmd = input("Comando: ").lower()
-        #if cmd == 's':
-        if keyboard.is_pressed('s'):
-            controller.toggle_recording()
-            time.sleep(0.5)
-        elif keyboard.is_pressed('q'):
-            print("\n🔴 Apagando sistema...")
-            controller.stream.stop()
-            exit()
+def command_handlers(controller) -> dict:
+    """Órdenes del plano de control sobre el controlador de grabación."""
+    def reply(changed: bool) -> dict:
+        return {'ok': changed, **controller.status()}
+
+    def quit():
+        print("\n🔴 Apagando sistema...")
+        return {'ok': True, **controller.status()}
+
+    return {
+        'start': lambda: reply(controller.start_recording()),
+        'stop': lambda: reply(controller.stop_recording()),
+        'toggle': lambda: reply(controller.toggle_recording()),
+        'status': lambda: {'ok': True, **controller.status()},
+        'quit': quit,
+    }
 
 def main():
     controller = RecordingController()
     controller.start_audio_stream()
+    controller.warmup.start()  # Modelos y conexión se preparan mientras ya se puede grabar
+    metrics.start_exporters()
 
-    # Hilo para entrada de usuario
-    input_thread = threading.Thread(
-        target=input_handler,
-        args=(controller,),
-        daemon=True
-    )
-    input_thread.start()
+    # Teclas rápidas y socket local solo encolan órdenes: sin sondeo
+    control = ControlPlane()
+    if CONTROL_SOCKET:
+        control.start_socket(CONTROL_SOCKET)
+    print("\nControles:")
+    if HOTKEYS and control.start_hotkeys():
+        print("  s: Iniciar/Detener grabación")
+        print("  q: Salir\n")
+    if CONTROL_SOCKET:
+        print(f"  {control.address}: start | stop | toggle | status | quit\n")
+    if not control.hotkeys and not CONTROL_SOCKET:
+        print("⚠️  Sin teclas ni CONTROL_SOCKET: solo Ctrl+C detiene el programa")
 
-    # Mantener el programa activo
     try:
-        while True:
-            time.sleep(0.1)
+        control.run(command_handlers(controller))
     except KeyboardInterrupt:
-        controller.stream.stop()
-        print("\n🔴 Sistema detenido")
+        pass
+    control.close()
+    controller.shutdown()
+    print("\n🔴 Sistema detenido")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,280 @@
+# language_id.py
+"""Identificación de idioma por n-gramas de caracteres, sin red.
+
+LanguageIdentifier es un Naive Bayes sobre unigramas, bigramas y trigramas
+de caracteres, reducidos por hash a una tabla NumPy de tamaño fijo y
+entrenado al importar con un corpus pequeño de entrevistas en español e
+inglés. Puntuar un texto es una suma de log-probabilidades indexadas: menos
+de 0,1 ms por frase.
+
+LanguageSession añade una probabilidad a priori por sesión que se actualiza
+con cada turno. Decide el idioma que se pasa a Whisper (None = que lo detecte
+Whisper, mientras la sesión no esté clara) y desempata los textos cortos o
+mezclados ("¿cómo harías el deploy con Kafka?") antes de elegir el modelo de
+spaCy.
+"""
+import os
+import re
+import threading
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LANGUAGE_ROUTING = os.getenv('LANGUAGE_ROUTING', 'true').lower() in ('1', 'true', 'yes')
+LANGUAGE_HINT_CONFIDENCE = float(os.getenv('LANGUAGE_HINT_CONFIDENCE', '0.7'))
+LANGUAGE_RECHECK_TURNS = int(os.getenv('LANGUAGE_RECHECK_TURNS', '5'))  # 0 = nunca
+
+NGRAM_ORDERS = (1, 2, 3)
+TABLE_SIZE = 1 << 14    # Cubetas del hash de n-gramas
+SMOOTHING = 0.5         # Suavizado aditivo de los recuentos
+HASH_BASE = 1000003
+PRIOR_DECAY = 0.8       # Peso de los turnos anteriores al actualizar la sesión
+PRIOR_PSEUDOCOUNT = 0.5
+DEFAULT_PRIOR_WEIGHT = 1.5  # Turnos "virtuales" a favor del idioma por defecto
+
+# Corpus de entrenamiento: frases de entrevista y lenguaje general
+CORPUS = {
+    'es': """
+        ¿Cómo implementarías una caché distribuida para una arquitectura de microservicios?
+        Cuéntame sobre una vez que tuviste un conflicto con tu equipo y cómo lo resolviste.
+        ¿Qué harías si un despliegue rompe producción y la base de datos no responde?
+        Explica la arquitectura de un sistema de pagos y cómo garantizas la consistencia.
+        ¿Cuál es la diferencia entre una clase abstracta y una interfaz en Java?
+        Describe una situación en la que tuviste que liderar un proyecto con poco tiempo.
+        ¿Por qué elegirías programación reactiva en lugar de hilos bloqueantes?
+        Háblame de tu experiencia con servicios web, colas de mensajes y la nube de Amazon.
+        ¿Cómo diseñarías un sistema que procese millones de eventos por segundo?
+        Si tuvieras que optimizar una consulta lenta, ¿qué pasos seguirías?
+        En mi último trabajo desarrollamos una plataforma de pagos con Spring y Kafka.
+        Nos encargamos de migrar el monolito a contenedores con Docker y Kubernetes.
+        La aplicación tenía problemas de memoria y tuvimos que revisar el recolector de basura.
+        ¿Qué patrones de diseño conoces y cuándo los aplicarías?
+        ¿Cómo manejarías una situación en la que un compañero no cumple sus tareas?
+        Me gusta trabajar en equipo, compartir lo que aprendo y pedir ayuda cuando la necesito.
+        El servicio expone una API y guarda los pedidos en una base de datos relacional.
+        Para las pruebas usamos integración continua y revisiones de código entre todos.
+        Buenos días, gracias por venir, vamos a empezar con algunas preguntas técnicas.
+        ¿Puedes explicar qué es la programación funcional y qué ventajas tiene?
+        Cuando hay un error en producción primero reviso los registros y las métricas.
+        La seguridad de los datos de los usuarios es una prioridad para nuestra empresa.
+        ¿Qué harías para que el sistema siga funcionando si cae una zona de disponibilidad?
+        Creo que la comunicación con el cliente es tan importante como el código.
+        Hola, ¿qué tal? Muy bien, gracias. Vale, perfecto, seguimos con la siguiente.
+        de la que el en y a los se del las un por con no una su para es al lo como más pero sus le ya o este sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos durante todos uno les ni contra otros ese eso ante ellos e esto mí antes algunos qué unos yo otro otras otra él tanto esa estos mucho quienes nada muchos cual poco ella estar estas algunas algo nosotros
+    """,
+    'en': """
+        How would you implement a distributed cache for a microservice architecture?
+        Tell me about a time you had a conflict with your team and how you resolved it.
+        What would you do if a deployment broke production and the database stopped responding?
+        Explain the architecture of a payment system and how you guarantee consistency.
+        What is the difference between an abstract class and an interface in Java?
+        Describe a situation where you had to lead a project under a tight deadline.
+        Why would you choose reactive programming instead of blocking threads?
+        Talk about your experience with web services, message queues and the Amazon cloud.
+        How would you design a system that processes millions of events per second?
+        If you had to optimize a slow query, which steps would you follow?
+        In my last job we built a payments platform with Spring and Kafka.
+        We were in charge of moving the monolith to containers with Docker and Kubernetes.
+        The application had memory issues and we had to tune the garbage collector.
+        Which design patterns do you know and when would you apply them?
+        How would you handle a situation where a teammate does not finish their tasks?
+        I like working with a team, sharing what I learn and asking for help when I need it.
+        The service exposes an API and stores the orders in a relational database.
+        For testing we use continuous integration and code reviews across the whole team.
+        Good morning, thanks for coming, we are going to start with some technical questions.
+        Can you explain what functional programming is and what its advantages are?
+        When there is an error in production I first check the logs and the metrics.
+        The security of our users' data is a priority for the whole company.
+        What would you do to keep the system running if an availability zone goes down?
+        I think communication with the customer is as important as the code itself.
+        Hello, how are you? Fine, thanks. Okay, great, let's move on to the next one.
+        the of and to in a is that for it as was with be by on not he this are or his from at which but have an they you were her she there would their we him been has when who will more no if out so said what up its about into than them can only other new some could time these two may then do first any my now such like our over man me even most made after also did many before must through back years where much your way well down should because each just those people how too little state good very make world still own see men work long get here between both life being under never day same another know while last might us great old year off come since against go came right used take three
+    """,
+}
+
+
+def _normalize(text: str) -> str:
+    """Minúsculas, solo palabras y los signos de apertura ¿ ¡, con un espacio de borde."""
+    words = re.findall(r"[^\W\d_]+(?:'[^\W\d_]+)?|[¿¡]", text.lower())
+    return f" {' '.join(words)} " if words else ""
+
+
+def ngram_hashes(text: str, orders: Sequence[int] = NGRAM_ORDERS,
+                 table_size: int = TABLE_SIZE) -> np.ndarray:
+    """Índices de tabla de todos los n-gramas de caracteres del texto (vectorizado)."""
+    normalized = _normalize(text)
+    if not normalized:
+        return np.zeros(0, dtype=np.int64)
+    codes = np.frombuffer(normalized.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    hashes = []
+    for order in orders:
+        if len(codes) < order:
+            continue
+        count = len(codes) - order + 1
+        value = np.full(count, order, dtype=np.uint64)  # El orden separa "a" de " a "
+        for offset in range(order):
+            value = value * np.uint64(HASH_BASE) + codes[offset:offset + count]
+        hashes.append(value % np.uint64(table_size))
+    return np.concatenate(hashes).astype(np.int64)
+
+
+class LanguageIdentifier:
+    """Naive Bayes de n-gramas de caracteres con tablas de log-probabilidad."""
+
+    def __init__(self, corpus: Optional[Dict[str, str]] = None,
+                 table_size: int = TABLE_SIZE):
+        corpus = corpus or CORPUS
+        self.languages = list(corpus)
+        self.table_size = table_size
+        counts = np.full((len(self.languages), table_size), SMOOTHING)
+        for row, language in enumerate(self.languages):
+            hashes = ngram_hashes(corpus[language], table_size=table_size)
+            counts[row] += np.bincount(hashes, minlength=table_size)
+        self.log_probs = np.log(counts / counts.sum(axis=1, keepdims=True))
+
+    def scores(self, text: str) -> np.ndarray:
+        """Log-verosimilitud por idioma, corregida por el solapamiento de n-gramas."""
+        hashes = ngram_hashes(text, table_size=self.table_size)
+        if len(hashes) == 0:
+            return np.zeros(len(self.languages))
+        # Los tres órdenes comparten caracteres: sin dividir, la confianza se dispara
+        return self.log_probs[:, hashes].sum(axis=1) / len(NGRAM_ORDERS)
+
+    def probabilities(self, text: str, log_prior: Optional[np.ndarray] = None) -> np.ndarray:
+        scores = self.scores(text)
+        if log_prior is not None:
+            scores = scores + log_prior
+        scores = np.exp(scores - scores.max())
+        return scores / scores.sum()
+
+    def detect(self, text: str) -> str:
+        """Idioma más probable; sin letras, el primero del corpus (español)."""
+        return self.languages[int(np.argmax(self.probabilities(text)))]
+
+
+class LanguageSession:
+    """Idioma de la sesión: a priori que se actualiza turno a turno.
+
+    Es segura entre hilos: la detección la consultan el detector, el
+    endpointer y las transcripciones en paralelo.
+    """
+
+    def __init__(self, identifier: Optional[LanguageIdentifier] = None,
+                 default: Optional[str] = None,
+                 hint_confidence: float = LANGUAGE_HINT_CONFIDENCE,
+                 recheck_turns: int = LANGUAGE_RECHECK_TURNS):
+        self._identifier = identifier
+        self.languages = list(CORPUS) if identifier is None else identifier.languages
+        self.hint_confidence = hint_confidence
+        self.recheck_turns = recheck_turns
+        self.counts = np.zeros(len(self.languages))
+        if default in self.languages:
+            self.counts[self.languages.index(default)] = DEFAULT_PRIOR_WEIGHT
+        self.turns = 0
+        self.turns_since_check = 0
+        self.switches = 0
+        self.hinted = 0
+        self.unhinted = 0
+        self.by_language = {language: 0 for language in self.languages}
+        self.last_language = None
+        self._lock = threading.Lock()
+
+    @property
+    def identifier(self) -> LanguageIdentifier:
+        # El compartido se entrena en el primer uso, no al crear la sesión
+        return self._identifier or identifier_instance()
+
+    def prior(self) -> np.ndarray:
+        counts = self.counts + PRIOR_PSEUDOCOUNT
+        return counts / counts.sum()
+
+    def detect(self, text: str) -> str:
+        """Idioma del texto teniendo en cuenta la sesión (no la actualiza)."""
+        with self._lock:
+            log_prior = np.log(self.prior())
+        probabilities = self.identifier.probabilities(text, log_prior)
+        return self.languages[int(np.argmax(probabilities))]
+
+    def observe(self, text: str, hint: Optional[str] = None) -> Optional[str]:
+        """Registra un turno transcrito y devuelve su idioma.
+
+        hint es el idioma que se pasó a Whisper para este turno (None si lo
+        detectó Whisper, que cuenta como comprobación del idioma).
+        """
+        if not _normalize(text):
+            return None
+        with self._lock:
+            log_prior = np.log(self.prior())
+        probabilities = self.identifier.probabilities(text, log_prior)
+        with self._lock:
+            language = self.languages[int(np.argmax(probabilities))]
+            self.counts = self.counts * PRIOR_DECAY + probabilities
+            self.turns += 1
+            self.by_language[language] += 1
+            if self.last_language is not None and language != self.last_language:
+                self.switches += 1
+            self.last_language = language
+            if hint is None:
+                self.unhinted += 1
+                self.turns_since_check = 0
+            else:
+                self.hinted += 1
+                self.turns_since_check += 1
+        return language
+
+    def whisper_language(self) -> Optional[str]:
+        """Idioma para Whisper, o None para que lo detecte él.
+
+        Con la sesión clara se fija el idioma (Whisper duda con clips
+        cortos); cada recheck_turns turnos se deja detectar para notar un
+        cambio de idioma que un texto transcrito con el idioma forzado no
+        revelaría.
+        """
+        with self._lock:
+            prior = self.prior()
+            best = int(np.argmax(prior))
+            if prior[best] < self.hint_confidence:
+                return None
+            if self.recheck_turns and self.turns_since_check >= self.recheck_turns:
+                return None
+            return self.languages[best]
+
+    def stats(self) -> Dict:
+        prior = self.prior()
+        return {
+            'turns': self.turns,
+            'by_language': dict(self.by_language),
+            'switches': self.switches,
+            'hinted': self.hinted,
+            'unhinted': self.unhinted,
+            'prior': {language: float(p) for language, p in zip(self.languages, prior)},
+        }
+
+    def format_stats(self) -> str:
+        info = self.stats()
+        languages = ', '.join(f"{language} {count}" for language, count in info['by_language'].items())
+        prior = ', '.join(f"{language} {p:.0%}" for language, p in info['prior'].items())
+        return (f"🌐 Idioma: {info['turns']} turnos ({languages}), {info['switches']} cambios,"
+                f" Whisper con idioma fijo {info['hinted']} veces y autodetección {info['unhinted']}"
+                f" (a priori: {prior})")
+
+
+_identifier = None
+_identifier_lock = threading.Lock()
+
+
+def identifier_instance() -> LanguageIdentifier:
+    """Identificador compartido del proceso, entrenado en el primer uso."""
+    global _identifier
+    if _identifier is None:
+        with _identifier_lock:
+            if _identifier is None:
+                _identifier = LanguageIdentifier()
+    return _identifier
+
+
+def detect_language(text: str) -> str:
+    return identifier_instance().detect(text)
@@ -0,0 +1,198 @@
+# metrics.py
+"""Histogramas de latencia por etapa y exportación en formato Prometheus.
+
+Cada observación es una búsqueda binaria en cubos fijos de escala
+logarítmica más un incremento bajo lock, así que se puede dejar activo en
+producción. Los percentiles (p50/p95/p99) se estiman interpolando dentro
+del cubo, con un error relativo acotado por el ancho del cubo (~12 %).
+"""
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_FILE = os.getenv('METRICS_FILE', '')                      # Fichero .prom para node_exporter
+METRICS_INTERVAL = float(os.getenv('METRICS_INTERVAL', '15'))     # Segundos entre escrituras
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))                # 0 = sin endpoint HTTP
+
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_NAME = "iris_stage_latency_seconds"
+
+
+def log_buckets(start: float = 0.001, end: float = 120.0, factor: float = 1.25) -> List[float]:
+    """Límites superiores de cubos en progresión geométrica."""
+    count = int(math.ceil(math.log(end / start) / math.log(factor)))
+    return [start * factor ** index for index in range(count + 1)]
+
+
+BUCKETS = log_buckets()
+
+
+class Histogram:
+    """Histograma de cubos fijos con suma, cuenta y máximo."""
+
+    def __init__(self, bounds: List[float] = BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # El último cubo es +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimación del cuantil q interpolando dentro del cubo."""
+        with self._lock:
+            counts = list(self.counts)
+            total, maximum = self.count, self.max
+        if total == 0:
+            return None
+
+        rank = q * total
+        seen = 0
+        for index, bucket in enumerate(counts):
+            if bucket and seen + bucket >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else maximum
+                value = lower + (upper - lower) * (rank - seen) / bucket
+                return min(value, maximum)
+            seen += bucket
+        return maximum
+
+    def snapshot(self) -> Dict:
+        result = {'count': self.count, 'sum': self.sum, 'max': self.max}
+        for q in QUANTILES:
+            result[f'p{int(q * 100)}'] = self.quantile(q)
+        return result
+
+
+class MetricsRegistry:
+    """Histogramas de latencia con nombre de etapa, creados al primer uso."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._exporters: List = []
+
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        return histogram
+
+    def observe(self, stage: str, seconds: float):
+        if self.enabled:
+            self.histogram(stage).observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Mide con reloj monotónico el bloque envuelto."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {stage: histogram.snapshot()
+                for stage, histogram in sorted(self.histograms.items())}
+
+    def format_summary(self) -> str:
+        parts = []
+        for stage, info in self.snapshot().items():
+            parts.append(f"{stage}: p50 {info['p50'] * 1000:.0f} ms,"
+                         f" p95 {info['p95'] * 1000:.0f} ms (n={info['count']})")
+        return "⏱️  " + " | ".join(parts) if parts else "⏱️  Sin métricas todavía"
+
+    def render_prometheus(self) -> str:
+        """Exposición en formato de texto de Prometheus (tipo summary)."""
+        lines = [
+            f"# HELP {METRIC_NAME} Latencia por etapa del camino voz → respuesta.",
+            f"# TYPE {METRIC_NAME} summary",
+        ]
+        for stage, info in self.snapshot().items():
+            for q in QUANTILES:
+                value = info[f'p{int(q * 100)}']
+                lines.append(f'{METRIC_NAME}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {info["sum"]:.6f}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {info["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Escribe el fichero de forma atómica para que nunca se lea a medias."""
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as output:
+            output.write(self.render_prometheus())
+        os.replace(temporary, path)
+
+    def start_textfile_writer(self, path: str, interval: float = METRICS_INTERVAL) -> threading.Thread:
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_textfile(path)
+                except OSError as e:
+                    print(f"⚠️  No se pudieron escribir las métricas: {str(e)}")
+
+        thread = threading.Thread(target=loop, name="metricas", daemon=True)
+        thread.start()
+        self._exporters.append(thread)
+        return thread
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Endpoint local /metrics en un hilo aparte."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metricas-http", daemon=True).start()
+        self._exporters.append(server)
+        return server
+
+    def start_exporters(self):
+        """Arranca los exportadores configurados en el entorno."""
+        if not self.enabled:
+            return
+        if METRICS_FILE:
+            self.start_textfile_writer(METRICS_FILE)
+            print(f"📈 Métricas en {METRICS_FILE} cada {METRICS_INTERVAL:.0f} s")
+        if METRICS_PORT:
+            server = self.serve(METRICS_PORT)
+            print(f"📈 Métricas en http://127.0.0.1:{server.server_address[1]}/metrics")
+
+
+# Registro compartido por todo el proceso
+metrics = MetricsRegistry()
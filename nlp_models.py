@@ -0,0 +1,91 @@
+# nlp_models.py
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Modelos de spaCy por idioma
+SPACY_MODELS = {
+    'es': "es_core_news_sm",
+    'en': "en_core_web_sm",
+}
+
+# Componentes que el detector nunca lee (solo usa pos_, is_stop, dep_ y sents)
+DISABLED_COMPONENTS = ["ner", "lemmatizer"]
+
+# Texto corto para calentar el pipeline tras la carga
+WARMUP_TEXT = {
+    'es': "¿Cómo implementarías un sistema de caché?",
+    'en': "How would you implement a caching system?",
+}
+
+
+class ModelRegistry:
+    """Registro de modelos de spaCy compartido por todo el proceso.
+
+    Cada modelo se carga una sola vez, en el primer uso, con los componentes
+    innecesarios deshabilitados.
+    """
+
+    def __init__(self, models: Optional[Dict[str, str]] = None,
+                 disable: Optional[List[str]] = None):
+        self.models = dict(models or SPACY_MODELS)
+        self.disable = list(DISABLED_COMPONENTS if disable is None else disable)
+        self._loaded = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def get(self, language: str):
+        """Devuelve el pipeline del idioma, cargándolo si aún no existe."""
+        nlp = self._loaded.get(language)
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            # Otro hilo pudo cargarlo mientras esperábamos el lock
+            nlp = self._loaded.get(language)
+            if nlp is None:
+                nlp = self._load(language)
+                self._loaded[language] = nlp
+        return nlp
+
+    def _load(self, language: str):
+        """Carga y calienta un modelo registrando sus tiempos."""
+        # spaCy tarda en importarse: solo se paga al cargar el primer modelo
+        import spacy
+
+        start = time.perf_counter()
+        nlp = spacy.load(self.models[language], exclude=self.disable)
+        loaded = time.perf_counter()
+
+        # Primera pasada para inicializar cachés internas del pipeline
+        nlp(WARMUP_TEXT.get(language, "warm up"))
+        warmed = time.perf_counter()
+
+        self._timings[language] = {
+            'model': self.models[language],
+            'pipeline': list(nlp.pipe_names),
+            'load_seconds': loaded - start,
+            'warmup_seconds': warmed - loaded,
+        }
+        return nlp
+
+    def preload(self, languages: Optional[List[str]] = None):
+        """Carga por adelantado los modelos indicados (o todos)."""
+        for language in languages or list(self.models):
+            self.get(language)
+
+    def is_loaded(self, language: str) -> bool:
+        return language in self._loaded
+
+    def timings(self) -> Dict[str, Dict]:
+        """Tiempos de carga y calentamiento por idioma."""
+        return {language: dict(info) for language, info in self._timings.items()}
+
+
+# Registro único del proceso
+registry = ModelRegistry()
+
+
+def get_nlp(language: str):
+    """Atajo para obtener un pipeline del registro compartido."""
+    return registry.get(language)
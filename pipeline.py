@@ -0,0 +1,184 @@
+# pipeline.py
+import collections
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Políticas cuando una cola está llena
+BLOCK = "block"              # El productor espera (solo para etapas que pueden esperar)
+DROP_OLDEST = "drop_oldest"  # Se descarta el elemento más antiguo
+DROP_NEWEST = "drop_newest"  # Se descarta el elemento que llega
+
+
+class QueueEmpty(Exception):
+    pass
+
+
+class StageQueue:
+    """Cola acotada con política de descarte explícita y contadores observables.
+
+    Mantiene la interfaz put/get(timeout) de queue.Queue para poder usarse
+    directamente desde el callback de audio.
+    """
+
+    def __init__(self, name: str, maxsize: int, policy: str = DROP_OLDEST):
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self.put_count = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, item, timeout: Optional[float] = None) -> bool:
+        """Encola un elemento. Devuelve False si el elemento fue descartado."""
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while len(self._items) >= self.maxsize:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self.dropped += 1
+                            return False
+                        self._cond.wait(remaining)
+
+            self._items.append(item)
+            self.put_count += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise QueueEmpty(self.name)
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def get_batch(self, max_items: int, timeout: Optional[float] = None) -> List:
+        """Espera al menos un elemento y devuelve hasta max_items de golpe."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise QueueEmpty(self.name)
+            count = min(max_items, len(self._items))
+            items = [self._items.popleft() for _ in range(count)]
+            self._cond.notify_all()
+            return items
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict:
+        return {
+            'depth': len(self._items),
+            'max_depth': self.max_depth,
+            'capacity': self.maxsize,
+            'policy': self.policy,
+            'put': self.put_count,
+            'dropped': self.dropped,
+        }
+
+
+class Stage:
+    """Etapa del pipeline: uno o varios hilos que consumen de una cola.
+
+    El resultado de handler (si no es None) se envía a la cola de salida.
+    Con batch_size > 1 handler recibe una lista de hasta batch_size elementos
+    (los que ya esperan en la cola) y devuelve una lista de resultados.
+    """
+
+    def __init__(self, name: str, inbox: StageQueue, handler: Callable,
+                 outbox: Optional[StageQueue] = None, workers: int = 1,
+                 batch_size: int = 1):
+        self.name = name
+        self.inbox = inbox
+        self.handler = handler
+        self.outbox = outbox
+        self.workers = workers
+        self.batch_size = batch_size
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{index}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.batch_size > 1:
+                    item = self.inbox.get_batch(self.batch_size, timeout=0.5)
+                else:
+                    item = self.inbox.get(timeout=0.5)
+            except QueueEmpty:
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = self.handler(item)
+            except Exception as e:
+                print(f"❌ Error en etapa {self.name}: {str(e)}")
+                result = None
+            self.busy_seconds += time.perf_counter() - start
+            if self.batch_size > 1:
+                self.processed += len(item)
+                results = result or []
+            else:
+                self.processed += 1
+                results = [] if result is None else [result]
+
+            if self.outbox is not None:
+                for value in results:
+                    if not self.outbox.put(value):
+                        print(f"⚠️  Cola {self.outbox.name} llena - elemento descartado")
+
+    def stats(self) -> Dict:
+        return {
+            'processed': self.processed,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'inbox': self.inbox.stats(),
+        }
+
+
+class Pipeline:
+    """Conjunto de etapas conectadas por colas acotadas."""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Profundidad, descartes y carga de cada etapa."""
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def format_stats(self) -> str:
+        parts = []
+        for name, info in self.stats().items():
+            inbox = info['inbox']
+            parts.append(f"{name}: {inbox['depth']}/{inbox['capacity']}"
+                         f" (máx {inbox['max_depth']}, descartados {inbox['dropped']})")
+        return "📊 " + " | ".join(parts)
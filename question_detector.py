@@ -1,9 +1,15 @@
 # question_detector.py
-from dataclasses import dataclass
-from typing import List, Dict, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
 from enum import Enum
-import spacy
 import re
+import time
+
+from language_id import identifier_instance
+from metrics import metrics
+from nlp_models import ModelRegistry, registry
 
 class QuestionType(Enum):
     # Preguntas Técnicas
@@ -35,6 +41,10 @@ class QuestionType(Enum):
 
 @dataclass
 class QuestionAnalysis:
+    __slots__ = ('text', 'question_type', 'confidence', 'complexity', 'keywords', 'context',
+                 'language', 'requires_code_example', 'expected_response_length',
+                 'follow_up_potential')
+
     text: str
     question_type: QuestionType
     confidence: float
@@ -46,6 +56,12 @@ class QuestionAnalysis:
     expected_response_length: str  # short, medium, long
     follow_up_potential: bool
 
+    def to_dict(self) -> Dict:
+        """Diccionario serializable en JSON (el tipo como su valor)."""
+        data = asdict(self)
+        data['question_type'] = self.question_type.value
+        return data
+
 class QuestionPatterns:
     def __init__(self):
         self.patterns = {
@@ -123,127 +139,436 @@ class QuestionPatterns:
             }
         }
 
+        # Indicadores de que la respuesta necesita un ejemplo de código
+        self.code_indicators = {
+            'es': ['código', 'implementar', 'programar', 'desarrollar', 
+                  'función', 'clase', 'método', 'algoritmo'],
+            'en': ['code', 'implement', 'program', 'develop', 
+                  'function', 'class', 'method', 'algorithm']
+        }
+
+        # Indicadores de potencial para preguntas de seguimiento
+        self.follow_up_indicators = {
+            'es': ['proceso', 'metodología', 'enfoque', 'estrategia', 
+                  'ejemplo', 'caso', 'experiencia'],
+            'en': ['process', 'methodology', 'approach', 'strategy', 
+                  'example', 'case', 'experience']
+        }
+
+        # Términos técnicos por categoría
+        self.technical_terms = {
+            'es': {
+                'programación': ['algoritmo', 'función', 'clase', 'método', 
+                               'variable', 'objeto', 'interfaz', 'api',
+                               'base de datos', 'framework', 'biblioteca'],
+                'arquitectura': ['diseño', 'patrón', 'arquitectura', 'sistema',
+                               'microservicio', 'escalabilidad', 'cache'],
+                'desarrollo': ['testing', 'debug', 'deployment', 'ci/cd',
+                             'versión', 'git', 'docker', 'kubernetes']
+            },
+            'en': {
+                'programming': ['algorithm', 'function', 'class', 'method',
+                              'variable', 'object', 'interface', 'api',
+                              'database', 'framework', 'library'],
+                'architecture': ['design', 'pattern', 'architecture', 'system',
+                               'microservice', 'scalability', 'cache'],
+                'development': ['testing', 'debug', 'deployment', 'ci/cd',
+                              'version', 'git', 'docker', 'kubernetes']
+            }
+        }
+
+        # Palabras que piden una respuesta más profunda (ambos idiomas)
+        self.depth_indicators = ['explica', 'describe', 'explain',
+                                 'elaborate', 'detail']
+
+        # Marcadores que refinan el tipo de pregunta (ambos idiomas)
+        self.type_markers = {
+            'coding': ['código', 'code'],
+            'architecture': ['arquitectura', 'architecture'],
+            'debugging': ['debug'],
+            'teamwork': ['equipo', 'team'],
+            'leadership': ['liderar', 'lead'],
+            'conflict': ['conflicto', 'conflict'],
+        }
+
+        # Conectores que se cuentan como palabra completa (nunca dentro de otra palabra)
+        self.connectors = {
+            'es': {'nested': ['y'], 'conditional': ['si']},
+            'en': {'nested': ['and'], 'conditional': ['if']}
+        }
+
+    def build_matchers(self) -> Dict[str, 'PatternMatcher']:
+        """Compila un matcher por idioma con todos los vocabularios."""
+        matchers = {}
+        for language, categories in self.patterns.items():
+            literals = []
+            for category, entries in categories.items():
+                for keyword in entries['keywords']:
+                    literals.append((f'{category}.keywords', keyword, False))
+            for indicator in self.code_indicators[language]:
+                literals.append(('code', indicator, False))
+            for indicator in self.follow_up_indicators[language]:
+                literals.append(('follow_up', indicator, False))
+            for terms in self.technical_terms[language].values():
+                for term in terms:
+                    literals.append(('technical_terms', term, False))
+            for word in self.depth_indicators:
+                literals.append(('depth', word, False))
+            for marker, words in self.type_markers.items():
+                for word in words:
+                    literals.append((f'marker.{marker}', word, False))
+            for kind, words in self.connectors[language].items():
+                for word in words:
+                    literals.append((kind, word, True))
+
+            regexes = [(f'{category}.patterns', pattern)
+                       for category, entries in categories.items()
+                       for pattern in entries['patterns']]
+            matchers[language] = PatternMatcher(literals, regexes)
+        return matchers
+
+
+class PatternMatches:
+    """Resultado de una pasada del matcher: términos encontrados por tipo."""
+
+    __slots__ = ('hits',)
+
+    def __init__(self, hits: Dict[str, List[str]]):
+        self.hits = hits
+
+    def terms(self, kind: str) -> Set[str]:
+        return set(self.hits.get(kind, ()))
+
+    def count(self, kind: str) -> int:
+        return len(self.hits.get(kind, ()))
+
+    def has(self, kind: str) -> bool:
+        return kind in self.hits
+
+
+class PatternMatcher:
+    """Encuentra todas las palabras clave y patrones de un idioma en una pasada.
+
+    Una única regex con todas las alternativas localiza, en C, los inicios de
+    palabra donde empieza algún término; solo en esas posiciones se confirman
+    los candidatos que comparten la primera letra. Así se detectan también
+    términos solapados ("how would you handle" y "how would you handle a
+    situation"). Los términos marcados como palabra completa exigen además un
+    límite de palabra al final.
+    """
+
+    def __init__(self, literals, regexes):
+        sources = {}  # fuente regex -> [(tipo, término)]
+        for kind, term, whole_word in literals:
+            tail = r'(?!\w)' if whole_word else ''
+            sources.setdefault(re.escape(term) + tail, []).append((kind, term))
+        for kind, pattern in regexes:
+            sources.setdefault(f'(?:{pattern})', []).append((kind, pattern))
+
+        # Candidatos agrupados por primera letra para verificar cada posición
+        self._buckets = {}
+        for source, labels in sources.items():
+            head = source.lstrip('(?:')[:1]
+            first = head if head.isalnum() else None
+            self._buckets.setdefault(first, []).append((re.compile(source), labels))
+
+        alternation = '|'.join(sorted(sources, key=len, reverse=True))
+        self._regex = re.compile(r'(?<!\w)(?=(?:' + alternation + '))')
+
+    def scan(self, text: str) -> PatternMatches:
+        """Recorre el texto (en minúsculas) una sola vez."""
+        text = text.lower()
+        hits = {}
+        wildcard = self._buckets.get(None, ())
+        for match in self._regex.finditer(text):
+            pos = match.start()
+            for candidates in (self._buckets.get(text[pos], ()), wildcard):
+                for regex, labels in candidates:
+                    if regex.match(text, pos):
+                        for kind, term in labels:
+                            hits.setdefault(kind, []).append(term)
+        return PatternMatches(hits)
+
+
+# Los matchers se compilan una sola vez por proceso
+_MATCHERS = None
+
+
+def get_matchers() -> Dict[str, PatternMatcher]:
+    global _MATCHERS
+    if _MATCHERS is None:
+        _MATCHERS = QuestionPatterns().build_matchers()
+    return _MATCHERS
+
+@dataclass
+class BatchStats:
+    """Throughput de la última llamada a analyze_texts."""
+    texts: int = 0
+    seconds: float = 0.0
+    n_process: int = 1
+
+    @property
+    def texts_per_second(self) -> float:
+        return self.texts / self.seconds if self.seconds else 0.0
+
+    @property
+    def texts_per_second_per_core(self) -> float:
+        return self.texts_per_second / self.n_process
+
+
+# Detector propio de cada proceso trabajador de analyze_texts
+_worker_detector = None
+
+
+def _init_batch_worker(models: Dict[str, str], disable: List[str]):
+    global _worker_detector
+    _worker_detector = QuestionDetector(ModelRegistry(models, disable))
+
+
+def _analyze_batch(language: str, batch: List[Tuple[int, str]],
+                   batch_size: int) -> Dict[int, List[QuestionAnalysis]]:
+    """Analiza en un proceso trabajador un lote de textos del mismo idioma."""
+    nlp = _worker_detector._get_nlp(language)
+    docs = nlp.pipe((text for _, text in batch), batch_size=batch_size)
+    return {index: _worker_detector._analyze_doc(doc, language)
+            for (index, _), doc in zip(batch, docs)}
+
+
 class QuestionDetector:
-    def __init__(self):
-        # Cargar modelos de spaCy
-        self.nlp_es = spacy.load("es_core_news_sm")
-        self.nlp_en = spacy.load("en_core_web_sm")
+    def __init__(self, models=None, language=None):
+        # Los modelos de spaCy se comparten entre instancias y se cargan en el primer uso
+        self.models = models or registry
+        # LanguageSession de la conversación; sin ella, solo el identificador
+        self.language = language
         self.patterns = QuestionPatterns().patterns
+        self.matchers = get_matchers()
+
+    @property
+    def nlp_es(self):
+        return self.models.get('es')
+
+    @property
+    def nlp_en(self):
+        return self.models.get('en')
+
+    def _get_nlp(self, language: str):
+        """Devuelve el pipeline de spaCy para el idioma."""
+        return self.models.get('es' if language == 'es' else 'en')
         
     def analyze_text(self, text: str) -> List[QuestionAnalysis]:
         """Analiza el texto completo en busca de preguntas."""
-        # Detectar idioma
+        with metrics.timer('detector'):
+            # Detectar idioma
+            language = self._detect_language(text)
+            nlp = self._get_nlp(language)
+
+            # Procesar texto
+            return self._analyze_doc(nlp(text), language)
+
+    def normalize_question(self, text: str) -> Tuple[str, str]:
+        """Forma canónica de una pregunta: (idioma, palabras clave ordenadas).
+
+        Dos formulaciones con las mismas palabras clave producen la misma
+        forma; si no hay palabras clave se usa el texto sin puntuación.
+        """
         language = self._detect_language(text)
-        nlp = self.nlp_es if language == 'es' else self.nlp_en
-        
-        # Procesar texto
-        doc = nlp(text)
+        doc = self._get_nlp(language)(text)
+        keywords = sorted({keyword.lower() for keyword in self._extract_keywords(doc, language)})
+        if not keywords:
+            keywords = re.findall(r'\w+', text.lower())
+        return language, ' '.join(keywords)
+
+    def _analyze_doc(self, doc, language: str) -> List[QuestionAnalysis]:
+        """Busca preguntas en un documento ya procesado por spaCy."""
+        matcher = self.matchers[language]
         questions = []
         
-        # Analizar cada oración
+        # Analizar cada oración reutilizando el Span del documento original
         for sent in doc.sents:
-            if self._is_question(sent.text, language):
-                analysis = self._analyze_question(sent.text, language)
+            matches = matcher.scan(sent.text)
+            if self._is_question(sent.text, matches):
+                analysis = self._analyze_question(sent, language, matches)
                 if analysis.confidence > 0.5:  # Umbral de confianza
                     questions.append(analysis)
         
         return questions
 
+    def analyze_texts(self, texts: Iterable[str], batch_size: int = 64,
+                      n_process: int = 1) -> Iterator[List[QuestionAnalysis]]:
+        """Analiza muchos textos por lotes y devuelve los resultados en orden.
+
+        Los textos se agrupan por idioma y cada grupo pasa por nlp.pipe. Con
+        n_process > 1 los lotes se reparten entre procesos que mantienen sus
+        propios modelos cargados. Solo hay un número acotado de lotes en vuelo,
+        así que la memoria no depende del tamaño del corpus. Al terminar,
+        last_batch_stats contiene el throughput obtenido.
+        """
+        stats = BatchStats(n_process=max(1, n_process))
+        self.last_batch_stats = stats
+        start = time.perf_counter()
+
+        if n_process > 1:
+            results = self._analyze_texts_parallel(texts, batch_size, n_process)
+        else:
+            results = self._analyze_texts_serial(texts, batch_size)
+
+        for questions in results:
+            stats.texts += 1
+            stats.seconds = time.perf_counter() - start
+            yield questions
+
+    def _analyze_texts_serial(self, texts: Iterable[str],
+                              batch_size: int) -> Iterator[List[QuestionAnalysis]]:
+        """Procesa ventanas de textos en este proceso con nlp.pipe."""
+        iterator = iter(texts)
+        while True:
+            window = list(islice(iterator, batch_size * 4))
+            if not window:
+                return
+
+            groups = {}
+            for index, text in enumerate(window):
+                groups.setdefault(self._detect_language(text), []).append(index)
+
+            results = [None] * len(window)
+            for language, indexes in groups.items():
+                nlp = self._get_nlp(language)
+                docs = nlp.pipe((window[i] for i in indexes), batch_size=batch_size)
+                for index, doc in zip(indexes, docs):
+                    results[index] = self._analyze_doc(doc, language)
+            yield from results
+
+    def _analyze_texts_parallel(self, texts: Iterable[str], batch_size: int,
+                                n_process: int) -> Iterator[List[QuestionAnalysis]]:
+        """Reparte lotes de un solo idioma entre procesos y reordena la salida."""
+        max_in_flight = n_process * 2
+        max_buffered = batch_size * n_process * 4
+        buckets = {}      # idioma -> [(índice, texto)] pendientes de enviar
+        located = {}      # índice -> idioma, mientras sigue en un bucket
+        in_flight = []    # futures en orden de envío
+        ready = {}        # índice -> resultado, a la espera de su turno
+        next_index = 0
+
+        def submit(language):
+            batch = buckets.pop(language, [])
+            if batch:
+                for index, _ in batch:
+                    located.pop(index, None)
+                in_flight.append(pool.submit(_analyze_batch, language, batch, batch_size))
+
+        def collect(block):
+            while in_flight and (block or in_flight[0].done()):
+                ready.update(in_flight.pop(0).result())
+                block = False
+
+        with ProcessPoolExecutor(max_workers=n_process,
+                                 initializer=_init_batch_worker,
+                                 initargs=(self.models.models, self.models.disable)) as pool:
+            for index, text in enumerate(texts):
+                language = self._detect_language(text)
+                buckets.setdefault(language, []).append((index, text))
+                located[index] = language
+                if len(buckets[language]) >= batch_size:
+                    submit(language)
+
+                # Un texto de un idioma poco frecuente no debe retener la salida
+                if len(ready) + index - next_index > max_buffered and next_index in located:
+                    submit(located[next_index])
+
+                collect(block=len(in_flight) >= max_in_flight)
+                while next_index in ready:
+                    yield ready.pop(next_index)
+                    next_index += 1
+
+            for language in list(buckets):
+                submit(language)
+            while in_flight:
+                collect(block=True)
+                while next_index in ready:
+                    yield ready.pop(next_index)
+                    next_index += 1
+
     def _detect_language(self, text: str) -> str:
-        """Detecta el idioma del texto."""
-        # Contar palabras clave en cada idioma
-        es_patterns = sum(1 for pattern in self.patterns['es']['technical']['keywords'] 
-                         if pattern in text.lower())
-        en_patterns = sum(1 for pattern in self.patterns['en']['technical']['keywords'] 
-                         if pattern in text.lower())
-        
-        return 'es' if es_patterns >= en_patterns else 'en'
+        """Detecta el idioma del texto (n-gramas de caracteres y, si hay, la sesión)."""
+        return (self.language or identifier_instance()).detect(text)
 
-    def _is_question(self, text: str, language: str) -> bool:
+    def _is_question(self, text: str, matches: PatternMatches) -> bool:
         """Determina si un texto es una pregunta."""
-        text_lower = text.lower()
-        
         # Verificar signos de interrogación
         if '?' in text:
             return True
             
         # Verificar patrones de pregunta
-        patterns = self.patterns[language]
-        for category in patterns.values():
-            if any(re.search(pattern, text_lower) for pattern in category['patterns']):
-                return True
-                
-        return False
+        return any(kind.endswith('.patterns') for kind in matches.hits)
 
-    def _analyze_question(self, text: str, language: str) -> QuestionAnalysis:
-        """Realiza un análisis completo de la pregunta."""
-        text_lower = text.lower()
+    def _analyze_question(self, sent, language: str,
+                          matches: PatternMatches) -> QuestionAnalysis:
+        """Realiza un análisis completo de la pregunta a partir de su Span ya procesado."""
+        text = sent.text
         
         # Determinar tipo de pregunta
-        question_type = self._determine_question_type(text_lower, language)
+        question_type = self._determine_question_type(matches)
         
         # Análisis de complejidad
-        complexity = self._analyze_complexity(text, language)
+        complexity = self._analyze_complexity(text, matches)
         
-        # Extraer palabras clave
-        keywords = self._extract_keywords(text, language)
+        # Extraer palabras clave (una sola vez, se reutilizan en la confianza)
+        keywords = self._extract_keywords(sent, language)
         
         # Análisis adicional
-        requires_code = self._requires_code_example(text_lower, language)
-        response_length = self._estimate_response_length(text_lower, language)
-        follow_up = self._has_follow_up_potential(text_lower, language)
+        requires_code = self._requires_code_example(matches)
+        response_length = self._estimate_response_length(text, matches)
+        follow_up = self._has_follow_up_potential(matches)
         
         return QuestionAnalysis(
             text=text,
             question_type=question_type,
-            confidence=self._calculate_confidence(text, language),
+            confidence=self._calculate_confidence(text, matches, keywords),
             complexity=complexity,
             keywords=keywords,
-            context=self._extract_context(text, language),
+            context=self._extract_context(sent, language),
             language=language,
             requires_code_example=requires_code,
             expected_response_length=response_length,
             follow_up_potential=follow_up
         )
 
-    def _determine_question_type(self, text: str, language: str) -> QuestionType:
+    def _determine_question_type(self, matches: PatternMatches) -> QuestionType:
         """Determina el tipo específico de pregunta."""
-        patterns = self.patterns[language]
-        
         # Verificar patrones técnicos
-        if any(keyword in text for keyword in patterns['technical']['keywords']):
-            if 'código' in text or 'code' in text:
+        if matches.has('technical.keywords'):
+            if matches.has('marker.coding'):
                 return QuestionType.CODING
-            elif 'arquitectura' in text or 'architecture' in text:
+            elif matches.has('marker.architecture'):
                 return QuestionType.ARCHITECTURE
-            elif 'debug' in text:
+            elif matches.has('marker.debugging'):
                 return QuestionType.DEBUGGING
             return QuestionType.TECHNICAL_KNOWLEDGE
             
         # Verificar patrones de comportamiento
-        if any(keyword in text for keyword in patterns['behavioral']['keywords']):
-            if 'equipo' in text or 'team' in text:
+        if matches.has('behavioral.keywords'):
+            if matches.has('marker.teamwork'):
                 return QuestionType.TEAMWORK
-            elif 'liderar' in text or 'lead' in text:
+            elif matches.has('marker.leadership'):
                 return QuestionType.LEADERSHIP
-            elif 'conflicto' in text or 'conflict' in text:
+            elif matches.has('marker.conflict'):
                 return QuestionType.CONFLICT
             return QuestionType.BEHAVIORAL
             
         # Verificar patrones situacionales
-        if any(keyword in text for keyword in patterns['situational']['keywords']):
+        if matches.has('situational.keywords'):
             return QuestionType.SITUATIONAL
             
         return QuestionType.GENERAL
 
-    def _analyze_complexity(self, text: str, language: str) -> str:
+    def _analyze_complexity(self, text: str, matches: PatternMatches) -> str:
         """Analiza la complejidad de la pregunta."""
         # Factores de complejidad
         factors = {
             'length': len(text.split()),
-            'technical_terms': len(self._extract_technical_terms(text, language)),
-            'nested_concepts': text.count('y') + text.count('and'),
-            'conditional_statements': text.count('si') + text.count('if')
+            'technical_terms': len(self._extract_technical_terms(matches)),
+            'nested_concepts': matches.count('nested'),
+            'conditional_statements': matches.count('conditional')
         }
         
         # Calcular score de complejidad
@@ -260,11 +585,8 @@ class QuestionDetector:
             return "medium"
         return "low"
 
-    def _extract_keywords(self, text: str, language: str) -> List[str]:
-        """Extrae palabras clave relevantes."""
-        nlp = self.nlp_es if language == 'es' else self.nlp_en
-        doc = nlp(text)
-        
+    def _extract_keywords(self, doc, language: str) -> List[str]:
+        """Extrae palabras clave relevantes de un Doc o Span ya procesado."""
         # Extraer sustantivos, verbos y adjetivos importantes
         keywords = [token.text for token in doc 
                    if token.pos_ in ['NOUN', 'VERB', 'ADJ'] 
@@ -272,7 +594,8 @@ class QuestionDetector:
         
         return list(set(keywords))  # Eliminar duplicados
 
-    def _calculate_confidence(self, text: str, language: str) -> float:
+    def _calculate_confidence(self, text: str, matches: PatternMatches,
+                              keywords: List[str]) -> float:
         """Calcula el nivel de confianza de la detección."""
         confidence = 0.0
         
@@ -280,40 +603,27 @@ class QuestionDetector:
         if '?' in text:
             confidence += 0.4
         
-        if any(pattern in text.lower() 
-               for pattern in self.patterns[language]['technical']['patterns']):
+        if matches.has('technical.patterns'):
             confidence += 0.3
             
-        if len(self._extract_keywords(text, language)) > 2:
+        if len(keywords) > 2:
             confidence += 0.2
             
         return min(confidence + 0.1, 1.0)
 
-    def _requires_code_example(self, text: str, language: str) -> bool:
+    def _requires_code_example(self, matches: PatternMatches) -> bool:
         """Determina si la pregunta requiere ejemplo de código."""
-        code_indicators = {
-            'es': ['código', 'implementar', 'programar', 'desarrollar', 
-                  'función', 'clase', 'método', 'algoritmo'],
-            'en': ['code', 'implement', 'program', 'develop', 
-                  'function', 'class', 'method', 'algorithm']
-        }
-        
         # Verificar indicadores de código
-        return any(indicator in text.lower() 
-                  for indicator in code_indicators[language])
+        return matches.has('code')
 
-    def _estimate_response_length(self, text: str, language: str) -> str:
+    def _estimate_response_length(self, text: str, matches: PatternMatches) -> str:
         """Estima la longitud esperada de la respuesta."""
         # Factores que influyen en la longitud de la respuesta
         factors = {
             'question_length': len(text.split()),
-            'complexity': len(self._extract_technical_terms(text, language)),
-            'multiple_parts': text.count('y') + text.count('and') + 
-                            text.count(','),
-            'depth_indicators': sum(1 for word in ['explica', 'describe', 
-                                                 'explain', 'describe', 
-                                                 'elaborate', 'detail'] 
-                                  if word in text.lower())
+            'complexity': len(self._extract_technical_terms(matches)),
+            'multiple_parts': matches.count('nested') + text.count(','),
+            'depth_indicators': len(matches.terms('depth'))
         }
         
         # Calcular score
@@ -330,56 +640,16 @@ class QuestionDetector:
             return "medium"
         return "short"
 
-    def _has_follow_up_potential(self, text: str, language: str) -> bool:
+    def _has_follow_up_potential(self, matches: PatternMatches) -> bool:
         """Determina si la pregunta tiene potencial para preguntas de seguimiento."""
-        follow_up_indicators = {
-            'es': ['proceso', 'metodología', 'enfoque', 'estrategia', 
-                  'ejemplo', 'caso', 'experiencia'],
-            'en': ['process', 'methodology', 'approach', 'strategy', 
-                  'example', 'case', 'experience']
-        }
-        
-        return any(indicator in text.lower() 
-                  for indicator in follow_up_indicators[language])
+        return matches.has('follow_up')
 
-    def _extract_technical_terms(self, text: str, language: str) -> Set[str]:
+    def _extract_technical_terms(self, matches: PatternMatches) -> Set[str]:
         """Extrae términos técnicos del texto."""
-        technical_terms = {
-            'es': {
-                'programación': ['algoritmo', 'función', 'clase', 'método', 
-                               'variable', 'objeto', 'interfaz', 'api',
-                               'base de datos', 'framework', 'biblioteca'],
-                'arquitectura': ['diseño', 'patrón', 'arquitectura', 'sistema',
-                               'microservicio', 'escalabilidad', 'cache'],
-                'desarrollo': ['testing', 'debug', 'deployment', 'ci/cd',
-                             'versión', 'git', 'docker', 'kubernetes']
-            },
-            'en': {
-                'programming': ['algorithm', 'function', 'class', 'method',
-                              'variable', 'object', 'interface', 'api',
-                              'database', 'framework', 'library'],
-                'architecture': ['design', 'pattern', 'architecture', 'system',
-                               'microservice', 'scalability', 'cache'],
-                'development': ['testing', 'debug', 'deployment', 'ci/cd',
-                              'version', 'git', 'docker', 'kubernetes']
-            }
-        }
-        
-        found_terms = set()
-        terms_dict = technical_terms[language]
-        
-        for category in terms_dict.values():
-            for term in category:
-                if term in text.lower():
-                    found_terms.add(term)
-                    
-        return found_terms
-
-    def _extract_context(self, text: str, language: str) -> Optional[str]:
-        """Extrae el contexto relevante de la pregunta."""
-        nlp = self.nlp_es if language == 'es' else self.nlp_en
-        doc = nlp(text)
-        
+        return matches.terms('technical_terms')
+
+    def _extract_context(self, doc, language: str) -> Optional[str]:
+        """Extrae el contexto relevante de un Doc o Span ya procesado."""
         # Extraer frases preposicionales y contexto
         context_parts = []
         
@@ -390,9 +660,7 @@ class QuestionDetector:
             
             # Buscar cláusulas subordinadas
             if token.dep_ in ['advcl', 'relcl']:
-                context_parts.append(token.subtree._._get_subtree_text())
-                #subtree_text = " ".join([t.text for t in token.subtree])
-                #context_parts.append(subtree_text)
+                context_parts.append(self._get_subtree_text(token))
                 
         return " ".join(context_parts) if context_parts else None
 
@@ -400,52 +668,14 @@ class QuestionDetector:
         """Obtiene el texto de un subárbol sintáctico."""
         return " ".join([t.text for t in token.subtree])
 
-    def get_question_statistics(self, questions: List[QuestionAnalysis]) -> Dict:
-        """Genera estadísticas sobre las preguntas analizadas."""
-        stats = {
-            'total_questions': len(questions),
-            'by_type': {},
-            'by_complexity': {
-                'high': 0,
-                'medium': 0,
-                'low': 0
-            },
-            'by_language': {
-                'es': 0,
-                'en': 0
-            },
-            'requires_code': 0,
-            'average_confidence': 0,
-            'response_length': {
-                'short': 0,
-                'medium': 0,
-                'long': 0
-            }
-        }
-        
-        for q in questions:
-            # Contar por tipo
-            q_type = q.question_type.value
-            stats['by_type'][q_type] = stats['by_type'].get(q_type, 0) + 1
-            
-            # Contar por complejidad
-            stats['by_complexity'][q.complexity] += 1
-            
-            # Contar por idioma
-            stats['by_language'][q.language] += 1
-            
-            # Contar preguntas que requieren código
-            if q.requires_code_example:
-                stats['requires_code'] += 1
-                
-            # Acumular confianza
-            stats['average_confidence'] += q.confidence
-            
-            # Contar por longitud de respuesta
-            stats['response_length'][q.expected_response_length] += 1
-            
-        # Calcular promedio de confianza
-        if questions:
-            stats['average_confidence'] /= len(questions)
-            
-        return stats
+    def get_question_statistics(self, questions) -> Dict:
+        """Genera estadísticas sobre las preguntas analizadas.
+
+        Con un QuestionStore se leen de su acumulador sin recorrer nada; con
+        una lista de QuestionAnalysis se recorre una sola vez.
+        """
+        from question_store import QuestionStats, QuestionStore
+
+        if isinstance(questions, QuestionStore):
+            return questions.stats.to_dict()
+        return QuestionStats.from_questions(questions).to_dict()
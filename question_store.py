@@ -0,0 +1,265 @@
+# question_store.py
+"""Almacén columnar de análisis de preguntas y estadísticas incrementales.
+
+QuestionStore guarda cada QuestionAnalysis en columnas NumPy: tipo,
+complejidad, idioma y longitud esperada como códigos uint8, la confianza en
+float32 y las palabras clave como índices a un vocabulario compartido (cada
+palabra se guarda una sola vez). Los objetos QuestionAnalysis se reconstruyen
+solo al leerlos.
+
+QuestionStats acumula los recuentos en O(1) por pregunta y se puede fusionar
+entre sesiones o procesos trabajadores; to_state()/from_state() lo pasan a
+JSON.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from question_detector import QuestionAnalysis, QuestionType
+
+# Tablas de códigos: el índice en la tupla es el código guardado
+QUESTION_TYPES = tuple(QuestionType)
+COMPLEXITIES = ('high', 'medium', 'low')
+LANGUAGES = ('es', 'en')
+RESPONSE_LENGTHS = ('short', 'medium', 'long')
+
+TYPE_CODES = {question_type: code for code, question_type in enumerate(QUESTION_TYPES)}
+COMPLEXITY_CODES = {name: code for code, name in enumerate(COMPLEXITIES)}
+LANGUAGE_CODES = {name: code for code, name in enumerate(LANGUAGES)}
+LENGTH_CODES = {name: code for code, name in enumerate(RESPONSE_LENGTHS)}
+
+# Bits de la columna de indicadores
+REQUIRES_CODE = 1
+FOLLOW_UP = 2
+
+
+class QuestionStats:
+    """Estadísticas acumuladas de preguntas, fusionables."""
+
+    __slots__ = ('total', 'by_type', 'by_complexity', 'by_language',
+                 'response_length', 'requires_code', 'confidence_sum')
+
+    def __init__(self):
+        self.total = 0
+        self.by_type = np.zeros(len(QUESTION_TYPES), dtype=np.int64)
+        self.by_complexity = np.zeros(len(COMPLEXITIES), dtype=np.int64)
+        self.by_language = np.zeros(len(LANGUAGES), dtype=np.int64)
+        self.response_length = np.zeros(len(RESPONSE_LENGTHS), dtype=np.int64)
+        self.requires_code = 0
+        self.confidence_sum = 0.0
+
+    def add_codes(self, type_code: int, complexity: int, language: int,
+                  length: int, requires_code: bool, confidence: float):
+        self.total += 1
+        self.by_type[type_code] += 1
+        self.by_complexity[complexity] += 1
+        self.by_language[language] += 1
+        self.response_length[length] += 1
+        self.requires_code += bool(requires_code)
+        self.confidence_sum += confidence
+
+    def add(self, analysis: QuestionAnalysis):
+        self.add_codes(TYPE_CODES[analysis.question_type],
+                       COMPLEXITY_CODES[analysis.complexity],
+                       LANGUAGE_CODES[analysis.language],
+                       LENGTH_CODES[analysis.expected_response_length],
+                       analysis.requires_code_example, analysis.confidence)
+
+    @classmethod
+    def from_questions(cls, questions: Iterable[QuestionAnalysis]) -> 'QuestionStats':
+        stats = cls()
+        for analysis in questions:
+            stats.add(analysis)
+        return stats
+
+    def merge(self, other: 'QuestionStats') -> 'QuestionStats':
+        """Suma las estadísticas de otra sesión o proceso en esta."""
+        self.total += other.total
+        self.by_type += other.by_type
+        self.by_complexity += other.by_complexity
+        self.by_language += other.by_language
+        self.response_length += other.response_length
+        self.requires_code += other.requires_code
+        self.confidence_sum += other.confidence_sum
+        return self
+
+    def __add__(self, other: 'QuestionStats') -> 'QuestionStats':
+        return QuestionStats().merge(self).merge(other)
+
+    def to_dict(self) -> Dict:
+        """Mismo formato que QuestionDetector.get_question_statistics."""
+        return {
+            'total_questions': self.total,
+            'by_type': {question_type.value: int(count)
+                        for question_type, count in zip(QUESTION_TYPES, self.by_type) if count},
+            'by_complexity': dict(zip(COMPLEXITIES, self.by_complexity.tolist())),
+            'by_language': dict(zip(LANGUAGES, self.by_language.tolist())),
+            'requires_code': self.requires_code,
+            'average_confidence': self.confidence_sum / self.total if self.total else 0,
+            'response_length': dict(zip(RESPONSE_LENGTHS, self.response_length.tolist())),
+        }
+
+    def format_stats(self) -> str:
+        info = self.to_dict()
+        top = sorted(info['by_type'].items(), key=lambda item: item[1], reverse=True)[:3]
+        types = ', '.join(f"{name} {count}" for name, count in top)
+        return (f"❓ Preguntas: {self.total} ({types}), {self.requires_code} con código,"
+                f" confianza media {info['average_confidence']:.2f}")
+
+    def to_state(self) -> Dict:
+        """Estado serializable en JSON (para JSONL o entre procesos)."""
+        return {
+            'total': self.total,
+            'by_type': {question_type.value: int(count)
+                        for question_type, count in zip(QUESTION_TYPES, self.by_type) if count},
+            'by_complexity': self.by_complexity.tolist(),
+            'by_language': self.by_language.tolist(),
+            'response_length': self.response_length.tolist(),
+            'requires_code': self.requires_code,
+            'confidence_sum': self.confidence_sum,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'QuestionStats':
+        stats = cls()
+        stats.total = state['total']
+        for value, count in state['by_type'].items():
+            stats.by_type[TYPE_CODES[QuestionType(value)]] = count
+        stats.by_complexity[:] = state['by_complexity']
+        stats.by_language[:] = state['by_language']
+        stats.response_length[:] = state['response_length']
+        stats.requires_code = state['requires_code']
+        stats.confidence_sum = state['confidence_sum']
+        return stats
+
+
+class QuestionStore:
+    """Análisis de preguntas en columnas compactas, con estadísticas al día."""
+
+    def __init__(self, capacity: int = 256):
+        self._size = 0
+        self._types = np.empty(capacity, dtype=np.uint8)
+        self._complexity = np.empty(capacity, dtype=np.uint8)
+        self._language = np.empty(capacity, dtype=np.uint8)
+        self._length = np.empty(capacity, dtype=np.uint8)
+        self._flags = np.empty(capacity, dtype=np.uint8)
+        self._confidence = np.empty(capacity, dtype=np.float32)
+        # Palabras clave de la pregunta i: _keyword_ids[_keyword_ends[i-1]:_keyword_ends[i]]
+        self._keyword_ends = np.empty(capacity, dtype=np.int64)
+        self._keyword_ids = np.empty(capacity * 4, dtype=np.int32)
+        self._keyword_count = 0
+        self.vocabulary: List[str] = []
+        self._vocabulary_codes: Dict[str, int] = {}
+        self.texts: List[str] = []
+        self.contexts: List[Optional[str]] = []
+        self.stats = QuestionStats()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _grow(column: np.ndarray, needed: int) -> np.ndarray:
+        if needed <= len(column):
+            return column
+        grown = np.empty(max(needed, len(column) * 2), dtype=column.dtype)
+        grown[:len(column)] = column
+        return grown
+
+    def _intern(self, word: str) -> int:
+        code = self._vocabulary_codes.get(word)
+        if code is None:
+            code = len(self.vocabulary)
+            self.vocabulary.append(word)
+            self._vocabulary_codes[word] = code
+        return code
+
+    def append(self, analysis: QuestionAnalysis) -> int:
+        """Añade un análisis y actualiza las estadísticas; devuelve su índice."""
+        index = self._size
+        if index == len(self._types):
+            for name in ('_types', '_complexity', '_language', '_length',
+                         '_flags', '_confidence', '_keyword_ends'):
+                setattr(self, name, self._grow(getattr(self, name), index + 1))
+
+        codes = (TYPE_CODES[analysis.question_type],
+                 COMPLEXITY_CODES[analysis.complexity],
+                 LANGUAGE_CODES[analysis.language],
+                 LENGTH_CODES[analysis.expected_response_length])
+        self._types[index], self._complexity[index], self._language[index], self._length[index] = codes
+        self._flags[index] = ((REQUIRES_CODE if analysis.requires_code_example else 0)
+                              | (FOLLOW_UP if analysis.follow_up_potential else 0))
+        self._confidence[index] = analysis.confidence
+
+        keywords = [self._intern(word) for word in analysis.keywords]
+        end = self._keyword_count + len(keywords)
+        self._keyword_ids = self._grow(self._keyword_ids, end)
+        self._keyword_ids[self._keyword_count:end] = keywords
+        self._keyword_count = end
+        self._keyword_ends[index] = end
+
+        self.texts.append(analysis.text)
+        self.contexts.append(analysis.context)
+        self._size += 1
+        self.stats.add_codes(*codes, analysis.requires_code_example, analysis.confidence)
+        return index
+
+    def extend(self, analyses: Iterable[QuestionAnalysis]):
+        for analysis in analyses:
+            self.append(analysis)
+
+    def keywords(self, index: int) -> List[str]:
+        start = int(self._keyword_ends[index - 1]) if index else 0
+        end = int(self._keyword_ends[index])
+        return [self.vocabulary[code] for code in self._keyword_ids[start:end]]
+
+    def __getitem__(self, index: int) -> QuestionAnalysis:
+        """Reconstruye el QuestionAnalysis guardado en la posición index."""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        flags = int(self._flags[index])
+        return QuestionAnalysis(
+            text=self.texts[index],
+            question_type=QUESTION_TYPES[self._types[index]],
+            confidence=float(self._confidence[index]),
+            complexity=COMPLEXITIES[self._complexity[index]],
+            keywords=self.keywords(index),
+            context=self.contexts[index],
+            language=LANGUAGES[self._language[index]],
+            requires_code_example=bool(flags & REQUIRES_CODE),
+            expected_response_length=RESPONSE_LENGTHS[self._length[index]],
+            follow_up_potential=bool(flags & FOLLOW_UP),
+        )
+
+    def __iter__(self) -> Iterator[QuestionAnalysis]:
+        for index in range(self._size):
+            yield self[index]
+
+    # Columnas como vistas (sin copia) para cálculos vectorizados
+    @property
+    def confidences(self) -> np.ndarray:
+        return self._confidence[:self._size]
+
+    @property
+    def type_codes(self) -> np.ndarray:
+        return self._types[:self._size]
+
+    def select(self, question_type: Optional[QuestionType] = None,
+               language: Optional[str] = None,
+               complexity: Optional[str] = None) -> np.ndarray:
+        """Índices de las preguntas que cumplen todos los filtros dados."""
+        mask = np.ones(self._size, dtype=bool)
+        if question_type is not None:
+            mask &= self.type_codes == TYPE_CODES[question_type]
+        if language is not None:
+            mask &= self._language[:self._size] == LANGUAGE_CODES[language]
+        if complexity is not None:
+            mask &= self._complexity[:self._size] == COMPLEXITY_CODES[complexity]
+        return np.flatnonzero(mask)
+
+    def nbytes(self) -> int:
+        """Memoria de las columnas numéricas (sin textos ni vocabulario)."""
+        columns = (self._types, self._complexity, self._language, self._length,
+                   self._flags, self._confidence, self._keyword_ends, self._keyword_ids)
+        return sum(column.nbytes for column in columns)
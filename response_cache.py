@@ -0,0 +1,157 @@
+# response_cache.py
+"""Caché de respuestas del LLM para preguntas repetidas.
+
+Una LRU en memoria con caducidad (TTL) delante de un almacén SQLite, de modo
+que las respuestas sobreviven a los reinicios. La clave combina el modelo,
+el prompt de sistema, el idioma y la forma normalizada de la pregunta.
+"""
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'false').lower() in ('1', 'true', 'yes')
+RESPONSE_CACHE_PATH = os.getenv('RESPONSE_CACHE_PATH', 'response_cache.sqlite3')
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', str(7 * 24 * 3600)))  # Segundos
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '256'))                # Entradas en memoria
+# Servir la respuesta caducada al instante y refrescarla en segundo plano
+RESPONSE_CACHE_REFRESH = os.getenv('RESPONSE_CACHE_REFRESH', 'false').lower() in ('1', 'true', 'yes')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    language TEXT NOT NULL,
+    question TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class CacheEntry:
+    text: str
+    created_at: float
+    stale: bool = False  # Caducada, pero servible mientras se refresca
+
+
+def cache_key(model: str, system_prompt: str, language: str, normalized: str) -> str:
+    payload = json.dumps([model, system_prompt, language, normalized], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """LRU con TTL en memoria respaldada por SQLite.
+
+    get() devuelve None en un fallo. Si stale_while_revalidate está activo,
+    una entrada caducada se devuelve marcada como stale y el llamante decide
+    refrescarla; begin_refresh() evita refrescar dos veces la misma clave.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_PATH, ttl: float = RESPONSE_CACHE_TTL,
+                 max_entries: int = RESPONSE_CACHE_SIZE,
+                 stale_while_revalidate: bool = RESPONSE_CACHE_REFRESH):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self._memory = collections.OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.refreshes = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            else:
+                row = self._db.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = CacheEntry(*row)
+                    self._remember(key, entry)
+                    self.disk_hits += 1
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stale = time.time() - entry.created_at > self.ttl
+            if stale and not self.stale_while_revalidate:
+                self.misses += 1
+                return None
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return CacheEntry(entry.text, entry.created_at, stale)
+
+    def put(self, key: str, text: str, model: str = '', language: str = '', question: str = ''):
+        entry = CacheEntry(text, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, language, question, text, entry.created_at)
+            )
+            self._db.commit()
+            self._refreshing.discard(key)
+
+    def begin_refresh(self, key: str) -> bool:
+        """Reserva el refresco de una clave; False si ya hay uno en curso."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def end_refresh(self, key: str):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'refreshes': self.refreshes,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory),
+        }
+
+    def format_stats(self) -> str:
+        info = self.stats()
+        return (f"🗄️  Caché: {info['hits']} aciertos, {info['stale_hits']} caducados,"
+                f" {info['misses']} fallos ({info['hit_rate']:.0%})")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
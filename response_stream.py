@@ -0,0 +1,77 @@
+# response_stream.py
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Mostrar la respuesta token a token en lugar de esperar la respuesta completa
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', 'false').lower() in ('1', 'true', 'yes')
+
+
+@dataclass
+class ResponseResult:
+    """Texto generado y tiempos de una respuesta del LLM."""
+    text: str
+    time_to_first_token: Optional[float]
+    total_time: float
+    chunks: int = 0
+    streamed: bool = False
+    cached: bool = False
+    speculative: bool = False  # Generada durante la pausa, antes del fin del enunciado
+
+    def summary(self) -> str:
+        ttft = (f"{self.time_to_first_token * 1000:.0f} ms"
+                if self.time_to_first_token is not None else "n/d")
+        source = " (caché)" if self.cached else " (especulativa)" if self.speculative else ""
+        return f"⏱️  Primer token: {ttft} | Total: {self.total_time * 1000:.0f} ms{source}"
+
+
+def print_token(token: str):
+    """Imprime un fragmento de la respuesta sin salto de línea."""
+    print(token, end='', flush=True)
+
+
+def generate(client, stream: bool = STREAM_RESPONSES,
+             on_token: Optional[Callable[[str], None]] = None,
+             **request) -> ResponseResult:
+    """Pide una respuesta al endpoint de chat, con o sin streaming.
+
+    Con streaming, cada fragmento se entrega a on_token en cuanto llega y se
+    mide el tiempo hasta el primer token; sin streaming, el primer token
+    coincide con la respuesta completa.
+    """
+    start = time.perf_counter()
+
+    if not stream:
+        response = client.chat.completions.create(**request)
+        elapsed = time.perf_counter() - start
+        text = response.choices[0].message.content or ''
+        if on_token and text:
+            on_token(text)
+        return ResponseResult(text, elapsed, elapsed, chunks=1)
+
+    first_token = None
+    parts = []
+    for chunk in client.chat.completions.create(stream=True, **request):
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content
+        if not token:
+            continue
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        parts.append(token)
+        if on_token:
+            on_token(token)
+
+    return ResponseResult(
+        text=''.join(parts),
+        time_to_first_token=first_token,
+        total_time=time.perf_counter() - start,
+        chunks=len(parts),
+        streamed=True
+    )
@@ -0,0 +1,108 @@
+# segmenter.py
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+# Tipos de evento del segmentador
+SPEECH_START = "speech_start"
+PAUSE = "pause"
+UTTERANCE_END = "utterance_end"
+
+
+@dataclass
+class SegmentEvent:
+    kind: str
+    audio: Optional[bytearray] = None  # Voz acumulada hasta el evento
+    complete: bool = True              # En UTTERANCE_END: supera la duración mínima
+
+
+class UtteranceSegmenter:
+    """Máquina de estados VAD que agrupa frames de voz en enunciados.
+
+    Recibe cada frame ya clasificado por el VAD y emite eventos: inicio de
+    voz, pausa corta (una vez por tramo de silencio) y fin de enunciado al
+    alcanzar el silencio requerido. Se acumulan los frames con voz y, con
+    gap_frames, hasta ese número de frames de cada pausa interna (la mitad
+    tras la voz y la mitad antes de la siguiente), para que Whisper no
+    reciba palabras pegadas.
+    Con un endpointer (AdaptiveEndpointer) el silencio requerido se
+    recalcula en cada frame en lugar de ser fijo.
+    """
+
+    def __init__(self, sample_rate: int, frame_duration: int,
+                 silence_timeout: float, min_utterance: float,
+                 pause_timeout: Optional[float] = None, endpointer=None,
+                 gap_frames: int = 0):
+        self.frame_duration = frame_duration
+        self.required_silence = int(silence_timeout * 1000 / frame_duration)
+        self.pause_frames = (int(pause_timeout * 1000 / frame_duration)
+                             if pause_timeout else None)
+        self.min_bytes = int(sample_rate * min_utterance) * 2  # 16-bit = 2 bytes
+        self.endpointer = endpointer
+        self.gap_head = gap_frames // 2
+        self.gap_tail = gap_frames - self.gap_head
+        self.reset()
+
+    def reset(self):
+        self.voice_frames = bytearray()
+        self.silence_frames = 0
+        self.recording = False
+        # Silencio pendiente: se añade solo si vuelve la voz (o como margen final)
+        self.silence_head = bytearray()
+        self.silence_tail = deque(maxlen=self.gap_tail)
+
+    def feed(self, frame, is_speech: bool) -> Optional[SegmentEvent]:
+        """Procesa un frame y devuelve el evento que provoca, si hay alguno."""
+        if is_speech:
+            if self.endpointer and self.silence_frames:
+                self.endpointer.observe_pause(self.silence_frames)
+            if self.silence_frames:
+                self._close_gap()
+            self.voice_frames.extend(frame)
+            self.silence_frames = 0
+            if not self.recording:
+                self.recording = True
+                if self.endpointer:
+                    self.endpointer.reset_utterance()
+                return SegmentEvent(SPEECH_START)
+            return None
+
+        if not self.recording:
+            return None
+
+        self.silence_frames += 1
+        if self.silence_frames <= self.gap_head:
+            self.silence_head.extend(frame)
+        elif self.gap_tail:
+            self.silence_tail.append(bytes(frame))
+        required = (self.endpointer.required_frames(len(self.voice_frames))
+                    if self.endpointer else self.required_silence)
+        if self.silence_frames >= required:
+            if self.endpointer:
+                self.endpointer.on_utterance_end(self.silence_frames)
+            return self._end_utterance()
+
+        if self.silence_frames == self.pause_frames:
+            return SegmentEvent(PAUSE, self.voice_frames)
+        return None
+
+    def flush(self) -> Optional[SegmentEvent]:
+        """Cierra el enunciado en curso (por ejemplo, al final de un fichero)."""
+        if not self.recording:
+            return None
+        return self._end_utterance()
+
+    def _close_gap(self):
+        """La voz vuelve: la pausa queda reducida a gap_frames como máximo."""
+        self.voice_frames.extend(self.silence_head)
+        for frame in self.silence_tail:
+            self.voice_frames.extend(frame)
+        self.silence_head = bytearray()
+        self.silence_tail.clear()
+
+    def _end_utterance(self) -> SegmentEvent:
+        audio = self.voice_frames
+        complete = len(audio) >= self.min_bytes
+        # La pausa final no se añade: el audio coincide con el de la última PAUSE
+        self.reset()
+        return SegmentEvent(UTTERANCE_END, audio, complete)
@@ -0,0 +1,197 @@
+# speculation.py
+"""Respuestas especulativas: se empiezan en la pausa corta, antes del fin del enunciado.
+
+En la primera pausa (PAUSE) se transcribe lo dicho hasta entonces y se pide
+la respuesta al LLM en segundo plano, guardando los fragmentos sin mostrarlos.
+Si el hablante vuelve a hablar, la especulación se cancela (el stream se
+corta en el siguiente fragmento). Si el enunciado termina sin voz nueva, el
+audio es idéntico al especulado: su transcripción se usa como final y la
+respuesta se reclama por texto, mostrando lo ya generado y el resto en vivo.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from response_stream import ResponseResult
+
+
+class SpeculationCancelled(Exception):
+    pass
+
+
+class Speculation:
+    """Una transcripción + respuesta lanzada en una pausa."""
+
+    def __init__(self, audio_bytes: int, language: Optional[str] = None):
+        self.audio_bytes = audio_bytes
+        self.language = language  # Idioma que se pide a Whisper para este audio
+        self.started_at = time.perf_counter()
+        self.cancelled = threading.Event()
+        self.transcript_ready = threading.Event()
+        self.transcript: Optional[str] = None
+        self.result: Optional[ResponseResult] = None
+        self.error: Optional[Exception] = None
+        self.future = None
+        self.tokens: List[str] = []
+        self.first_token_at: Optional[float] = None
+        self._sink: Optional[Callable[[str], None]] = None
+        self._lock = threading.Lock()
+
+    def on_token(self, token: str):
+        """Recibe los fragmentos del LLM; corta el stream si se canceló."""
+        with self._lock:
+            if self.cancelled.is_set():
+                raise SpeculationCancelled()
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            self.tokens.append(token)
+            if self._sink:
+                self._sink(token)
+
+    def attach(self, sink: Optional[Callable[[str], None]]):
+        """Entrega lo ya generado a sink y a partir de ahora cada fragmento nuevo."""
+        with self._lock:
+            if sink:
+                for token in self.tokens:
+                    sink(token)
+            self._sink = sink
+
+    def wait_transcript(self) -> Optional[str]:
+        self.transcript_ready.wait()
+        return self.transcript
+
+
+class SpeculativeResponder:
+    """Gestiona la especulación en curso y sus estadísticas.
+
+    run(audio, speculation) debe transcribir el audio, guardar el texto en
+    speculation.transcript, marcar transcript_ready y generar la respuesta
+    con speculation.on_token como callback de streaming.
+    """
+
+    def __init__(self, run: Callable, min_bytes: int = 0, max_workers: int = 2):
+        self.run = run
+        self.min_bytes = min_bytes
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="especulacion")
+        self.current: Optional[Speculation] = None
+        self.committed: Dict[str, Speculation] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.hits = 0
+        self.cancelled = 0
+        self.discarded = 0
+        self.wasted_tokens = 0
+        self.wasted_transcriptions = 0
+        self.head_start_seconds = 0.0
+
+    def on_pause(self, audio, language: Optional[str] = None) -> bool:
+        """Lanza una especulación con el audio acumulado hasta la pausa."""
+        if len(audio) < self.min_bytes:
+            return False
+        self.cancel()
+        speculation = Speculation(len(audio), language)
+        snapshot = bytes(audio)  # El segmentador seguirá ampliando el buffer
+        speculation.future = self.executor.submit(self._run, snapshot, speculation)
+        with self._lock:
+            self.current = speculation
+            self.started += 1
+        return True
+
+    def _run(self, audio: bytes, speculation: Speculation):
+        try:
+            self.run(audio, speculation)
+        except SpeculationCancelled:
+            pass
+        except Exception as e:
+            speculation.error = e
+        finally:
+            speculation.transcript_ready.set()
+
+    def on_speech(self):
+        """El hablante siguió hablando: la especulación ya no sirve."""
+        if self.current is not None:
+            self.cancel()
+
+    def commit(self, audio) -> Optional[Speculation]:
+        """Fin del enunciado: devuelve la especulación si cubre exactamente este audio.
+
+        Solo se acumulan frames con voz, así que si el tamaño coincide no hubo
+        voz nueva desde la pausa y el audio es el mismo. No espera a nada.
+        """
+        with self._lock:
+            speculation, self.current = self.current, None
+        if speculation is None:
+            return None
+        if speculation.audio_bytes != len(audio) or speculation.cancelled.is_set():
+            self._cancel(speculation)
+            return None
+        return speculation
+
+    def confirm(self, speculation: Speculation) -> Optional[str]:
+        """Espera la transcripción especulada y la deja lista para claim().
+
+        Devuelve None si falló, y entonces hay que transcribir normalmente.
+        """
+        transcript = speculation.wait_transcript()
+        if speculation.error or not transcript:
+            self._cancel(speculation)
+            return None
+        with self._lock:
+            self.committed[transcript] = speculation
+        return transcript
+
+    def claim(self, question: str) -> Optional[Speculation]:
+        """Especulación confirmada cuya transcripción coincide con la pregunta final."""
+        with self._lock:
+            speculation = self.committed.pop(question, None)
+            if speculation is not None:
+                self.hits += 1
+                self.head_start_seconds += time.perf_counter() - speculation.started_at
+        return speculation
+
+    def cancel(self):
+        """Cancela la especulación en curso, si la hay."""
+        with self._lock:
+            speculation, self.current = self.current, None
+        if speculation is not None:
+            self._cancel(speculation)
+
+    def _cancel(self, speculation: Speculation):
+        speculation.cancelled.set()
+        with self._lock:
+            # La petición de transcripción ya salió al lanzar la especulación
+            self.wasted_transcriptions += 1
+            self.wasted_tokens += len(speculation.tokens)
+            self.cancelled += 1
+
+    def discard_unclaimed(self):
+        """Descarta especulaciones confirmadas que nadie reclamó."""
+        with self._lock:
+            leftovers = list(self.committed.values())
+            self.committed.clear()
+            for speculation in leftovers:
+                speculation.cancelled.set()
+                self.discarded += 1
+                self.wasted_transcriptions += 1
+                self.wasted_tokens += len(speculation.tokens)
+
+    def stats(self) -> Dict:
+        return {
+            'started': self.started,
+            'hits': self.hits,
+            'cancelled': self.cancelled,
+            'discarded': self.discarded,
+            'hit_rate': self.hits / self.started if self.started else 0.0,
+            'wasted_tokens': self.wasted_tokens,
+            'wasted_transcriptions': self.wasted_transcriptions,
+            'avg_head_start': self.head_start_seconds / self.hits if self.hits else 0.0,
+        }
+
+    def format_stats(self) -> str:
+        info = self.stats()
+        return (f"🔮 Especulación: {info['hits']}/{info['started']} aciertos"
+                f" ({info['hit_rate']:.0%}), {info['cancelled']} canceladas,"
+                f" {info['wasted_tokens']} fragmentos y {info['wasted_transcriptions']}"
+                f" transcripciones desperdiciados, ventaja media {info['avg_head_start'] * 1000:.0f} ms")
@@ -0,0 +1,170 @@
+# startup.py
+"""Arranque rápido: calentamiento en segundo plano y perfil de arranque.
+
+Warmup ejecuta en un hilo aparte las tareas lentas (importar groq, abrir la
+conexión HTTPS, cargar los modelos de spaCy) mientras la captura de audio ya
+está escuchando; quien necesite un recurso espera con wait(nombre). Si el
+calentamiento nunca se arrancó (lotes, benchmarks), wait() no bloquea.
+
+ImportProfiler mide el tiempo de importación por paquete de primer nivel
+para el informe de --profile-startup.
+"""
+import importlib.abc
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Referencia para medir el arranque (lo más pronto posible tras lanzar Python)
+PROCESS_START = time.perf_counter()
+
+
+class _TimedLoader:
+    """Envuelve un loader para medir create_module + exec_module."""
+
+    def __init__(self, loader, profiler: 'ImportProfiler'):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        create = getattr(self._loader, 'create_module', None)
+        if create is None:
+            return None
+        with self._profiler.measure(spec.name):
+            return create(spec)
+
+    def exec_module(self, module):
+        with self._profiler.measure(module.__name__):
+            self._loader.exec_module(module)
+
+
+class _Measure:
+    def __init__(self, profiler: 'ImportProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.profiler._stack.append(self.name)
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack
+        stack.pop()
+        package = self.name.partition('.')[0]
+        # Solo cuenta la importación más externa de cada paquete
+        if not any(name.partition('.')[0] == package for name in stack):
+            totals = self.profiler.totals
+            totals[package] = totals.get(package, 0.0) + elapsed
+        return False
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Buscador de módulos que solo mide: delega en los demás buscadores."""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self._stack: List[str] = []
+        self._local = threading.local()
+
+    @classmethod
+    def install(cls) -> 'ImportProfiler':
+        profiler = cls()
+        sys.meta_path.insert(0, profiler)
+        return profiler
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def measure(self, name: str) -> _Measure:
+        return _Measure(self, name)
+
+    def find_spec(self, name, path, target=None):
+        if getattr(self._local, 'busy', False) or threading.current_thread() is not threading.main_thread():
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                        spec.loader = _TimedLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._local.busy = False
+
+    def top(self, limit: int = 12) -> List[Tuple[str, float]]:
+        return sorted(self.totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class Warmup:
+    """Tareas de calentamiento en un hilo de fondo con espera por recurso."""
+
+    def __init__(self):
+        self.tasks: List[Tuple[str, Callable]] = []
+        self.events: Dict[str, threading.Event] = {}
+        self.timings: Dict[str, Tuple[float, float]] = {}  # nombre -> (duración, listo desde el arranque)
+        self.errors: Dict[str, Exception] = {}
+        self.started = False
+        self.done = threading.Event()
+
+    def add(self, name: str, func: Callable):
+        self.tasks.append((name, func))
+        self.events[name] = threading.Event()
+
+    def start(self) -> threading.Thread:
+        self.started = True
+        thread = threading.Thread(target=self._run, name="calentamiento", daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self):
+        for name, func in self.tasks:
+            start = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                self.errors[name] = e
+                print(f"⚠️  Calentamiento de {name} fallido: {str(e)}")
+            finally:
+                finished = time.perf_counter()
+                self.timings[name] = (finished - start, finished - PROCESS_START)
+                self.events[name].set()
+        self.done.set()
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Espera a que el recurso esté listo (o haya fallado su calentamiento)."""
+        event = self.events.get(name)
+        if event is None or not self.started:
+            return True
+        return event.wait(timeout)
+
+    def is_ready(self, name: str) -> bool:
+        event = self.events.get(name)
+        return event is None or event.is_set()
+
+
+def format_startup_report(phases: List[Tuple[str, float]], warmup: Warmup,
+                          profiler: Optional[ImportProfiler] = None) -> str:
+    """Informe de --profile-startup: importaciones, inicialización y calentamiento."""
+    lines = ["", "🚀 Perfil de arranque"]
+    if profiler is not None:
+        lines.append("  Importaciones (hilo principal, por paquete, incluidas sus dependencias):")
+        for package, seconds in profiler.top():
+            lines.append(f"    {package:<28} {seconds * 1000:8.1f} ms")
+    lines.append("  Inicialización (desde el arranque):")
+    for name, at in phases:
+        lines.append(f"    {name:<28} {at * 1000:8.1f} ms")
+    if warmup.timings:
+        lines.append("  Calentamiento en segundo plano:")
+        for name, (duration, ready_at) in warmup.timings.items():
+            status = " ❌" if name in warmup.errors else ""
+            lines.append(f"    {name:<28} {duration * 1000:8.1f} ms (listo a los {ready_at * 1000:.0f} ms){status}")
+    return "\n".join(lines)
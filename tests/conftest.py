@@ -0,0 +1,47 @@
+# tests/conftest.py
+"""Entorno común de las pruebas: sin red, sin .env y con el servidor falso de Groq."""
+import os
+import sys
+
+# Antes de importar los módulos: load_dotenv() no pisa variables ya definidas
+os.environ.update({
+    'GROQ_API_KEY': 'test',
+    'WHISPER_MODEL_NAME': 'test-whisper',
+    'MODEL_NAME': 'test-llm',
+    'TRANSCRIPTION_BACKEND': 'groq',
+    'LLM_BACKEND': 'groq',
+    'STREAM_RESPONSES': 'false',
+    'RESPONSE_CACHE': 'false',
+    'LANGUAGE_ROUTING': 'false',
+    'TRANSCRIPT_ARCHIVE': 'false',
+    'HIGHPASS_HZ': '0',
+    'NORMALIZE_AUDIO': 'false',
+    'METRICS_PORT': '0',
+    'METRICS_FILE': '',
+})
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest  # noqa: E402
+
+import fake_groq_server  # noqa: E402
+
+FAKE_DELAY = 0.02  # Segundos entre fragmentos de la respuesta falsa
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    """Servidor falso en un puerto libre; GROQ_BASE_URL apunta a él."""
+    server = fake_groq_server.serve(0, delay=FAKE_DELAY)
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setenv('GROQ_BASE_URL', server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def groq_client(fake_server):
+    from groq import Groq
+    return Groq(api_key='test', base_url=fake_server.url, max_retries=0)
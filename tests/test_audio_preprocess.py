@@ -0,0 +1,145 @@
+# tests/test_audio_preprocess.py
+import numpy as np
+import pytest
+
+from audio_preprocess import (AudioPreprocessor, compact_mask, compact_silence, gap_frames,
+                              highpass, normalize)
+from segmenter import UTTERANCE_END, UtteranceSegmenter
+
+SAMPLE_RATE = 16000
+FRAME_DURATION = 30
+FRAME_SIZE = SAMPLE_RATE * FRAME_DURATION // 1000
+GAP = 8
+PADDING = 3
+# Silencio inicial, pausa corta (3), pausa larga (20), silencio final
+LABELS = np.array([0] * 10 + [1] * 5 + [0] * 3 + [1] * 4 + [0] * 20 + [1] * 2 + [0] * 10, dtype=bool)
+
+
+def numbered_frames(count):
+    """Cada frame lleva su índice en todas las muestras."""
+    return np.repeat(np.arange(count, dtype=np.int16), FRAME_SIZE)
+
+
+def tone(frequency, seconds=1.0, amplitude=3000.0):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * frequency * t)
+
+
+def rms(signal):
+    return float(np.sqrt(np.mean(np.asarray(signal, dtype=np.float64) ** 2)))
+
+
+def test_gap_frames():
+    assert gap_frames(30, 240) == 8
+    assert gap_frames(30, 0) == 0
+
+
+def test_compact_mask_shortens_long_pauses_and_keeps_short_ones():
+    keep = compact_mask(LABELS, GAP, PADDING)
+
+    assert np.flatnonzero(keep).tolist() == list(range(7, 26)) + list(range(38, 47))
+    # La pausa corta (3 frames) entera; la larga se queda en 4 tras la voz y 4 antes
+    assert keep[15:18].all()
+    assert np.count_nonzero(keep[22:42]) == GAP
+    assert keep[22:26].all() and keep[38:42].all()
+
+
+def test_compact_mask_keeps_padding_at_the_edges():
+    keep = compact_mask(LABELS, GAP, PADDING)
+
+    assert np.count_nonzero(keep[:10]) == PADDING
+    assert np.count_nonzero(keep[44:]) == PADDING
+    assert not compact_mask(LABELS, GAP, padding=0)[:10].any()
+
+
+def test_compact_silence_keeps_frames_in_order():
+    samples = numbered_frames(len(LABELS))
+
+    compacted = compact_silence(samples, LABELS, FRAME_SIZE, GAP, PADDING)
+
+    kept = compacted.reshape(-1, FRAME_SIZE)[:, 0].tolist()
+    assert kept == list(range(7, 26)) + list(range(38, 47))
+
+
+def test_compact_silence_keeps_the_tail_of_an_incomplete_frame():
+    labels = np.array([0] * 2 + [1] * 4, dtype=bool)
+    samples = np.concatenate([numbered_frames(len(labels)), np.full(100, 99, dtype=np.int16)])
+
+    compacted = compact_silence(samples, labels, FRAME_SIZE, GAP, PADDING)
+
+    assert len(compacted) == len(samples)
+    assert compacted[-100:].tolist() == [99] * 100
+
+
+def test_compact_silence_without_speech_returns_the_input():
+    samples = numbered_frames(20)
+    labels = np.zeros(20, dtype=bool)
+
+    assert compact_mask(labels, GAP) is None
+    assert compact_silence(samples, labels, FRAME_SIZE, GAP) is samples
+
+
+def test_segmenter_keeps_the_same_gap_inside_an_utterance():
+    segmenter = UtteranceSegmenter(SAMPLE_RATE, FRAME_DURATION, silence_timeout=0.9,
+                                   min_utterance=0.1, gap_frames=GAP)
+    frames = numbered_frames(len(LABELS)).reshape(-1, FRAME_SIZE)
+    events = [segmenter.feed(frame.tobytes(), bool(is_speech)) for frame, is_speech in zip(frames, LABELS)]
+    assert not [event for event in events if event is not None and event.kind == UTTERANCE_END]
+
+    event = segmenter.flush()
+
+    kept = np.frombuffer(bytes(event.audio), dtype=np.int16).reshape(-1, FRAME_SIZE)[:, 0]
+    # Las pausas internas como compact_mask, sin margen en los extremos
+    assert kept.tolist() == list(range(10, 26)) + list(range(38, 44))
+
+
+def test_highpass_removes_hum_and_keeps_speech_band():
+    hum, voice = tone(30), tone(1000)
+
+    filtered = highpass(hum + voice, SAMPLE_RATE, cutoff=80)
+
+    assert filtered.dtype == np.float32
+    assert rms(highpass(hum, SAMPLE_RATE, cutoff=80)) < rms(hum) * 0.01
+    assert rms(filtered - voice) < rms(voice) * 0.01
+
+
+def test_normalize_reaches_the_target_level():
+    quiet = tone(300, amplitude=1000)
+
+    louder = normalize(quiet, FRAME_SIZE, target_dbfs=-20)
+
+    assert 20 * np.log10(rms(louder) / 32768) == pytest.approx(-20, abs=0.1)
+
+
+def test_normalize_limits_gain_and_peak():
+    whisper = tone(300, amplitude=10)
+    assert np.array_equal(normalize(whisper, FRAME_SIZE), whisper.astype(np.float32))  # Silencio
+
+    faint = tone(300, amplitude=200)
+    capped = normalize(faint, FRAME_SIZE, target_dbfs=-3, max_gain_db=20)
+    assert rms(capped) / rms(faint) == pytest.approx(10, rel=1e-3)
+
+    spiky = tone(300, amplitude=1000)
+    spiky[100] = 30000
+    limited = normalize(spiky, FRAME_SIZE, target_dbfs=-10)
+    assert np.max(np.abs(limited)) <= 0.99 * 32767 + 1
+
+
+def test_preprocessor_returns_int16_pcm():
+    pcm = (tone(30, amplitude=8000) + tone(1000, amplitude=500)).astype(np.int16)
+    preprocessor = AudioPreprocessor(SAMPLE_RATE, FRAME_DURATION, highpass_hz=80,
+                                     normalize_audio=True, target_dbfs=-20)
+
+    processed = preprocessor.process(pcm.tobytes())
+
+    assert processed.dtype == np.int16 and len(processed) == len(pcm)
+    assert 20 * np.log10(rms(processed) / 32768) == pytest.approx(-20, abs=0.5)
+    assert preprocessor.processed == 1
+    assert 'paso alto 80 Hz' in preprocessor.format_stats()
+
+
+def test_preprocessor_is_disabled_by_default():
+    pcm = tone(300).astype(np.int16)
+
+    assert AudioPreprocessor.from_env(SAMPLE_RATE) is None
+    assert AudioPreprocessor(SAMPLE_RATE, highpass_hz=0, normalize_audio=False).process(pcm) is pcm
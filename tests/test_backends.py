@@ -0,0 +1,118 @@
+# tests/test_backends.py
+import json
+import socket
+
+import numpy as np
+import pytest
+
+from backends import (BackendError, GroqCompleter, GroqTranscriber, OllamaCompleter,
+                      create_completer, create_transcriber, groq_client_factory, warm_up)
+from fake_groq_server import DEFAULT_ANSWER, DEFAULT_TRANSCRIPT
+
+MESSAGES = [{'role': 'user', 'content': '¿REST o SOAP?'}]
+WORDS = len(DEFAULT_ANSWER.split(' '))
+
+
+def closed_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def speech(seconds: float = 1.0, sample_rate: int = 16000) -> bytes:
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (np.sin(2 * np.pi * 140 * t) * 6000).astype(np.int16).tobytes()
+
+
+def posted(server, suffix):
+    return [json.loads(body) for path, body in server.requests if path.endswith(suffix)]
+
+
+def test_groq_transcriber_uploads_a_valid_wav(groq_client, fake_server):
+    transcriber = GroqTranscriber(groq_client, model='test-whisper')
+
+    text = transcriber.transcribe(speech(1.5), language='es', basename='entrevista')
+
+    assert text == DEFAULT_TRANSCRIPT
+    upload = fake_server.uploads[-1]
+    assert upload['format'] == 'wav' and upload['valid']
+    assert upload['filename'].startswith('entrevista')
+    assert upload['seconds'] == pytest.approx(1.5)
+    path, body = fake_server.requests[-1]
+    assert b'name="language"' in body and b'test-whisper' in body
+
+
+@pytest.mark.parametrize('stream', [True, False])
+def test_groq_completer(groq_client, stream):
+    tokens = []
+    result = GroqCompleter(groq_client, model='test-llm').complete(
+        MESSAGES, stream=stream, on_token=tokens.append)
+
+    assert result.text == ''.join(tokens) == DEFAULT_ANSWER
+    assert result.streamed == stream
+    assert result.chunks == (WORDS if stream else 1)
+
+
+@pytest.mark.parametrize('stream', [True, False])
+def test_ollama_completer(fake_server, stream):
+    tokens = []
+    completer = OllamaCompleter(host=fake_server.url + '/', model='llama-test', keep_alive='5m')
+
+    result = completer.complete(MESSAGES, stream=stream, on_token=tokens.append,
+                                max_tokens=64, temperature=0.2)
+
+    assert result.text == ''.join(tokens) == DEFAULT_ANSWER
+    assert result.streamed == stream
+    assert result.chunks == (WORDS if stream else 1)
+    assert result.time_to_first_token <= result.total_time
+    request = posted(fake_server, '/api/chat')[-1]
+    assert request['model'] == 'llama-test'
+    assert request['keep_alive'] == '5m'
+    assert request['stream'] == stream
+    assert request['options'] == {'num_predict': 64, 'temperature': 0.2}
+
+
+def test_ollama_warm_up_only_loads_the_model(fake_server):
+    OllamaCompleter(host=fake_server.url, model='llama-test').warm_up()
+
+    request = posted(fake_server, '/api/chat')[-1]
+    assert request['messages'] == []
+    assert request['model'] == 'llama-test'
+
+
+def test_ollama_unreachable_raises_backend_error():
+    completer = OllamaCompleter(host=f"http://127.0.0.1:{closed_port()}", timeout=2)
+
+    with pytest.raises(BackendError, match='Ollama no responde'):
+        completer.complete(MESSAGES, stream=True)
+    # Precargar no es fatal: solo se avisa
+    warm_up(completer)
+
+
+def test_factories_share_one_lazy_client(fake_server):
+    factory = groq_client_factory()
+    transcriber = create_transcriber(factory, 16000, backend='groq')
+    completer = create_completer(factory, backend='groq')
+
+    assert isinstance(transcriber, GroqTranscriber)
+    assert isinstance(completer, GroqCompleter)
+    assert transcriber.model == 'test-whisper' and completer.model == 'test-llm'
+    assert transcriber.preprocessor is None
+    assert not fake_server.requests  # Nada se conecta hasta el primer uso
+
+    warm_up(transcriber, completer)
+
+    assert transcriber.client is completer.client
+    assert [path for path, _ in fake_server.requests] == ['/openai/v1/models']
+    assert completer.complete(MESSAGES, stream=True).text == DEFAULT_ANSWER
+
+
+def test_create_completer_selects_ollama():
+    assert isinstance(create_completer(groq_client_factory(), backend='ollama'), OllamaCompleter)
+
+
+def test_unknown_backends_raise():
+    with pytest.raises(BackendError, match='TRANSCRIPTION_BACKEND'):
+        create_transcriber(groq_client_factory(), backend='otro')
+    with pytest.raises(BackendError, match='LLM_BACKEND'):
+        create_completer(groq_client_factory(), backend='otro')
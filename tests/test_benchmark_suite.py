@@ -0,0 +1,39 @@
+# tests/test_benchmark_suite.py
+import os
+import sys
+
+import numpy as np
+
+from conftest import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from suite import compare, median_ci  # noqa: E402
+
+
+def stats(p50, ci):
+    return {'unit': 'us', 'mean': p50, 'p50': p50, 'p95': p50 * 3, 'ci': ci}
+
+
+def test_median_ci_ignores_a_long_tail():
+    rng = np.random.default_rng(1)
+    samples = np.where(rng.random(200) < 0.1, 10.0, 1.0) + rng.normal(0, 0.01, 200)
+
+    assert median_ci(samples) < 0.05
+    assert median_ci([5.0]) == 0.0
+
+
+def test_noisy_current_run_does_not_hide_a_regression(capsys):
+    baseline = {'callback': stats(1.0, 0.03)}
+
+    assert compare({'callback': stats(2.5, 3.0)}, baseline, threshold=0.25) == 1
+    assert compare({'callback': stats(1.2, 0.0)}, baseline, threshold=0.25) == 0
+    # Entre el umbral y el umbral más el IC de la base: ruido, no regresión
+    assert compare({'callback': stats(1.27, 0.0)}, baseline, threshold=0.25) == 0
+    assert '≈ ruido' in capsys.readouterr().out
+
+
+def test_throughput_regression_is_a_drop():
+    baseline = {'vad': {'unit': 'frames/s', 'mean': 100.0, 'ci': 0.05, 'higher_is_better': True}}
+
+    assert compare({'vad': dict(baseline['vad'], mean=60.0)}, baseline, threshold=0.25) == 1
+    assert compare({'vad': dict(baseline['vad'], mean=200.0)}, baseline, threshold=0.25) == 0
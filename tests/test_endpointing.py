@@ -0,0 +1,118 @@
+# tests/test_endpointing.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from endpointing import AdaptiveEndpointer
+from incremental_transcriber import IncrementalTranscriber
+from question_detector import QuestionDetector
+from voice_processor import FRAME_DURATION, SAMPLE_RATE, SILENCE_TIMEOUT, VoiceProcessor
+
+QUESTION = "How would you implement a distributed cache?"
+SECOND = SAMPLE_RATE * 2  # Bytes de un segundo de PCM 16-bit
+
+
+@pytest.fixture
+def endpointer():
+    return AdaptiveEndpointer(QuestionDetector(), FRAME_DURATION, SILENCE_TIMEOUT)
+
+
+class SlowTranscriber:
+    """Transcriptor falso que espera a release y cuenta el audio recibido."""
+    name = 'lento'
+
+    def __init__(self, text=QUESTION):
+        self.text = text
+        self.calls = []
+        self.release = threading.Event()
+
+    def transcribe(self, pcm, language=None, basename="pregunta"):
+        self.calls.append(len(pcm))
+        self.release.wait(5)
+        return self.text
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def processor(endpointer):
+    processor = VoiceProcessor()
+    processor.transcriber = SlowTranscriber()
+    processor.endpointer = endpointer
+    processor.segmenter.endpointer = endpointer
+    processor.hint_pool = ThreadPoolExecutor(max_workers=1)
+    yield processor
+    processor.transcriber.release.set()
+    processor.hint_pool.shutdown(wait=True)
+
+
+def test_hint_in_time_shortens_the_wait(endpointer):
+    endpointer.on_pause(SECOND)
+    endpointer.on_transcript(QUESTION, SECOND)
+
+    assert endpointer.required_frames(SECOND) < endpointer.base_frames()
+    stats = endpointer.stats()
+    assert (stats['hint_pauses'], stats['hints_in_time'], stats['hints_late']) == (1, 1, 0)
+
+
+def test_hint_after_speech_resumed_is_ignored(endpointer):
+    endpointer.on_pause(SECOND)
+    endpointer.observe_pause(10)  # La voz volvió antes de la transcripción
+
+    assert not endpointer.waiting_for(SECOND)
+    endpointer.on_transcript(QUESTION, SECOND)
+
+    assert endpointer.hint is None
+    assert endpointer.stats()['hints_late'] == 1
+    assert 'a tiempo en 0 de 1' in endpointer.format_stats()
+
+
+def test_only_one_hint_job_in_flight(processor, endpointer):
+    for voice in (SECOND, 2 * SECOND, 3 * SECOND):
+        endpointer.on_pause(voice)
+        processor._request_endpoint_hint(bytes(voice), cut=False)
+        endpointer.observe_pause(10)
+
+    processor.transcriber.release.set()
+    processor.hint_job.result(5)
+
+    # La primera ya estaba en curso; las otras dos no se encolan detrás
+    assert processor.transcriber.calls == [SECOND]
+
+
+def test_stale_hint_job_is_not_transcribed(processor, endpointer):
+    blocker = threading.Event()
+    processor.hint_pool.submit(blocker.wait, 5)  # Ocupa el único hilo
+    endpointer.on_pause(SECOND)
+    processor._request_endpoint_hint(bytes(SECOND), cut=False)
+    endpointer.observe_pause(10)
+    blocker.set()
+    processor.hint_job.result(5)
+
+    assert processor.transcriber.calls == []
+
+
+def test_incremental_windows_are_reused_as_hint(endpointer):
+    transcriber = SlowTranscriber()
+    transcriber.release.set()
+    incremental = IncrementalTranscriber(transcriber.transcribe, SAMPLE_RATE,
+                                         window_seconds=1.0, overlap_seconds=0.0)
+    processor = VoiceProcessor()
+    processor.endpointer = endpointer
+    processor.incremental = incremental
+
+    endpointer.on_pause(2 * SECOND)
+    cut = incremental.on_pause(bytes(2 * SECOND))
+    processor._request_endpoint_hint(bytes(2 * SECOND), cut)
+
+    assert wait_until(lambda: endpointer.hints_in_time == 1)
+    assert transcriber.calls == [2 * SECOND]  # Solo la ventana, ningún envío extra
+    assert endpointer.hint is not None and endpointer.hint.audio_bytes == 2 * SECOND
+    incremental.close()
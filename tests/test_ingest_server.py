@@ -0,0 +1,157 @@
+# tests/test_ingest_server.py
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+import ingest_server
+from conftest import ROOT
+from fake_groq_server import DEFAULT_ANSWER, DEFAULT_TRANSCRIPT
+from ingest_server import HEADER_LIMIT, IngestServer
+
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from bench_ingest import FRAME_BYTES, synthetic_interview  # noqa: E402
+
+QUESTIONS = 2  # Con la cola de 2 preguntas por sesión ninguna se descarta
+TIMEOUT = 30.0
+
+
+def run_with_server(scenario):
+    """Arranca IngestServer en un puerto libre y ejecuta scenario(server, port)."""
+    async def main():
+        server = IngestServer(workers=8)
+        listener = await server.start('127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.wait_for(scenario(server, port), TIMEOUT)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.executor.shutdown(wait=True)
+    return asyncio.run(main())
+
+
+async def read_events(reader):
+    events = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            return events
+        events.append(json.loads(line))
+
+
+async def interview(port, header, audio):
+    """Envía la cabecera y todo el audio de golpe; devuelve los eventos recibidos."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((json.dumps(header) + '\n').encode())
+    receiver = asyncio.create_task(read_events(reader))
+    chunk = FRAME_BYTES * 10
+    for offset in range(0, len(audio), chunk):
+        writer.write(audio[offset:offset + chunk])
+        await writer.drain()
+    writer.write_eof()
+    events = await receiver
+    writer.close()
+    return events
+
+
+async def send_header(port, line: bytes):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(line)
+    await writer.drain()
+    events = await read_events(reader)
+    writer.close()
+    return events
+
+
+def kinds(events, kind):
+    return [event for event in events if event['event'] == kind]
+
+
+def test_concurrent_sessions_are_answered_in_isolation(fake_server):
+    audio = synthetic_interview(QUESTIONS)
+    headers = [{'session': f"cliente-{index}", 'language': 'en' if index % 2 else 'es'}
+               for index in range(6)]
+
+    async def scenario(server, port):
+        results = await asyncio.gather(*(interview(port, header, audio) for header in headers))
+        return results, dict(server.sessions)
+
+    results, remaining = run_with_server(scenario)
+
+    assert remaining == {}
+    for header, events in zip(headers, results):
+        assert events[0] == {'event': 'ready', 'session': header['session']}
+        assert events[-1] == {'event': 'closed', 'answered': QUESTIONS, 'dropped': 0}
+        assert not kinds(events, 'error')
+        assert len(kinds(events, 'speech_start')) == QUESTIONS
+        transcripts = kinds(events, 'transcript')
+        assert [event['text'] for event in transcripts] == [DEFAULT_TRANSCRIPT] * QUESTIONS
+        # El idioma de cada sesión no se mezcla con el de las demás
+        assert {event['language'] for event in transcripts} == {header['language']}
+        answers = kinds(events, 'answer')
+        assert [event['text'] for event in answers] == [DEFAULT_ANSWER] * QUESTIONS
+        assert ''.join(event['text'] for event in kinds(events, 'token')) == DEFAULT_ANSWER * QUESTIONS
+        assert all(event['latency'] > 0 for event in answers)
+    uploads = [upload for upload in fake_server.uploads if upload['valid']]
+    assert len(uploads) == len(headers) * QUESTIONS
+
+
+def test_duplicate_session_names_get_distinct_ids(fake_server):
+    async def scenario(server, port):
+        return await asyncio.gather(*(interview(port, {'session': 'igual'}, b'') for _ in range(2)))
+
+    first, second = run_with_server(scenario)
+
+    ids = {first[0]['session'], second[0]['session']}
+    assert len(ids) == 2 and 'igual' in ids
+
+
+@pytest.mark.parametrize('line', [
+    b'[]\n',
+    b'"sesion"\n',
+    b'{no es json\n',
+    b'{"session": "' + b'x' * HEADER_LIMIT + b'"}\n',
+    b'\x00' * (70 * 1024),
+])
+def test_invalid_headers_are_rejected(fake_server, line):
+    async def scenario(server, port):
+        return await send_header(port, line), server.total_sessions
+
+    events, sessions = run_with_server(scenario)
+
+    assert len(events) == 1
+    assert events[0]['event'] == 'error'
+    assert events[0]['error'].startswith('cabecera no válida')
+    assert sessions == 0
+
+
+def test_slow_client_is_disconnected_without_affecting_others(fake_server, monkeypatch):
+    monkeypatch.setattr(ingest_server, 'INGEST_OUTBOX_SIZE', 4)
+    audio = synthetic_interview(1)
+
+    async def scenario(server, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'{"session": "lento"}\n')
+        await writer.drain()
+        assert json.loads(await reader.readline())['event'] == 'ready'
+        other = asyncio.create_task(interview(port, {'session': 'normal'}, audio))
+        # Más eventos de los que caben sin que el envío pueda vaciar la cola
+        session = server.sessions['lento']
+        for index in range(10):
+            server.emit(session, {'event': 'token', 'text': str(index)})
+        try:
+            leftover = await reader.read()
+        except ConnectionResetError:
+            leftover = b''
+        writer.close()
+        return session, leftover, await other
+
+    session, leftover, events = run_with_server(scenario)
+
+    assert session.overflowed
+    assert b'"closed"' not in leftover
+    assert events[-1] == {'event': 'closed', 'answered': 1, 'dropped': 0}
+    assert [event['text'] for event in kinds(events, 'answer')] == [DEFAULT_ANSWER]
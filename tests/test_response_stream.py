@@ -0,0 +1,44 @@
+# tests/test_response_stream.py
+import json
+
+from conftest import FAKE_DELAY
+from fake_groq_server import DEFAULT_ANSWER
+from response_stream import generate
+
+MESSAGES = [{'role': 'user', 'content': '¿REST o SOAP?'}]
+WORDS = len(DEFAULT_ANSWER.split(' '))
+
+
+def test_streaming_delivers_every_token_in_order(groq_client):
+    tokens = []
+    result = generate(groq_client, stream=True, on_token=tokens.append,
+                      model='test-llm', messages=MESSAGES)
+
+    assert result.streamed
+    assert result.text == DEFAULT_ANSWER
+    assert ''.join(tokens) == DEFAULT_ANSWER
+    assert result.chunks == len(tokens) == WORDS
+
+
+def test_streaming_first_token_arrives_before_the_full_answer(groq_client):
+    result = generate(groq_client, stream=True, model='test-llm', messages=MESSAGES)
+
+    # El primer fragmento llega tras un retardo; la respuesta completa tras uno por palabra
+    assert result.time_to_first_token < result.total_time
+    assert result.total_time >= WORDS * FAKE_DELAY
+    assert result.time_to_first_token < result.total_time / 3
+
+
+def test_without_streaming_first_token_is_the_full_answer(groq_client, fake_server):
+    tokens = []
+    result = generate(groq_client, stream=False, on_token=tokens.append,
+                      model='test-llm', messages=MESSAGES)
+
+    assert not result.streamed
+    assert result.text == DEFAULT_ANSWER
+    assert tokens == [DEFAULT_ANSWER]
+    assert result.chunks == 1
+    assert result.time_to_first_token == result.total_time
+    path, body = fake_server.requests[-1]
+    assert path.endswith('/chat/completions')
+    assert not json.loads(body).get('stream')
@@ -0,0 +1,48 @@
+# tests/test_transcript_archive.py
+import time
+
+import pytest
+
+from transcript_archive import TranscriptArchive
+
+DAY = 86400
+QUESTION = {'question_type': 'system_design', 'keywords': ['kafka']}
+
+
+@pytest.fixture
+def now():
+    return time.time()
+
+
+def fill(archive, now, ages):
+    for age in ages:
+        archive.append(f"¿Cómo escalarías Kafka? ({age} días)", [QUESTION], timestamp=now - age * DAY)
+
+
+def ages(entries, now):
+    return sorted(round((now - entry['timestamp']) / DAY) for entry in entries)
+
+
+def test_since_finds_entries_with_out_of_order_timestamps(tmp_path, now):
+    archive = TranscriptArchive(str(tmp_path), segment_records=3)
+    # Más recientes primero: el primer registro de cada segmento es el más nuevo
+    fill(archive, now, [0, 10, 20, 30, 40, 50, 60, 70])
+
+    assert len(archive.sealed) == 2
+    found = archive.search(['kafka'], 'system_design', since=now - 31 * DAY)
+    assert ages(found, now) == [0, 10, 20, 30]
+    found = archive.search(['kafka'], until=now - 45 * DAY)
+    assert ages(found, now) == [50, 60, 70]
+    archive.close()
+
+
+def test_reopened_archive_keeps_the_date_range(tmp_path, now):
+    archive = TranscriptArchive(str(tmp_path), segment_records=3)
+    fill(archive, now, [5, 40, 1, 35, 2, 60, 3])
+    archive.close()
+
+    for read_only in (False, True):
+        reopened = TranscriptArchive(str(tmp_path), segment_records=3, read_only=read_only)
+        found = reopened.search(['kafka'], since=now - 36 * DAY, until=now - 2 * DAY)
+        assert ages(found, now) == [2, 3, 5, 35]
+        reopened.close()
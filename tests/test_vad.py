@@ -0,0 +1,72 @@
+# tests/test_vad.py
+import os
+import sys
+
+import numpy as np
+import pytest
+import webrtcvad
+
+from conftest import ROOT
+from vad import EnergyGate, GatedVad
+
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from bench_vad import FRAME_DURATION, SAMPLE_RATE, synthetic_fixtures  # noqa: E402
+
+AGGRESSIVENESS = 1
+WARMUP_FRAMES = 10  # WebRTC marca voz en los primeros frames mientras estima el ruido
+FIXTURES = synthetic_fixtures(seconds=60)
+
+
+def labels(samples, gated, chunk_frames=100):
+    vad = GatedVad(webrtcvad.Vad(AGGRESSIVENESS), SAMPLE_RATE, FRAME_DURATION,
+                   gate=EnergyGate() if gated else None)
+    return vad.classify_buffer(samples, chunk_frames=chunk_frames), vad
+
+
+def test_without_gate_matches_webrtcvad_frame_by_frame():
+    samples = FIXTURES['voz_con_ruido']
+    plain = webrtcvad.Vad(AGGRESSIVENESS)
+    frame_size = SAMPLE_RATE * FRAME_DURATION // 1000
+    expected = [plain.is_speech(samples[start:start + frame_size].tobytes(), SAMPLE_RATE)
+                for start in range(0, len(samples) - frame_size + 1, frame_size)]
+
+    result, vad = labels(samples, gated=False)
+
+    assert result.tolist() == expected
+    assert vad.stats()['gated_ratio'] == 0.0
+
+
+@pytest.mark.parametrize('name', sorted(FIXTURES))
+def test_gate_keeps_webrtcvad_labels(name):
+    reference, _ = labels(FIXTURES[name], gated=False)
+    gated, _ = labels(FIXTURES[name], gated=True)
+
+    assert len(gated) == len(reference)
+    assert np.array_equal(gated[WARMUP_FRAMES:], reference[WARMUP_FRAMES:])
+    # La compuerta solo evita llamadas: nunca añade voz donde WebRTC no la ve
+    assert not np.any(gated & ~reference)
+
+
+@pytest.mark.parametrize('name', ['voz_en_silencio', 'voz_con_ruido'])
+def test_gate_labels_do_not_depend_on_batch_size(name):
+    reference, _ = labels(FIXTURES[name], gated=True)
+    for chunk_frames in (1, 7, 250):
+        result, _ = labels(FIXTURES[name], gated=True, chunk_frames=chunk_frames)
+        assert np.array_equal(result, reference), chunk_frames
+
+
+@pytest.mark.parametrize('name', ['silencio_digital', 'ruido_sala', 'siseo'])
+def test_gate_skips_most_frames_without_speech(name):
+    result, vad = labels(FIXTURES[name], gated=True)
+
+    assert not result[WARMUP_FRAMES:].any()
+    assert vad.stats()['gated_ratio'] > 0.5
+
+
+def test_gate_forwards_speech_frames_to_webrtcvad():
+    result, vad = labels(FIXTURES['voz_en_silencio'], gated=True)
+    stats = vad.stats()
+
+    assert result.any()
+    assert stats['vad_calls'] >= np.count_nonzero(result)
+    assert 0.0 < stats['gated_ratio'] < 1.0
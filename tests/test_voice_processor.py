@@ -0,0 +1,84 @@
+# tests/test_voice_processor.py
+import threading
+
+import numpy as np
+
+from incremental_transcriber import IncrementalTranscriber
+from voice_processor import SAMPLE_RATE, VoiceProcessor
+
+FRAME = np.zeros(480, dtype=np.int16).tobytes()  # 30 ms: el VAD se sustituye por las etiquetas
+
+
+class RecordingTranscriber:
+    name = 'registro'
+
+    def __init__(self):
+        self.languages = []
+        self._lock = threading.Lock()
+
+    def transcribe(self, pcm, language=None, basename="pregunta"):
+        with self._lock:
+            self.languages.append(language)
+        return "¿Cómo funciona un índice invertido?"
+
+
+class SwitchingSession:
+    """Sesión de idioma cuyo idioma para Whisper cambia cuando se quiera."""
+
+    def __init__(self, language):
+        self.language = language
+        self.observed = []
+
+    def whisper_language(self):
+        return self.language
+
+    def observe(self, text, hint=None):
+        self.observed.append(hint)
+        return hint
+
+
+def processor_with(session, incremental=False):
+    processor = VoiceProcessor()
+    processor.transcriber = RecordingTranscriber()
+    processor.language = session
+    if incremental:
+        processor.incremental = IncrementalTranscriber(processor.transcribe, SAMPLE_RATE,
+                                                       window_seconds=0.5, overlap_seconds=0.0)
+    return processor
+
+
+def feed(processor, speech_frames, silence_frames):
+    audio = None
+    for is_speech in [True] * speech_frames + [False] * silence_frames:
+        audio = processor.handle_frame(FRAME, is_speech) or audio
+    return audio
+
+
+def test_turn_uses_the_language_captured_for_it():
+    session = SwitchingSession('es')
+    processor = processor_with(session)
+    audio = feed(processor, 70, 50)
+    job = processor._transcription_job(audio)
+
+    # En modo pipeline el turno anterior puede cambiar la sesión antes de ejecutar el trabajo
+    session.language = None
+    job()
+
+    assert processor.transcriber.languages == ['es']
+    assert session.observed == ['es']
+
+
+def test_incremental_windows_use_the_utterance_language():
+    session = SwitchingSession('en')
+    processor = processor_with(session, incremental=True)
+    feed(processor, 40, 15)  # Pausa corta: se corta una ventana
+    session.language = 'es'
+    audio = feed(processor, 40, 50)
+    job = processor._transcription_job(audio)
+    session.language = None
+    job()
+
+    assert len(processor.transcriber.languages) >= 2
+    assert set(processor.transcriber.languages) == {'en'}
+    assert session.observed == ['en']
+    processor.incremental.close()
@@ -0,0 +1,389 @@
+# transcript_archive.py
+"""Archivo de sesiones: transcripciones, análisis, respuestas y tiempos.
+
+Solo se añade al final. Cada segmento es un fichero .log de registros
+(cabecera binaria + hashes de sus términos + JSON) y, al llenarse, un .idx
+que se lee con mmap sin cargarlo en memoria:
+
+    cabecera | registros (offset, longitud, timestamp) | hashes de términos
+    ordenados | inicio de cada lista | listas de registros (uint32)
+
+La cabecera guarda la fecha mínima y máxima del segmento (no la del primer
+y el último registro: los timestamps pueden llegar desordenados).
+
+Los términos son las palabras clave de _extract_keywords, las palabras de la
+transcripción (nombres propios como "Kafka" no salen como palabra clave) y
+el tipo de pregunta ("type:system_design"). Una búsqueda hace una búsqueda
+binaria por término en cada segmento, intersecta las listas y filtra por
+fecha; los segmentos fuera del rango de fechas ni se leen.
+
+Uso:
+    python transcript_archive.py kafka --type system_design --days 30
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRANSCRIPT_ARCHIVE = os.getenv('TRANSCRIPT_ARCHIVE', 'false').lower() in ('1', 'true', 'yes')
+TRANSCRIPT_ARCHIVE_DIR = os.getenv('TRANSCRIPT_ARCHIVE_DIR', 'archive')
+SEGMENT_RECORDS = 1 << 16  # Registros por segmento antes de sellarlo con su índice
+
+RECORD_HEADER = struct.Struct('<IId')          # bytes del JSON, nº de términos, timestamp
+INDEX_HEADER = struct.Struct('<8sIIQdd')       # magia, registros, términos, postings, fechas mín./máx.
+INDEX_MAGIC = b'IRISIDX2'
+INDEX_MAGIC_V1 = b'IRISIDX1'  # Fechas del primer y último registro: se recalculan al abrir
+RECORD_DTYPE = np.dtype([('offset', '<u8'), ('length', '<u4'), ('timestamp', '<f8')])
+EMPTY_POSTINGS = np.zeros(0, dtype=np.uint32)
+
+
+def term_hash(term: str) -> int:
+    """Hash estable de 64 bits de un término (igual en todos los procesos)."""
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def type_term(question_type) -> str:
+    # Los valores de QuestionType van en minúsculas: --type SYSTEM_DESIGN también vale
+    return f"type:{getattr(question_type, 'value', question_type)}".lower()
+
+
+def entry_terms(transcript: str, questions: Iterable[Dict]) -> List[str]:
+    """Términos indexados de una entrada: palabras clave, palabras y tipos."""
+    terms = set(re.findall(r'\w{3,}', transcript.lower()))
+    for question in questions:
+        terms.update(keyword.lower() for keyword in question.get('keywords', []))
+        terms.add(type_term(question['question_type']))
+    return sorted(terms)
+
+
+class _ActiveSegment:
+    """Segmento en escritura: índice en memoria, reconstruido al reabrir.
+
+    Con read_only se abre solo para leer (consultas mientras otro proceso
+    escribe): no se corta el último registro incompleto, solo se ignora.
+    """
+
+    def __init__(self, log_path: str, read_only: bool = False):
+        self.log_path = log_path
+        self.read_only = read_only
+        self.file = open(log_path, 'rb' if read_only else 'a+b')
+        self.offsets: List[int] = []
+        self.lengths: List[int] = []
+        self.timestamps: List[float] = []
+        self.min_ts = self.max_ts = 0.0
+        self.postings: Dict[int, List[int]] = {}
+        self._recover()
+
+    @property
+    def count(self) -> int:
+        return len(self.offsets)
+
+    def _recover(self):
+        """Relee las cabeceras y términos del .log; corta un registro a medias."""
+        self.file.seek(0)
+        data = self.file.read()
+        position = 0
+        while position + RECORD_HEADER.size <= len(data):
+            length, term_count, timestamp = RECORD_HEADER.unpack_from(data, position)
+            terms_at = position + RECORD_HEADER.size
+            payload_at = terms_at + 8 * term_count
+            if payload_at + length > len(data):
+                break
+            hashes = np.frombuffer(data, dtype='<u8', count=term_count, offset=terms_at)
+            self._add(payload_at, length, timestamp, hashes.tolist())
+            position = payload_at + length
+        if position < len(data) and not self.read_only:
+            print(f"⚠️  Archivo: registro incompleto al final de {self.log_path}, se descarta")
+            self.file.truncate(position)
+
+    def _add(self, offset: int, length: int, timestamp: float, hashes: List[int]):
+        record = len(self.offsets)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.timestamps.append(timestamp)
+        self.min_ts = timestamp if record == 0 else min(self.min_ts, timestamp)
+        self.max_ts = timestamp if record == 0 else max(self.max_ts, timestamp)
+        for value in hashes:
+            self.postings.setdefault(value, []).append(record)
+
+    def append(self, timestamp: float, hashes: List[int], payload: bytes):
+        self.file.seek(0, os.SEEK_END)
+        position = self.file.tell()
+        self.file.write(RECORD_HEADER.pack(len(payload), len(hashes), timestamp))
+        self.file.write(np.asarray(hashes, dtype='<u8').tobytes())
+        self.file.write(payload)
+        self.file.flush()
+        self._add(position + RECORD_HEADER.size + 8 * len(hashes), len(payload), timestamp, hashes)
+
+    def postings_for(self, value: int) -> np.ndarray:
+        records = self.postings.get(value)
+        return np.asarray(records, dtype=np.uint32) if records else EMPTY_POSTINGS
+
+    def record_timestamps(self, records: np.ndarray) -> np.ndarray:
+        return np.asarray(self.timestamps)[records]
+
+    def payload(self, record: int) -> bytes:
+        return os.pread(self.file.fileno(), self.lengths[record], self.offsets[record])
+
+    def close(self):
+        self.file.close()
+
+    def seal(self, index_path: str):
+        """Escribe el .idx (de forma atómica) y cierra el .log."""
+        hashes = np.array(sorted(self.postings), dtype='<u8')
+        lists = [self.postings[int(value)] for value in hashes]
+        starts = np.zeros(len(lists) + 1, dtype='<u8')
+        np.cumsum([len(records) for records in lists], out=starts[1:])
+        postings = (np.concatenate([np.asarray(records, dtype='<u4') for records in lists])
+                    if lists else EMPTY_POSTINGS)
+        records = np.empty(self.count, dtype=RECORD_DTYPE)
+        records['offset'] = self.offsets
+        records['length'] = self.lengths
+        records['timestamp'] = self.timestamps
+
+        temporary = index_path + '.tmp'
+        with open(temporary, 'wb') as index:
+            index.write(INDEX_HEADER.pack(INDEX_MAGIC, self.count, len(hashes), len(postings),
+                                          self.min_ts, self.max_ts))
+            for array in (records, hashes, starts, postings.astype('<u4')):
+                index.write(array.tobytes())
+            index.flush()
+            os.fsync(index.fileno())
+        os.replace(temporary, index_path)
+        self.file.close()
+
+
+class _SealedSegment:
+    """Segmento cerrado: .log e .idx mapeados en memoria, solo lectura."""
+
+    def __init__(self, log_path: str, index_path: str):
+        self.log_path = log_path
+        self.log = self._map(log_path)
+        self.index = self._map(index_path)
+        magic, count, terms, postings, self.min_ts, self.max_ts = INDEX_HEADER.unpack_from(self.index)
+        if magic not in (INDEX_MAGIC, INDEX_MAGIC_V1):
+            raise ValueError(f"{index_path}: índice de archivo no válido")
+        position = INDEX_HEADER.size
+        self.records = np.frombuffer(self.index, dtype=RECORD_DTYPE, count=count, offset=position)
+        if magic == INDEX_MAGIC_V1 and count:
+            timestamps = self.records['timestamp']
+            self.min_ts, self.max_ts = float(timestamps.min()), float(timestamps.max())
+        position += self.records.nbytes
+        self.hashes = np.frombuffer(self.index, dtype='<u8', count=terms, offset=position)
+        position += self.hashes.nbytes
+        self.starts = np.frombuffer(self.index, dtype='<u8', count=terms + 1, offset=position)
+        position += self.starts.nbytes
+        self.postings = np.frombuffer(self.index, dtype='<u4', count=postings, offset=position)
+        self.count = count
+
+    @staticmethod
+    def _map(path: str) -> mmap.mmap:
+        with open(path, 'rb') as source:
+            return mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def postings_for(self, value: int) -> np.ndarray:
+        position = int(np.searchsorted(self.hashes, np.uint64(value)))
+        if position == len(self.hashes) or int(self.hashes[position]) != value:
+            return EMPTY_POSTINGS
+        return self.postings[int(self.starts[position]):int(self.starts[position + 1])]
+
+    def record_timestamps(self, records: np.ndarray) -> np.ndarray:
+        return self.records['timestamp'][records]
+
+    def payload(self, record: int) -> bytes:
+        offset, length, _ = self.records[record]
+        return self.log[int(offset):int(offset) + int(length)]
+
+    def close(self):
+        self.records = self.hashes = self.starts = self.postings = None
+        self.index.close()
+        self.log.close()
+
+
+class TranscriptArchive:
+    """Archivo segmentado con índice invertido por término y tipo de pregunta.
+
+    read_only abre el archivo solo para consultar: no crea, corta ni sella
+    segmentos, así que es seguro mientras VoiceProcessor sigue escribiendo.
+    """
+
+    def __init__(self, directory: str = TRANSCRIPT_ARCHIVE_DIR,
+                 segment_records: int = SEGMENT_RECORDS, session: Optional[str] = None,
+                 read_only: bool = False):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.session = session or datetime.datetime.now().isoformat(timespec='seconds')
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        if not read_only:
+            os.makedirs(directory, exist_ok=True)
+
+        # Segmentos de solo lectura: sellados y, en read_only, los .log sin .idx
+        self.sealed: List = []
+        logs = sorted(name for name in (os.listdir(directory) if os.path.isdir(directory) else ())
+                      if name.startswith('segment-') and name.endswith('.log'))
+        self._next_number = int(logs[-1][len('segment-'):-len('.log')]) + 1 if logs else 1
+        self.active = None
+        for position, name in enumerate(logs):
+            log_path = os.path.join(directory, name)
+            index_path = log_path[:-len('.log')] + '.idx'
+            if not os.path.exists(index_path):
+                segment = _ActiveSegment(log_path, read_only=read_only)
+                if read_only:
+                    self.sealed.append(segment)
+                    continue
+                if position == len(logs) - 1 and segment.count < segment_records:
+                    # El último segmento sin sellar sigue recibiendo entradas
+                    self.active = segment
+                    continue
+                segment.seal(index_path)
+            self.sealed.append(_SealedSegment(log_path, index_path))
+        if self.active is None and not read_only:
+            self.active = self._new_segment()
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"segment-{number:06d}.log")
+
+    def _new_segment(self) -> _ActiveSegment:
+        segment = _ActiveSegment(self._segment_path(self._next_number))
+        self._next_number += 1
+        return segment
+
+    @property
+    def count(self) -> int:
+        return (sum(segment.count for segment in self.sealed)
+                + (self.active.count if self.active else 0))
+
+    def append(self, transcript: str, questions=(), answer: Optional[str] = None,
+               timings: Optional[Dict] = None, timestamp: Optional[float] = None) -> Dict:
+        """Añade una entrada; questions son QuestionAnalysis o diccionarios."""
+        if self.read_only:
+            raise PermissionError(f"{self.directory}: archivo abierto en solo lectura")
+        questions = [question if isinstance(question, dict) else question.to_dict()
+                     for question in questions]
+        entry = {
+            'timestamp': time.time() if timestamp is None else timestamp,
+            'session': self.session,
+            'transcript': transcript,
+            'questions': questions,
+            'answer': answer,
+            'timings': timings or {},
+        }
+        payload = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        hashes = [term_hash(term) for term in entry_terms(transcript, questions)]
+        with self._lock:
+            self.active.append(entry['timestamp'], hashes, payload)
+            if self.active.count >= self.segment_records:
+                self._roll()
+        return entry
+
+    def _roll(self):
+        segment = self.active
+        index_path = segment.log_path[:-len('.log')] + '.idx'
+        segment.seal(index_path)
+        self.sealed.append(_SealedSegment(segment.log_path, index_path))
+        self.active = self._new_segment()
+
+    def _search_segment(self, segment, hashes: List[int], since, until) -> np.ndarray:
+        if segment.count == 0:
+            return EMPTY_POSTINGS
+        if (since is not None and segment.max_ts < since) or \
+                (until is not None and segment.min_ts > until):
+            return EMPTY_POSTINGS
+        records = None
+        # Primero la lista más corta: las intersecciones se quedan pequeñas
+        for postings in sorted((segment.postings_for(value) for value in hashes), key=len):
+            records = postings if records is None else np.intersect1d(records, postings,
+                                                                      assume_unique=True)
+            if len(records) == 0:
+                return EMPTY_POSTINGS
+        if records is None:
+            records = np.arange(segment.count, dtype=np.uint32)
+        if since is not None or until is not None:
+            timestamps = segment.record_timestamps(records)
+            mask = np.ones(len(records), dtype=bool)
+            if since is not None:
+                mask &= timestamps >= since
+            if until is not None:
+                mask &= timestamps <= until
+            records = records[mask]
+        return records
+
+    def search(self, keywords: Iterable[str] = (), question_type=None,
+               since: Optional[float] = None, until: Optional[float] = None,
+               limit: Optional[int] = 100) -> List[Dict]:
+        """Entradas que contienen todas las palabras (y el tipo), más recientes primero."""
+        terms = [keyword.lower() for keyword in keywords]
+        if question_type is not None:
+            terms.append(type_term(question_type))
+        hashes = [term_hash(term) for term in terms]
+
+        with self._lock:
+            segments = list(self.sealed)
+            active = self.active
+            # El índice del segmento activo cambia al añadir: se consulta con el lock
+            active_payloads = []
+            if active is not None:
+                active_records = self._search_segment(active, hashes, since, until)
+                active_payloads = [active.payload(int(record))
+                                   for record in active_records[::-1][:limit]]
+
+        results = [json.loads(payload) for payload in active_payloads]
+        for segment in reversed(segments):
+            if limit is not None and len(results) >= limit:
+                break
+            records = self._search_segment(segment, hashes, since, until)
+            for record in records[::-1]:
+                if limit is not None and len(results) >= limit:
+                    break
+                results.append(json.loads(segment.payload(int(record))))
+        return results
+
+    def close(self):
+        """Cierra los ficheros; el segmento activo se retoma al reabrir."""
+        with self._lock:
+            if self.active is not None:
+                self.active.close()
+            for segment in self.sealed:
+                segment.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca en el archivo de transcripciones")
+    parser.add_argument('keywords', nargs='*', help="palabras que deben aparecer todas")
+    parser.add_argument('--dir', default=TRANSCRIPT_ARCHIVE_DIR)
+    parser.add_argument('--type', help="tipo de pregunta, p. ej. system_design")
+    parser.add_argument('--days', type=float, help="solo los últimos N días")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    # Solo lectura: la consulta no toca los ficheros que está escribiendo otro proceso
+    archive = TranscriptArchive(args.dir, read_only=True)
+    since = time.time() - args.days * 86400 if args.days else None
+    start = time.perf_counter()
+    entries = archive.search(args.keywords, args.type, since=since, limit=args.limit)
+    elapsed = time.perf_counter() - start
+    print(f"🔎 {len(entries)} entradas de {archive.count} en {elapsed * 1000:.1f} ms")
+    for entry in entries:
+        when = datetime.datetime.fromtimestamp(entry['timestamp']).strftime('%Y-%m-%d %H:%M')
+        types = ', '.join(question['question_type'] for question in entry['questions'])
+        print(f"\n[{when}] {entry['transcript']}" + (f" ({types})" if types else ""))
+        if entry.get('answer'):
+            print(f"  🤖 {entry['answer']}")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
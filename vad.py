@@ -0,0 +1,140 @@
+# vad.py
+from typing import Optional
+
+import numpy as np
+
+# Umbrales de la pre-compuerta de energía (dBFS sobre PCM 16-bit)
+SILENCE_DBFS = -55.0        # Por debajo siempre es silencio
+NOISE_MARGIN_DB = 6.0       # Margen sobre el ruido de fondo estimado
+MAX_THRESHOLD_DBFS = -40.0  # La compuerta nunca exige más energía que esto
+HISS_ZCR = 0.6              # Tasa de cruces por cero típica de siseo/ruido blanco
+HISS_MARGIN_DB = 6.0        # El siseo solo se descarta si además es débil
+NOISE_ADAPTATION = 0.05     # Velocidad de adaptación del ruido de fondo
+HANGOVER_FRAMES = 10        # Frames que siguen yendo al VAD tras un candidato
+
+
+class EnergyGate:
+    """Pre-compuerta vectorizada de energía y cruces por cero.
+
+    Calcula, para un lote de frames a la vez, la energía RMS (dBFS) y la tasa
+    de cruces por cero, y marca como candidatos a voz solo los frames que
+    superan el umbral. Es deliberadamente conservadora: rechaza el silencio
+    evidente y el siseo débil, y deja las decisiones dudosas a WebRTC VAD.
+    """
+
+    def __init__(self, silence_dbfs: float = SILENCE_DBFS,
+                 noise_margin_db: float = NOISE_MARGIN_DB,
+                 max_threshold_dbfs: float = MAX_THRESHOLD_DBFS,
+                 hiss_zcr: float = HISS_ZCR):
+        self.silence_dbfs = silence_dbfs
+        self.noise_margin_db = noise_margin_db
+        self.max_threshold_dbfs = max_threshold_dbfs
+        self.hiss_zcr = hiss_zcr
+        self.noise_floor_dbfs = silence_dbfs
+        self._gap = HANGOVER_FRAMES + 1  # Frames desde el último candidato
+
+    @property
+    def threshold_dbfs(self) -> float:
+        adaptive = self.noise_floor_dbfs + self.noise_margin_db
+        return min(max(self.silence_dbfs, adaptive), self.max_threshold_dbfs)
+
+    def measure(self, frames: np.ndarray):
+        """Energía (dBFS) y tasa de cruces por cero de cada fila."""
+        size = frames.shape[1]
+        power = np.einsum('ij,ij->i', frames, frames, dtype=np.float64) / size
+        energy = 10.0 * np.log10(power / (32768.0 ** 2) + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (size - 1)
+        return energy, zcr
+
+    def candidates(self, energy: np.ndarray, zcr: np.ndarray) -> np.ndarray:
+        """Frames que podrían contener voz y deben pasar por el VAD.
+
+        Tras cada candidato se dejan pasar HANGOVER_FRAMES frames más (también
+        entre lotes), porque WebRTC VAD prolonga la voz unos frames después de
+        que cae la energía y debe ver esos frames para decidir igual.
+        """
+        threshold = self.threshold_dbfs
+        loud = energy >= threshold
+        hiss = (zcr >= self.hiss_zcr) & (energy < threshold + HISS_MARGIN_DB)
+        candidates = loud & ~hiss
+
+        # Distancia de cada frame al último candidato (incluido el lote anterior)
+        index = np.arange(len(candidates))
+        last = np.maximum.accumulate(np.where(candidates, index, -1 - self._gap))
+        gap = index - last
+        if len(gap):
+            self._gap = int(gap[-1])
+        return gap <= HANGOVER_FRAMES
+
+    def update_noise_floor(self, noise_energy: np.ndarray):
+        """Adapta el ruido de fondo con la energía de los frames sin voz."""
+        if len(noise_energy):
+            level = float(np.median(noise_energy))
+            self.noise_floor_dbfs += NOISE_ADAPTATION * (level - self.noise_floor_dbfs)
+
+
+class GatedVad:
+    """Capa de VAD enchufable: pre-compuerta de energía delante de WebRTC VAD.
+
+    classify() trabaja sobre lotes de frames (filas int16); classify_buffer()
+    clasifica una grabación completa de una sola pasada vectorizada. Sin
+    compuerta se comporta exactamente como WebRTC VAD.
+    """
+
+    def __init__(self, vad, sample_rate: int, frame_duration: int,
+                 gate: Optional[EnergyGate] = None):
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_duration / 1000)
+        self.gate = gate
+        self.frames = 0
+        self.vad_calls = 0
+
+    def is_speech(self, frame, sample_rate: Optional[int] = None) -> bool:
+        """Compatible con webrtcvad.Vad.is_speech para un frame suelto."""
+        return bool(self.classify(np.frombuffer(frame, dtype=np.int16)[None, :])[0])
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Clasifica un array (n_frames, frame_size) de int16."""
+        count = len(frames)
+        self.frames += count
+        if self.gate is None:
+            candidates = np.ones(count, dtype=bool)
+        else:
+            energy, zcr = self.gate.measure(frames)
+            candidates = self.gate.candidates(energy, zcr)
+
+        # Vista en bytes (sin copia): webrtcvad mide el frame en bytes
+        raw = np.ascontiguousarray(frames).view(np.uint8)
+        speech = np.zeros(count, dtype=bool)
+        for index in np.flatnonzero(candidates):
+            speech[index] = self.vad.is_speech(raw[index], self.sample_rate)
+        self.vad_calls += int(np.count_nonzero(candidates))
+
+        if self.gate is not None:
+            self.gate.update_noise_floor(energy[~speech])
+        return speech
+
+    def classify_buffer(self, pcm, chunk_frames: int = 100) -> np.ndarray:
+        """Clasifica una grabación completa (los restos del último frame se ignoran).
+
+        Se procesa en bloques de chunk_frames para que el ruido de fondo de la
+        compuerta se adapte a lo largo del fichero.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16) if not isinstance(pcm, np.ndarray) else pcm
+        count = len(samples) // self.frame_size
+        frames = samples[:count * self.frame_size].reshape(count, self.frame_size)
+        if count == 0:
+            return np.zeros(0, dtype=bool)
+        return np.concatenate([self.classify(frames[start:start + chunk_frames])
+                               for start in range(0, count, chunk_frames)])
+
+    def stats(self) -> dict:
+        gated = self.frames - self.vad_calls
+        return {
+            'frames': self.frames,
+            'vad_calls': self.vad_calls,
+            'gated_ratio': gated / self.frames if self.frames else 0.0,
+            'noise_floor_dbfs': self.gate.noise_floor_dbfs if self.gate else None,
+        }
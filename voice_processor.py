@@ -1,16 +1,37 @@
+import sys
+import time
+
+# --profile-startup mide las importaciones, así que debe instalarse antes que ellas
+from startup import PROCESS_START, ImportProfiler, Warmup, format_startup_report
+PROFILE_STARTUP = __name__ == "__main__" and '--profile-startup' in sys.argv
+import_profiler = ImportProfiler.install() if PROFILE_STARTUP else None
+
 import webrtcvad
-import sounddevice as sd
 import numpy as np
-from groq import Groq
-import time
-import queue
 import struct
 import wave
 import io
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from dotenv import load_dotenv
-from groq import Groq
 from question_detector import QuestionDetector, QuestionAnalysis
+from incremental_transcriber import IncrementalTranscriber
+from audio_preprocess import gap_frames
+from segmenter import PAUSE, SPEECH_START, UTTERANCE_END, UtteranceSegmenter
+from pipeline import DROP_OLDEST, Pipeline, QueueEmpty, Stage, StageQueue
+from frame_aligner import FrameAligner
+from backends import create_completer, create_transcriber, groq_client_factory, warm_up
+from nlp_models import registry
+from vad import EnergyGate, GatedVad
+from response_stream import STREAM_RESPONSES, ResponseResult, print_token
+from speculation import SpeculativeResponder
+from endpointing import ADAPTIVE_ENDPOINTING, AdaptiveEndpointer
+from language_id import LANGUAGE_ROUTING, LanguageSession, identifier_instance
+from response_cache import RESPONSE_CACHE, ResponseCache, cache_key
+from transcript_archive import TRANSCRIPT_ARCHIVE, TranscriptArchive
+from metrics import metrics
 
 load_dotenv()
 
@@ -22,57 +43,258 @@ FRAME_DURATION = 30  # ms
 AGGRESSIVENESS = 1   # Nivel de detección (0-3)
 MIN_UTTERANCE = 1.7   # Segundos mínimos de voz
 SILENCE_TIMEOUT = 1.3 # Segundos para finalizar pregunta
+PAUSE_TIMEOUT = 0.3   # Segundos de pausa para cortar una ventana incremental
+
+# Transcripción incremental mientras el hablante sigue hablando
+INCREMENTAL_TRANSCRIPTION = os.getenv('INCREMENTAL_TRANSCRIPTION', 'false').lower() in ('1', 'true', 'yes')
+INCREMENTAL_WINDOW = float(os.getenv('INCREMENTAL_WINDOW', '3.0'))    # Segundos mínimos por ventana
+INCREMENTAL_OVERLAP = float(os.getenv('INCREMENTAL_OVERLAP', '0.5'))  # Segundos de solapamiento
+
+# Respuesta especulativa en la pausa corta (PAUSE_TIMEOUT), antes de SILENCE_TIMEOUT
+SPECULATIVE_ANSWERS = os.getenv('SPECULATIVE_ANSWERS', 'false').lower() in ('1', 'true', 'yes')
+
+# Idioma inicial de la sesión (y fijo para Whisper con LANGUAGE_ROUTING=false)
+DEFAULT_LANGUAGE = os.getenv('DEFAULT_LANGUAGE', 'es')
+
+# Pipeline concurrente captura → VAD → transcripción → LLM
+PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'false').lower() in ('1', 'true', 'yes')
+CAPTURE_QUEUE_SIZE = int(os.getenv('CAPTURE_QUEUE_SIZE', '500'))        # Frames (~15 s)
+TRANSCRIPTION_QUEUE_SIZE = int(os.getenv('TRANSCRIPTION_QUEUE_SIZE', '4'))
+LLM_QUEUE_SIZE = int(os.getenv('LLM_QUEUE_SIZE', '2'))
+PIPELINE_STATS_INTERVAL = float(os.getenv('PIPELINE_STATS_INTERVAL', '0'))  # 0 = sin informe
+
+# Pre-compuerta de energía delante de WebRTC VAD
+VAD_PREGATE = os.getenv('VAD_PREGATE', 'true').lower() in ('1', 'true', 'yes')
+VAD_BATCH_SIZE = 32  # Frames máximos clasificados de una vez
+
+SYSTEM_PROMPT = "Eres un asistente para entrevistas profesionales de desarrollador de sistemas enfocado en Java, servicios web, aws, design of system, arquitectura de sistemas."
+
+def llm_request(question) -> dict:
+    """Parámetros de la llamada al LLM para una pregunta."""
+    return {
+        'messages': [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": question}
+        ],
+        'max_tokens': 150,
+        'temperature': 0.5,
+    }
+
 
 class VoiceProcessor:
     def __init__(self):
-        self.vad = webrtcvad.Vad(AGGRESSIVENESS)
+        self.vad = GatedVad(webrtcvad.Vad(AGGRESSIVENESS), SAMPLE_RATE, FRAME_DURATION,
+                            gate=EnergyGate() if VAD_PREGATE else None)
         self.audio_buffer = bytearray()
         self.last_voice_time = time.time()
-        self.sample_queue = queue.Queue()
+        # Cola de captura acotada: nunca crece más que el anillo del alineador
+        self.sample_queue = StageQueue("captura", CAPTURE_QUEUE_SIZE, DROP_OLDEST)
+        self.pipeline = None
         self.recording = False
-        self.client = Groq(api_key=os.getenv('GROQ_API_KEY'))
-        self.whisper_model = os.getenv('WHISPER_MODEL_NAME')
-        self.model = os.getenv('MODEL_NAME')
+        # Backends elegidos en el .env (Groq, Ollama, Whisper local). El
+        # segmentador solo acumula frames con voz: el audio ya llega recortado
+        clients = groq_client_factory()
+        self.transcriber = create_transcriber(clients, SAMPLE_RATE, CHANNELS)
+        self.completer = create_completer(clients)
+        self.stream_responses = STREAM_RESPONSES
+        self.last_response = None
+        self.speech_started_at = None
+        self.utterance_language = None  # Idioma de Whisper fijado al empezar el enunciado
+        # Calentamiento en segundo plano; transcribir/responder esperan a 'backends'
+        self.warmup = Warmup()
+        self.warmup.add('backends', lambda: warm_up(self.transcriber, self.completer))
+        # Idioma de la sesión: decide el idioma de Whisper y el modelo de spaCy
+        self.language = LanguageSession(default=DEFAULT_LANGUAGE) if LANGUAGE_ROUTING else None
+        if self.language:
+            self.warmup.add('language', identifier_instance)
+        # Un solo detector por proceso: los modelos de spaCy se cargan una vez
+        self.detector = QuestionDetector(language=self.language)
+        # Caché de respuestas para preguntas repetidas (refresco en un hilo aparte)
+        self.cache = ResponseCache() if RESPONSE_CACHE else None
+        self.cache_refresher = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache")
+                                if self.cache else None)
+        # Archivo de la sesión: el análisis y la escritura van en un hilo aparte
+        self.archive = TranscriptArchive() if TRANSCRIPT_ARCHIVE else None
+        self.archiver = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="archivo")
+                         if self.archive else None)
+        if self.cache or self.archive:
+            # Solo la clave de caché y el archivo usan spaCy en el camino en vivo
+            self.warmup.add('nlp', registry.preload)
         
         # Cálculo de tamaños
         self.frame_size = int(SAMPLE_RATE * FRAME_DURATION / 1000)
         self.min_samples = int(SAMPLE_RATE * MIN_UTTERANCE)
+        # Ranuras de sobra para el frame en escritura y el que está leyendo el VAD
+        self.aligner = FrameAligner(SAMPLE_RATE, FRAME_DURATION,
+                                    slots=CAPTURE_QUEUE_SIZE + VAD_BATCH_SIZE + 8)
+
+        # Silencio final adaptativo: aprende las pausas de la sesión y usa la
+        # transcripción tomada en la pausa corta para acortar o alargar la espera
+        self.endpointer = None
+        self.hint_pool = None
+        self.hint_job = None  # Como mucho una transcripción parcial en curso
+        if ADAPTIVE_ENDPOINTING:
+            self.endpointer = AdaptiveEndpointer(self.detector, FRAME_DURATION, SILENCE_TIMEOUT)
+            self.hint_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fin-enunciado")
+
+        self.segmenter = UtteranceSegmenter(
+            SAMPLE_RATE, FRAME_DURATION, SILENCE_TIMEOUT, MIN_UTTERANCE,
+            pause_timeout=PAUSE_TIMEOUT, endpointer=self.endpointer,
+            gap_frames=gap_frames(FRAME_DURATION)
+        )
+        self.incremental = None
+        if INCREMENTAL_TRANSCRIPTION:
+            self.incremental = IncrementalTranscriber(
+                self.transcribe, SAMPLE_RATE,
+                window_seconds=INCREMENTAL_WINDOW,
+                overlap_seconds=INCREMENTAL_OVERLAP
+            )
+        self.speculator = None
+        if SPECULATIVE_ANSWERS:
+            self.speculator = SpeculativeResponder(self._speculate,
+                                                   min_bytes=self.segmenter.min_bytes)
 
     def audio_callback(self, indata, frames, time, status):
         """Callback para captura de audio en tiempo real"""
-        # Convertir a PCM 16-bit
-        pcm_data = (indata * 32767).astype(np.int16).tobytes()
-        self.sample_queue.put(pcm_data)
-
-    def process_audio(self):
-        """Procesamiento principal del audio"""
-        voice_frames = bytearray()
-        silence_frames = 0
-        required_silence = int(SILENCE_TIMEOUT * 1000 / FRAME_DURATION)
+        # Convertir a PCM 16-bit y cortar en frames exactos para el VAD,
+        # sea cual sea el tamaño de bloque que entregue el dispositivo
+        self.aligner.push(indata, self.sample_queue.put)
 
-        while True:
+    def process_audio(self, stop_event=None):
+        """Procesamiento principal del audio (hasta que se active stop_event)"""
+        while stop_event is None or not stop_event.is_set():
             try:
-                frame = self.sample_queue.get(timeout=1)
-            except queue.Empty:
+                frames = self.sample_queue.get_batch(VAD_BATCH_SIZE, timeout=1)
+            except QueueEmpty:
                 continue
 
-            # Detección de actividad vocal
-            if self.vad.is_speech(frame, SAMPLE_RATE):
-                voice_frames.extend(frame)
-                silence_frames = 0
-                if not self.recording:
-                    self.recording = True
-                    print("\n🔊 Voz detectada - Iniciando grabación...")
-            else:
-                if self.recording:
-                    silence_frames += 1
-                    if silence_frames >= required_silence:
-                        if len(voice_frames) >= self.min_samples * 2:  # 16-bit = 2 bytes
-                            self.process_question(voice_frames)
-                        voice_frames = bytearray()
-                        silence_frames = 0
-                        self.recording = False
-                        print("🛑 Silencio detectado - Procesando pregunta...")
+            batch, labels = self.classify_batch(frames)
+            for frame, is_speech in zip(batch, labels):
+                audio = self.handle_frame(frame, is_speech)
+                if audio is not None:
+                    self.process_question(audio, detected_at=time.perf_counter())
+
+    def classify_batch(self, frames):
+        """Clasifica un lote de frames de captura con la pre-compuerta vectorizada."""
+        # Copia estable del lote: el anillo de captura puede reutilizar
+        # las ranuras mientras se procesa una pregunta
+        start = time.perf_counter()
+        batch = np.stack([np.frombuffer(frame, dtype=np.int16) for frame in frames])
+        labels = self.vad.classify(batch)
+        metrics.observe('vad_batch', time.perf_counter() - start)
+        return batch, labels
+
+    def handle_frame(self, frame, is_speech=None):
+        """Pasa un frame por el VAD; devuelve el audio del enunciado al terminar."""
+        # Detección de actividad vocal
+        if is_speech is None:
+            is_speech = self.vad.is_speech(frame, SAMPLE_RATE)
+        if is_speech and self.speculator:
+            # La voz continúa: lo especulado en la pausa ya no es la pregunta completa
+            self.speculator.on_speech()
+        event = self.segmenter.feed(frame, is_speech)
+        if event is None:
+            return None
+
+        if event.kind == SPEECH_START:
+            self.recording = True
+            self.speech_started_at = time.perf_counter()
+            # Todas las transcripciones del enunciado (ventanas, pausa y final)
+            # usan este idioma, y es el que se registra al cerrar el turno
+            self.utterance_language = self.whisper_language()
+            print("\n🔊 Voz detectada - Iniciando grabación...")
+        elif event.kind == PAUSE:
+            # Transcribir en segundo plano lo dicho hasta la pausa
+            if self.endpointer:
+                self.endpointer.on_pause(len(event.audio))
+            language = self.utterance_language
+            cut = self.incremental.on_pause(event.audio, language) if self.incremental else False
+            if self.speculator:
+                self.speculator.on_pause(event.audio, language)
+            elif self.endpointer:
+                self._request_endpoint_hint(event.audio, cut)
+        elif event.kind == UTTERANCE_END:
+            self.recording = False
+            if self.speech_started_at is not None:
+                # Desde el inicio de la voz hasta detectar el fin del enunciado
+                metrics.observe('utterance', time.perf_counter() - self.speech_started_at)
+                self.speech_started_at = None
+            print("🛑 Silencio detectado - Procesando pregunta...")
+            if event.complete:
+                return event.audio
+            if self.incremental:
+                self.incremental.reset()
+            if self.speculator:
+                self.speculator.cancel()
+        return None
+
+    def segment_recording(self, samples: np.ndarray):
+        """Segmenta una grabación completa con el mismo VAD y segmentador del modo en vivo.
+
+        Usa instancias nuevas (WebRTC VAD guarda estado entre frames) y
+        devuelve (inicio_s, fin_s, audio) por cada enunciado completo.
+        """
+        vad = GatedVad(webrtcvad.Vad(AGGRESSIVENESS), SAMPLE_RATE, FRAME_DURATION,
+                       gate=EnergyGate() if VAD_PREGATE else None)
+        segmenter = UtteranceSegmenter(SAMPLE_RATE, FRAME_DURATION,
+                                       SILENCE_TIMEOUT, MIN_UTTERANCE,
+                                       gap_frames=gap_frames(FRAME_DURATION))
+        labels = vad.classify_buffer(samples)
+        frames = samples[:len(labels) * self.frame_size].reshape(-1, self.frame_size)
+        seconds = FRAME_DURATION / 1000
+
+        start = 0
+        for index, (frame, is_speech) in enumerate(zip(frames, labels)):
+            event = segmenter.feed(frame, is_speech)
+            if event is None:
+                continue
+            if event.kind == SPEECH_START:
+                start = index
+            elif event.kind == UTTERANCE_END and event.complete:
+                yield start * seconds, (index + 1) * seconds, bytes(event.audio)
+
+        event = segmenter.flush()
+        if event is not None and event.complete:
+            yield start * seconds, len(frames) * seconds, bytes(event.audio)
+
+    def start_pipeline(self) -> Pipeline:
+        """Arranca las etapas concurrentes conectadas por colas acotadas.
+
+        La captura y el VAD nunca esperan a las llamadas remotas: si una cola
+        se llena se descarta el elemento más antiguo (el audio o la pregunta
+        más vieja), que en una entrevista en vivo es el menos útil.
+        """
+        capture = self.sample_queue
+        transcription = StageQueue("transcripcion", TRANSCRIPTION_QUEUE_SIZE, DROP_OLDEST)
+        llm = StageQueue("llm", LLM_QUEUE_SIZE, DROP_OLDEST)
+
+        def vad_stage(frames):
+            # Lote de frames pendientes: mismo camino vectorizado que process_audio
+            batch, labels = self.classify_batch(frames)
+            questions = []
+            for frame, is_speech in zip(batch, labels):
+                audio = self.handle_frame(frame, is_speech)
+                if audio is not None:
+                    questions.append((self._transcription_job(audio), time.perf_counter()))
+            return questions
+
+        def transcription_stage(item):
+            job, detected_at = item
+            content = job()
+            print(f"\n🎤 Transcripcion: {content}")
+            return (content, detected_at) if content else None
+
+        def llm_stage(item):
+            content, detected_at = item
+            self.generate_response(content, detected_at=detected_at)
+
+        self.pipeline = Pipeline([
+            Stage("vad", capture, vad_stage, transcription, batch_size=VAD_BATCH_SIZE),
+            Stage("transcripcion", transcription, transcription_stage, llm),
+            Stage("llm", llm, llm_stage),
+        ])
+        self.pipeline.start()
+        return self.pipeline
 
     def create_wav_buffer(self, pcm_data):
         """Crea un buffer WAV válido desde datos PCM"""
@@ -84,20 +306,107 @@ class VoiceProcessor:
                 wav_file.writeframes(pcm_data)
             return wav_buffer.getvalue()
 
-    def process_question(self, audio_data):
+    def whisper_language(self):
+        """Idioma que se pasa a Whisper: el de la sesión, o None para autodetectar."""
+        return self.language.whisper_language() if self.language else DEFAULT_LANGUAGE
+
+    def transcribe(self, audio_data, language: Optional[str]) -> str:
+        """Transcribe audio PCM con el backend configurado en el idioma indicado."""
+        self.warmup.wait('backends')
+        with metrics.timer('transcription'):
+            return self.transcriber.transcribe(audio_data, language=language)
+
+    def _transcription_job(self, audio_data):
+        """Devuelve una función que completa la transcripción del enunciado."""
+        # Se fija aquí y se pasa explícitamente: en modo pipeline el turno
+        # anterior puede cambiar la sesión antes de que el trabajo se ejecute
+        hint = self.utterance_language
+        speculation = self.speculator.commit(audio_data) if self.speculator else None
+        if self.incremental:
+            # Solo queda la última ventana; el resto ya se transcribió
+            job = self.incremental.close_utterance(audio_data, hint)
+        else:
+            job = lambda: self.transcribe(audio_data, hint)
+        if speculation is not None:
+            # Mismo audio que en la pausa: se reutiliza su transcripción si salió bien
+            transcribe_job = job
+            job = lambda: self.speculator.confirm(speculation) or transcribe_job()
+        if self.language is None:
+            return job
+
+        def observed():
+            content = job()
+            if content:
+                self.language.observe(content, hint)
+            return content
+        return observed
+
+    def _speculate(self, audio, speculation):
+        """Transcribe y genera en segundo plano lo dicho hasta la pausa."""
+        speculation.transcript = self.transcribe(audio, speculation.language)
+        speculation.transcript_ready.set()
+        if self.endpointer and speculation.transcript:
+            self.endpointer.on_transcript(speculation.transcript, len(audio))
+        if speculation.cancelled.is_set() or not speculation.transcript:
+            return
+        speculation.result = self.completer.complete(
+            stream=True, on_token=speculation.on_token,
+            **self._llm_request(speculation.transcript)
+        )
+
+    def _request_endpoint_hint(self, audio, cut: bool):
+        """Transcripción parcial para el endpointer, sin especulación."""
+        if self.incremental:
+            # Las ventanas ya cubren la voz hasta la pausa si se acaba de cortar
+            # una: se reutiliza su texto unido en lugar de subir el audio otra vez
+            if cut:
+                self.incremental.when_transcribed(self.endpointer.on_transcript)
+            return
+        if self.hint_job is not None and not self.hint_job.done():
+            return  # La anterior sigue en curso: no se encolan pistas que llegarían tarde
+        self.hint_job = self.hint_pool.submit(self._endpoint_hint, bytes(audio),
+                                              self.utterance_language)
+
+    def _endpoint_hint(self, audio: bytes, language: Optional[str]):
+        if not self.endpointer.waiting_for(len(audio)):
+            return  # La voz volvió (o el enunciado se cerró) antes de empezar
+        try:
+            self.endpointer.on_transcript(self.transcribe(audio, language), len(audio))
+        except Exception as e:
+            print(f"⚠️  Transcripción parcial fallida: {str(e)}")
+
+    def _claim_speculation(self, question, requested_at: float):
+        """Respuesta especulativa para esta pregunta, o None si no hay o falló."""
+        speculation = self.speculator.claim(question)
+        if speculation is None:
+            return None
+        if self.stream_responses:
+            print("\n🤖 Asistente: ", end='', flush=True)
+        # Lo ya generado se muestra de golpe y el resto según llega
+        speculation.attach(print_token if self.stream_responses else None)
+        speculation.future.result()
+        if speculation.error or speculation.result is None:
+            print(f"\n⚠️  Respuesta especulativa fallida, se regenera: {speculation.error}")
+            return None
+        if self.stream_responses:
+            print("\n")
+        else:
+            print(f"\n🤖 Asistente: {speculation.result.text}\n")
+        first_token = speculation.first_token_at
+        return ResponseResult(
+            text=speculation.result.text,
+            time_to_first_token=max(0.0, first_token - requested_at) if first_token else None,
+            total_time=time.perf_counter() - requested_at,
+            chunks=speculation.result.chunks,
+            streamed=self.stream_responses,
+            speculative=True
+        )
+
+    def process_question(self, audio_data, detected_at=None):
         """Procesa el audio y genera respuesta"""
-        detector = QuestionDetector()
+        detector = self.detector
         try:
-            # Crear archivo WAV en memoria
-            wav_data = self.create_wav_buffer(audio_data)
-            
-            # Transcribir con Whisper
-            transcript = self.client.audio.transcriptions.create(
-                file=("pregunta.wav", wav_data, "audio/wav"),
-                model=self.whisper_model,
-                language="es"
-            )
-            content = transcript.text
+            content = self._transcription_job(audio_data)()
             print(f"\n🎤 Transcripcion: {content}")
             #questions = detector.analyze_text(content)
             
@@ -112,28 +421,121 @@ class VoiceProcessor:
             print(f"\n🎤 Pregunta detectada: {content}")
             
             # Generar respuesta
-            self.generate_response(content)
+            self.generate_response(content, detected_at=detected_at)
             
         except Exception as e:
             print(f"❌ Error en procesamiento: {str(e)}")
 
-    def generate_response(self, question):
-        """Genera respuesta usando el LLM"""
+    def generate_response(self, question, detected_at=None):
+        """Genera respuesta usando el LLM.
+
+        detected_at es el instante (perf_counter) en que se detectó el fin
+        del enunciado; con él se miden las latencias de extremo a extremo.
+        """
         try:
-            respuesta = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                   {"role": "system", "content": "Eres un asistente para entrevistas profesionales de desarrollador de sistemas enfocado en Java, servicios web, aws, design of system, arquitectura de sistemas."},
-                   {"role": "user", "content": question}
-                ],
-                max_tokens=150,
-                temperature=0.5
-            )
-            print(f"\n🤖 Asistente: {respuesta.choices[0].message.content}\n")
+            requested_at = time.perf_counter()
+            self.warmup.wait('backends')
+            respuesta = self._claim_speculation(question, requested_at) if self.speculator else None
+            key, language = self._cache_key(question) if self.cache else (None, None)
+            cached = self.cache.get(key) if key and respuesta is None else None
+            if respuesta is not None:
+                if key and respuesta.text:
+                    self.cache.put(key, respuesta.text, self.completer.model, language, question)
+            elif cached is not None:
+                elapsed = time.perf_counter() - requested_at
+                respuesta = ResponseResult(cached.text, elapsed, elapsed, chunks=1, cached=True)
+                print(f"\n🤖 Asistente: {respuesta.text}\n")
+                if cached.stale and self.cache.begin_refresh(key):
+                    self.cache_refresher.submit(self._refresh_cached, key, language, question)
+            else:
+                if self.stream_responses:
+                    print("\n🤖 Asistente: ", end='', flush=True)
+                respuesta = self.completer.complete(
+                    stream=self.stream_responses,
+                    on_token=print_token if self.stream_responses else None,
+                    **self._llm_request(question)
+                )
+                if self.stream_responses:
+                    print("\n")
+                else:
+                    print(f"\n🤖 Asistente: {respuesta.text}\n")
+                if key and respuesta.text:
+                    self.cache.put(key, respuesta.text, self.completer.model, language, question)
+            print(respuesta.summary())
+            self.last_response = respuesta
+            self._record_response(respuesta, requested_at, detected_at)
+            if self.archive:
+                waited = requested_at - detected_at if detected_at is not None else None
+                self.archiver.submit(self._archive_turn, question, respuesta, waited)
             
         except Exception as e:
             print(f"❌ Error generando respuesta: {str(e)}")
 
+    def _llm_request(self, question) -> dict:
+        return llm_request(question)
+
+    def _cache_key(self, question):
+        """Clave de caché a partir de las palabras clave del detector."""
+        self.warmup.wait('nlp')
+        try:
+            language, normalized = self.detector.normalize_question(question)
+        except OSError as e:
+            # Sin el modelo de spaCy no hay clave: se responde sin caché
+            print(f"⚠️  Respuesta sin caché: {str(e).splitlines()[0]}")
+            return None, None
+        return cache_key(self.completer.model, SYSTEM_PROMPT, language, normalized), language
+
+    def _refresh_cached(self, key, language, question):
+        """Regenera en segundo plano una respuesta caducada."""
+        try:
+            respuesta = self.completer.complete(stream=False, **self._llm_request(question))
+            if respuesta.text:
+                self.cache.put(key, respuesta.text, self.completer.model, language, question)
+        except Exception as e:
+            print(f"⚠️  No se pudo refrescar la respuesta en caché: {str(e)}")
+        finally:
+            self.cache.end_refresh(key)
+
+    def _archive_turn(self, question, respuesta, waited=None):
+        """Analiza la pregunta y la guarda con su respuesta y tiempos en el archivo."""
+        try:
+            self.warmup.wait('nlp')
+            timings = {
+                'first_token': respuesta.time_to_first_token,
+                'response': respuesta.total_time,
+                'cached': respuesta.cached,
+                'speculative': respuesta.speculative,
+            }
+            if waited is not None:
+                # Transcripción y colas, desde el fin del enunciado hasta pedir la respuesta
+                timings['before_response'] = waited
+            try:
+                questions = self.detector.analyze_text(question)
+            except OSError as e:
+                # Sin el modelo de spaCy se archiva igual, sin análisis
+                print(f"⚠️  Pregunta archivada sin análisis: {str(e).splitlines()[0]}")
+                questions = []
+            self.archive.append(question, questions, respuesta.text, timings)
+        except Exception as e:
+            print(f"⚠️  No se pudo archivar la pregunta: {str(e)}")
+
+    def _record_response(self, respuesta, requested_at: float, detected_at=None):
+        """Registra los tiempos del LLM y, si se conocen, los de extremo a extremo."""
+        if respuesta.cached:
+            metrics.observe('cache_lookup', respuesta.total_time)
+        elif respuesta.speculative:
+            metrics.observe('speculative_wait', respuesta.total_time)
+        else:
+            if respuesta.time_to_first_token is not None:
+                metrics.observe('first_token', respuesta.time_to_first_token)
+            metrics.observe('response', respuesta.total_time)
+        if detected_at is None:
+            return
+        waited = requested_at - detected_at
+        if respuesta.time_to_first_token is not None:
+            metrics.observe('end_to_first_token', waited + respuesta.time_to_first_token)
+        metrics.observe('end_to_end', waited + respuesta.total_time)
+
     def _build_prompt(self, question_analysis: QuestionAnalysis) -> str:
         """Construye el prompt para Groq."""
         return f"""
@@ -159,12 +561,18 @@ class VoiceProcessor:
         print(f"Respuesta: {response}")
         print("="*50 + "\n")
 def main():
+    phases = [('importaciones', time.perf_counter() - PROCESS_START)]
+
+    # Solo el modo en vivo necesita PortAudio
+    import sounddevice as sd
+    phases.append(('sounddevice', time.perf_counter() - PROCESS_START))
+
     processor = VoiceProcessor()
+    phases.append(('VoiceProcessor()', time.perf_counter() - PROCESS_START))
+    metrics.start_exporters()
     
     # Configurar dispositivo de audio
     print("🎧 Inicializando sistema de entrevistas...")
-    print("✅ Configuración lista")
-    print("🔊 Escuchando... (Presiona Ctrl+C para detener)")
     
     try:
         with sd.InputStream(
@@ -173,8 +581,40 @@ def main():
             samplerate=SAMPLE_RATE,
             blocksize=processor.frame_size
         ):
-            processor.process_audio()
+            # Se escucha desde ya; modelos y conexiones se preparan en segundo plano
+            phases.append(('escuchando', time.perf_counter() - PROCESS_START))
+            processor.warmup.start()
+            print("🔊 Escuchando... (Presiona Ctrl+C para detener)")
+            if import_profiler is not None:
+                import_profiler.uninstall()
+                threading.Thread(target=lambda: (
+                    processor.warmup.done.wait(),
+                    print(format_startup_report(phases, processor.warmup, import_profiler))
+                ), daemon=True).start()
+            if PIPELINE_MODE:
+                pipeline = processor.start_pipeline()
+                while True:
+                    time.sleep(PIPELINE_STATS_INTERVAL or 1)
+                    if PIPELINE_STATS_INTERVAL:
+                        print(pipeline.format_stats())
+            else:
+                processor.process_audio()
     except KeyboardInterrupt:
+        if processor.pipeline:
+            processor.pipeline.stop()
+        print(metrics.format_summary())
+        if processor.cache:
+            print(processor.cache.format_stats())
+        if processor.speculator:
+            processor.speculator.discard_unclaimed()
+            print(processor.speculator.format_stats())
+        if processor.endpointer:
+            print(processor.endpointer.format_stats())
+        if processor.language:
+            print(processor.language.format_stats())
+        if processor.archive:
+            processor.archiver.shutdown(wait=True)
+            processor.archive.close()
         print("\n🔴 Sistema detenido")
 
 if __name__ == "__main__":